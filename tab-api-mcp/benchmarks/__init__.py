@@ -0,0 +1,4 @@
+"""Benchmarks for the TAB API MCP servers.
+
+Run them from the tab-api-mcp directory, e.g. ``python -m benchmarks.serialization``.
+"""
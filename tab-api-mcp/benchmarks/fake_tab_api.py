@@ -0,0 +1,227 @@
+"""A local stand-in for the TAB API, for benchmarking without calling the real one.
+
+It serves the token endpoint and the information, betting and account
+service routes the tools use, with generated payloads shaped like real
+responses. Latency, payload size and error rate are configurable:
+
+    python -m benchmarks.fake_tab_api --port 8765 --latency 40 --latency-distribution lognormal \\
+        --payload-scale 2 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from .serialization import VENUES, _odds, _runner
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+class FakeTabApiSettings:
+    """How the stand-in behaves.
+
+    latency is the median response delay in milliseconds. "fixed" always
+    waits that long, "uniform" waits between 0 and twice as long,
+    "exponential" has that median, and "lognormal" has that median with the
+    spread set by latency_sigma. payload_scale multiplies the number of
+    items in every list. error_rate is the fraction of requests (other than
+    for tokens) answered with error_status.
+    """
+
+    def __init__(self, latency: float = 20, latency_distribution: str = "lognormal", latency_sigma: float = 0.5,
+                 payload_scale: float = 1, error_rate: float = 0, error_status: int = 503, seed: int = 1):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution} "
+                             f"(expected one of {', '.join(LATENCY_DISTRIBUTIONS)})")
+        self.latency = latency
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.payload_scale = payload_scale
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+
+    def delay(self) -> float:
+        """Return a response delay in seconds."""
+        median = self.latency / 1000
+        if self.latency_distribution == "fixed":
+            return median
+        if self.latency_distribution == "uniform":
+            return self.rng.uniform(0, 2 * median)
+        if self.latency_distribution == "exponential":
+            return self.rng.expovariate(math.log(2) / median) if median > 0 else 0
+        return self.rng.lognormvariate(math.log(median), self.latency_sigma) if median > 0 else 0
+
+    def count(self, base: int) -> int:
+        """Scale a list length by the payload scale."""
+        return max(1, round(base * self.payload_scale))
+
+
+def _meetings(settings, rng, date):
+    return {"meetings": [
+        {"meetingName": f"{venue} {n}", "venueMnemonic": f"{venue[:2]}{n}", "raceType": "R", "meetingDate": date,
+         "weatherCondition": "FINE", "trackCondition": "GOOD4"}
+        for n, venue in enumerate(VENUES * settings.count(2))
+    ]}
+
+
+def _races(settings, rng, date, meeting_code):
+    return {"races": [
+        {"raceId": f"{date}-{meeting_code}-{number}", "raceNumber": number, "raceName": f"RACE {number} HANDICAP",
+         "raceStartTime": f"{date}T0{number % 10}:30:00.000Z", "raceDistance": rng.choice([1000, 1200, 1400, 1600]),
+         "raceStatus": "Open"}
+        for number in range(1, settings.count(9) + 1)
+    ]}
+
+
+def _race(settings, rng, race_id):
+    return {"raceId": race_id, "raceName": "HANDICAP", "raceStatus": "Open",
+            "runners": [_runner(rng, number) for number in range(1, settings.count(14) + 1)]}
+
+
+def _markets(settings, rng, event_id):
+    return {"markets": [
+        {"marketId": f"{event_id}-{m}", "marketName": f"MARKET {m}", "bettingStatus": "Open",
+         "propositions": [dict(_odds(rng), id=f"{event_id}-{m}-{p}", name=f"SELECTION {p}")
+                          for p in range(settings.count(6))]}
+        for m in range(settings.count(8))
+    ]}
+
+
+def _events(settings, rng, sport):
+    return {"events": [
+        {"id": f"{sport}-{e}", "name": f"TEAM {e} V TEAM {e + 1}", "startTime": "2024-01-01T10:00:00.000Z",
+         "markets": [{"marketId": f"{sport}-{e}-{m}", "marketName": f"MARKET {m}"} for m in range(settings.count(5))]}
+        for e in range(settings.count(40))
+    ]}
+
+
+def info_payload(settings: FakeTabApiSettings, path: str):
+    """Return a generated response for an information service path, or None if it is unknown."""
+    rng = random.Random(path)
+    parts = path.strip("/").split("/")
+    if parts == ["sports"]:
+        return {"sports": [{"id": str(i), "name": f"SPORT{i}"} for i in range(settings.count(30))]}
+    if parts[0] == "sports" and parts[-1] == "competitions":
+        return {"competitions": [{"id": str(c), "name": f"COMPETITION {c}", "eventCount": rng.randint(0, 40)}
+                                 for c in range(settings.count(15))]}
+    if parts[0] == "sports" and parts[-1] == "events":
+        return _events(settings, rng, parts[1])
+    if parts == ["racing", "dates"]:
+        return {"dates": [{"meetingDate": f"2024-01-{day:02d}"} for day in range(1, 8)]}
+    if parts[:2] == ["racing", "dates"] and parts[-1] == "meetings":
+        return _meetings(settings, rng, parts[2])
+    if parts[:2] == ["racing", "dates"] and parts[-1] == "races":
+        return _races(settings, rng, parts[2], parts[4])
+    if parts[:2] == ["racing", "races"] and len(parts) == 3:
+        return _race(settings, rng, parts[2])
+    if parts[:2] == ["racing", "races"] and parts[3:4] == ["runners"]:
+        return _runner(rng, int(parts[4]) if parts[4].isdigit() else 1)
+    if parts[0] == "events" and parts[-1] in ("markets", "live-odds"):
+        return _markets(settings, rng, parts[1])
+    if parts[0] == "events" and len(parts) == 2:
+        return {"id": parts[1], "name": "TEAM A V TEAM B", "startTime": "2024-01-01T10:00:00.000Z"}
+    if parts[0] == "markets" and parts[-1] == "odds":
+        return {"marketId": parts[1], "propositions": [dict(_odds(rng), id=f"{parts[1]}-{p}") for p in range(settings.count(6))]}
+    return None
+
+
+def create_app(settings: FakeTabApiSettings) -> Starlette:
+    """Create the stand-in's Starlette app."""
+    stats = {"requests": 0, "errors": 0}
+
+    async def respond(request: Request, payload):
+        stats["requests"] += 1
+        await asyncio.sleep(settings.delay())
+        if settings.rng.random() < settings.error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "Injected error"}}, status_code=settings.error_status)
+        if payload is None:
+            return JSONResponse({"error": {"message": f"Unknown path: {request.url.path}"}}, status_code=404)
+        return JSONResponse(payload)
+
+    async def handle_token(request: Request):
+        await asyncio.sleep(settings.delay())
+        return JSONResponse({"access_token": uuid.uuid4().hex, "token_type": "Bearer", "expires_in": 3600})
+
+    async def handle_info(request: Request):
+        return await respond(request, info_payload(settings, request.path_params["path"]))
+
+    async def handle_account(request: Request):
+        path = request.path_params["path"].strip("/")
+        payloads = {
+            "accounts": {"accountNumber": "1234567", "name": "BENCHMARK"},
+            "accounts/balance": {"balance": 1000.0, "currency": "AUD"},
+            "accounts/transactions": {"transactions": [
+                {"id": str(t), "type": "BET", "amount": -5.0, "date": "2024-01-01"}
+                for t in range(settings.count(50))
+            ]},
+        }
+        return await respond(request, payloads.get(path))
+
+    async def handle_bets(request: Request):
+        if request.method == "POST":
+            return await respond(request, {"betId": uuid.uuid4().hex, "status": "ACCEPTED"})
+        return await respond(request, {"bets": [
+            {"betId": str(b), "status": "UNRESULTED", "stake": 5.0} for b in range(settings.count(20))
+        ]})
+
+    async def handle_active_bets(request: Request):
+        return await respond(request, {"bets": [{"betId": str(b), "status": "UNRESULTED"} for b in range(settings.count(5))]})
+
+    async def handle_cancel(request: Request):
+        return await respond(request, {"betId": request.path_params["bet_id"], "status": "CANCELLED"})
+
+    async def handle_stats(request: Request):
+        return JSONResponse(stats)
+
+    return Starlette(routes=[
+        Route("/oauth/token", endpoint=handle_token, methods=["POST"]),
+        Route("/v1/tab-info-service/{path:path}", endpoint=handle_info),
+        Route("/v1/account-service/{path:path}", endpoint=handle_account),
+        Route("/v1/tab-betting-service/bets", endpoint=handle_bets, methods=["GET", "POST"]),
+        Route("/v1/tab-betting-service/bets/active", endpoint=handle_active_bets),
+        Route("/v1/tab-betting-service/bets/{bet_id}/cancel", endpoint=handle_cancel, methods=["POST"]),
+        Route("/stats", endpoint=handle_stats),
+    ])
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the options describing the stand-in's behaviour."""
+    parser.add_argument('--latency', type=float, default=20, help='Median upstream response delay in milliseconds')
+    parser.add_argument('--latency-distribution', choices=LATENCY_DISTRIBUTIONS, default='lognormal',
+                        help='Distribution of upstream response delays')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Spread of the lognormal distribution')
+    parser.add_argument('--payload-scale', type=float, default=1, help='Multiplier for the number of items per response')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=503, help='Status code of injected errors')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for delays and injected errors')
+
+
+def settings_from_arguments(args) -> FakeTabApiSettings:
+    """Build the stand-in's settings from parsed options."""
+    return FakeTabApiSettings(args.latency, args.latency_distribution, args.latency_sigma,
+                              args.payload_scale, args.error_rate, args.error_status, args.seed)
+
+
+def main():
+    """Serve the stand-in until interrupted."""
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the TAB API')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind to')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(settings_from_arguments(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
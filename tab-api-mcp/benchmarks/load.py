@@ -0,0 +1,251 @@
+"""Measure tool throughput and latency against a local stand-in for the TAB API.
+
+Starts the stand-in from benchmarks.fake_tab_api in a subprocess (or uses
+one given by --api-base), points the shared HTTP client at it and calls
+the real tool functions of each server at each concurrency level for a
+fixed time. Results are printed as JSON with the throughput and the
+p50/p95/p99 latency overall and per tool.
+
+    python -m benchmarks.load --servers server,betting,combined --concurrency 1,8,32 \\
+        --duration 10 --latency 40 --error-rate 0.01 --output results.json
+
+The server options (e.g. --no-cache, --rate-limit, --hedge) are accepted
+too and apply as they would to a running server. The rate limiter starts
+each service at 50 requests per second and raises the rate while requests
+queue, since the stand-in never answers 429; pass --rate-limit 0 to measure
+without it from the start.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from tab_api_mcp import common, hedging, ratelimit, resilience, tracing
+from tab_api_mcp.common import add_common_arguments, apply_common_arguments, close_http_client
+
+from . import fake_tab_api
+
+DATE = "2024-01-01"
+
+# Distinct IDs per kind of object, so repeated calls hit the cache at a realistic rate
+ID_POOL = 50
+
+
+def _event(rng):
+    return f"Soccer-{rng.randrange(ID_POOL)}"
+
+
+def _market(rng):
+    return f"{_event(rng)}-{rng.randrange(5)}"
+
+
+def _race(rng):
+    return f"{DATE}-R{rng.randrange(16)}-{rng.randrange(1, 10)}"
+
+
+# Tool calls made against each server, as (tool name, arguments for a random generator)
+RACING_CALLS: List[Tuple[str, Callable[[random.Random], Dict[str, Any]]]] = [
+    ("get_sports", lambda rng: {}),
+    ("get_sport_competitions", lambda rng: {"sport_name": "Soccer"}),
+    ("get_racing_dates", lambda rng: {}),
+    ("get_racing_meetings", lambda rng: {"date": DATE}),
+    ("get_racing_races", lambda rng: {"date": DATE, "meeting_code": f"R{rng.randrange(16)}"}),
+    ("get_racing_day_snapshot", lambda rng: {"date": DATE, "depth": "races"}),
+]
+BETTING_CALLS: List[Tuple[str, Callable[[random.Random], Dict[str, Any]]]] = [
+    ("get_account_balance", lambda rng: {}),
+    ("get_transaction_history", lambda rng: {}),
+    ("get_bet_history", lambda rng: {}),
+    ("get_active_bets", lambda rng: {}),
+    ("place_bet", lambda rng: {"bet_type": "WIN", "stake": 5.0, "selections": [
+        {"eventId": _event(rng), "marketId": _market(rng), "selectionId": "1"}]}),
+    ("get_markets", lambda rng: {"event_id": _event(rng)}),
+    ("get_odds", lambda rng: {"market_id": _market(rng)}),
+    ("get_odds_batch", lambda rng: {"market_ids": [_market(rng) for _ in range(10)]}),
+    ("get_live_odds", lambda rng: {"event_id": _event(rng)}),
+    ("get_event_details", lambda rng: {"event_id": _event(rng)}),
+    ("get_race_details", lambda rng: {"race_id": _race(rng)}),
+    ("get_runner_details", lambda rng: {"race_id": _race(rng), "runner_id": str(rng.randrange(1, 15))}),
+    ("get_sport_events", lambda rng: {"sport_name": "Soccer", "competition_id": str(rng.randrange(15))}),
+]
+WORKLOADS = {
+    "server": RACING_CALLS,
+    "betting": BETTING_CALLS,
+    "combined": RACING_CALLS + BETTING_CALLS,
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_api(args) -> Tuple[subprocess.Popen, str]:
+    """Start the stand-in in a subprocess and wait until it answers."""
+    port = _free_port()
+    command = [sys.executable, "-m", "benchmarks.fake_tab_api", "--port", str(port),
+               "--latency", str(args.latency), "--latency-distribution", args.latency_distribution,
+               "--latency-sigma", str(args.latency_sigma), "--payload-scale", str(args.payload_scale),
+               "--error-rate", str(args.error_rate), "--error-status", str(args.error_status),
+               "--seed", str(args.seed)]
+    process = subprocess.Popen(command)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base}/stats").raise_for_status()
+            return process, base
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("The fake TAB API did not start within 10 seconds")
+
+
+def _percentile(ordered: List[float], percentile: float) -> float:
+    return ordered[min(len(ordered) - 1, int(percentile / 100 * len(ordered)))] if ordered else 0
+
+
+def summarise(latencies: List[float], errors: int, seconds: float) -> Dict[str, Any]:
+    """Return the call count, throughput and latency percentiles of a set of calls."""
+    ordered = sorted(latencies)
+    return {
+        "calls": len(ordered),
+        "errors": errors,
+        "throughput": round(len(ordered) / seconds, 2),
+        "latencyMs": {
+            "p50": round(_percentile(ordered, 50) * 1000, 3),
+            "p95": round(_percentile(ordered, 95) * 1000, 3),
+            "p99": round(_percentile(ordered, 99) * 1000, 3),
+            "mean": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0,
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0,
+        },
+    }
+
+
+def reset_state():
+    """Start a run from a cold cache and fresh admission control."""
+    common.response_cache.clear()
+    ratelimit.reset_rate_limiters()
+    resilience.reset_circuit_breakers()
+    hedging.reset_hedging()
+    tracing.clear_traces()
+
+
+async def run_level(module, calls, concurrency: int, duration: float, warmup: float, seed: int) -> Dict[str, Any]:
+    """Call a server's tools from concurrent workers and summarise the calls made after the warmup."""
+    reset_state()
+    await close_http_client()
+    tools = [(name, getattr(module, name), arguments) for name, arguments in calls]
+    results: Dict[str, List] = {name: [[], 0] for name, _, _ in tools}
+    start = time.monotonic()
+    measure_from = start + warmup
+    end = measure_from + duration
+    upstream = {}
+
+    async def worker(rng):
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                return
+            if now >= measure_from and not upstream:
+                upstream["before"] = common.request_stats["upstream"]
+            name, tool, arguments = rng.choice(tools)
+            called = time.monotonic()
+            result = await tool(**arguments(rng))
+            finished = time.monotonic()
+            if called >= measure_from and finished <= end:
+                results[name][0].append(finished - called)
+                results[name][1] += isinstance(result, str) and result.startswith("Error")
+
+    await asyncio.gather(*(worker(random.Random(seed + n)) for n in range(concurrency)))
+    await close_http_client()
+
+    latencies = [latency for tool_latencies, _ in results.values() for latency in tool_latencies]
+    errors = sum(tool_errors for _, tool_errors in results.values())
+    summary = summarise(latencies, errors, duration)
+    summary["concurrency"] = concurrency
+    summary["upstreamRequests"] = common.request_stats["upstream"] - upstream.get("before", common.request_stats["upstream"])
+    summary["tools"] = {name: summarise(tool_latencies, tool_errors, duration)
+                        for name, (tool_latencies, tool_errors) in sorted(results.items()) if tool_latencies}
+    return summary
+
+
+async def run(args, base: str) -> Dict[str, Any]:
+    common.TAB_API_BASE = base
+    common.TOKEN_ENDPOINT = f"{base}/oauth/token"
+    common.CLIENT_ID = common.CLIENT_ID or "benchmark"
+    common.CLIENT_SECRET = common.CLIENT_SECRET or "benchmark"
+
+    report = {"settings": {
+        "apiBase": base,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "latencyMs": args.latency,
+        "latencyDistribution": args.latency_distribution,
+        "payloadScale": args.payload_scale,
+        "errorRate": args.error_rate,
+        "cache": common.cache.CACHE_ENABLED,
+        "rateLimit": ratelimit.RATE_LIMIT,
+    }, "results": []}
+    for server in args.servers.split(","):
+        module = importlib.import_module(f"tab_api_mcp.{server}")
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            result = await run_level(module, WORKLOADS[server], concurrency, args.duration, args.warmup, args.seed)
+            report["results"].append(dict(result, server=server))
+            print(f"{server} x{concurrency}: {result['throughput']} calls/s, "
+                  f"p50 {result['latencyMs']['p50']}ms, p99 {result['latencyMs']['p99']}ms", file=sys.stderr)
+    return report
+
+
+def main():
+    """Run the load benchmark and print the results as JSON."""
+    parser = argparse.ArgumentParser(description='Benchmark tool throughput and latency against a fake TAB API')
+    parser.add_argument('--servers', default='server,betting,combined',
+                        help='Comma-separated servers whose tools are called (server, betting, combined)')
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated numbers of concurrent callers')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds measured per concurrency level')
+    parser.add_argument('--warmup', type=float, default=1, help='Seconds of calls made before measuring')
+    parser.add_argument('--api-base', help='Use an already running stand-in at this URL instead of starting one')
+    parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+    fake_tab_api.add_arguments(parser)
+    add_common_arguments(parser)
+    args = parser.parse_args()
+    for server in args.servers.split(","):
+        if server not in WORKLOADS:
+            parser.error(f"Unknown server: {server} (expected one of {', '.join(WORKLOADS)})")
+    apply_common_arguments(args)
+    # The MCP servers log every upstream request, which would dominate the measured time
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    process = None
+    base = args.api_base
+    if base is None:
+        process, base = start_fake_api(args)
+    try:
+        report = asyncio.run(run(args, base.rstrip("/")))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
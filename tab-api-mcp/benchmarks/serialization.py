@@ -0,0 +1,123 @@
+"""Compare the time and size of each tool output format.
+
+The payloads are generated to the shape and size of real TAB API responses:
+a day's meetings, a meeting's races, a race with full runner and form
+details, the sports catalog and an odds batch.
+
+    python -m benchmarks.serialization --iterations 200
+"""
+
+import argparse
+import random
+import time
+
+from tab_api_mcp import serialization
+from tab_api_mcp.serialization import dump_json
+
+VENUES = ["RANDWICK", "FLEMINGTON", "EAGLE FARM", "MORPHETTVILLE", "ASCOT", "DOOMBEN", "CAULFIELD", "ROSEHILL"]
+
+
+def _odds(rng):
+    return {
+        "returnWin": round(rng.uniform(1.5, 101), 2),
+        "returnPlace": round(rng.uniform(1.05, 21), 2),
+        "bettingStatus": "Open",
+        "allowPlace": True,
+        "differential": None,
+    }
+
+
+def _runner(rng, number):
+    return {
+        "runnerNumber": number,
+        "runnerName": f"RUNNER {number} {rng.choice(VENUES)}",
+        "barrierNumber": rng.randint(1, 20),
+        "handicapWeight": round(rng.uniform(52, 62), 1),
+        "riderDriverName": f"J {rng.choice(VENUES).title()}",
+        "trainerName": f"T {rng.choice(VENUES).title()}",
+        "last5Starts": "".join(rng.choice("123456789x0") for _ in range(5)),
+        "fixedOdds": _odds(rng),
+        "parimutuel": {"returnWin": round(rng.uniform(1.5, 101), 2), "returnPlace": round(rng.uniform(1.05, 21), 2)},
+        "form": {
+            "career": {"starts": rng.randint(0, 60), "wins": rng.randint(0, 15), "seconds": rng.randint(0, 15)},
+            "recentRuns": [
+                {"date": f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}", "venue": rng.choice(VENUES),
+                 "finish": rng.randint(1, 14), "distance": rng.choice([1000, 1200, 1400, 1600, 2000])}
+                for _ in range(5)
+            ],
+        },
+    }
+
+
+def _race(rng, number, runners=0):
+    race = {
+        "raceNumber": number,
+        "raceName": f"RACE {number} HANDICAP",
+        "raceStartTime": f"2024-01-01T0{number % 10}:30:00.000Z",
+        "raceDistance": rng.choice([1000, 1200, 1400, 1600, 2000]),
+        "raceStatus": "Open",
+        "raceClassConditions": "BM72",
+        "_links": {"self": f"/v1/tab-info-service/racing/races/{number}"},
+    }
+    if runners:
+        race["runners"] = [_runner(rng, n) for n in range(1, runners + 1)]
+    return race
+
+
+def build_payloads(seed=1):
+    """Return representative payloads keyed on the tool that returns them."""
+    rng = random.Random(seed)
+    meetings = {"meetings": [
+        {"meetingName": venue, "venueMnemonic": venue[:3], "raceType": "R", "meetingDate": "2024-01-01",
+         "weatherCondition": "FINE", "trackCondition": "GOOD4",
+         "races": [_race(rng, n) for n in range(1, 10)]}
+        for venue in VENUES * 4
+    ]}
+    return {
+        "get_meetings": meetings,
+        "get_races": {"races": [_race(rng, n) for n in range(1, 10)]},
+        "get_race": _race(rng, 1, runners=16),
+        "get_sports": {"sports": [
+            {"id": str(i), "name": f"SPORT {i}", "competitions": [
+                {"id": f"{i}-{c}", "name": f"COMPETITION {c}", "eventCount": rng.randint(0, 40)} for c in range(15)
+            ]}
+            for i in range(30)
+        ]},
+        "get_odds_batch": {"markets": {
+            str(m): {"propositions": [dict(_odds(rng), id=f"{m}-{p}", name=f"SELECTION {p}") for p in range(12)]}
+            for m in range(50)
+        }, "errors": {}},
+    }
+
+
+def measure(data, output_format, iterations):
+    """Return the mean seconds per dump and the size in bytes of the output."""
+    output = dump_json(data, output_format)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        dump_json(data, output_format)
+    return (time.perf_counter() - start) / iterations, len(output.encode())
+
+
+def main():
+    """Run the serialization benchmark and print a table of results.
+
+    The time and size columns are relative to the pretty format.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark tool output formats')
+    parser.add_argument('--iterations', type=int, default=100, help='Dumps per tool and format')
+    args = parser.parse_args()
+
+    print(f"orjson installed: {serialization.orjson is not None}")
+    print(f"{'tool':<16}{'format':<10}{'ms/dump':>10}{'bytes':>12}{'time':>8}{'size':>8}")
+    for tool, data in build_payloads().items():
+        baseline = None
+        for output_format in serialization.OUTPUT_FORMATS:
+            seconds, size = measure(data, output_format, args.iterations)
+            baseline = baseline or (seconds, size)
+            print(f"{tool:<16}{output_format:<10}{seconds * 1000:>10.3f}{size:>12}"
+                  f"{seconds / baseline[0]:>8.2f}{size / baseline[1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
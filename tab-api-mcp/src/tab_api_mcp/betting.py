@@ -1,16 +1,25 @@
 """TAB API Betting MCP Server for comprehensive betting functionality."""
 
-import json
 import argparse
 from typing import Dict, List
 import uvicorn
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
 from .common import (
     DEFAULT_JURISDICTION,
     make_tab_api_request,
     prompt_for_credentials,
     prompt_for_jurisdiction,
     create_starlette_app,
+    add_common_arguments,
+    apply_common_arguments,
+)
+from .serialization import project_fields, encode_response
+from .instrumentation import instrument_tool
+from .odds import (
+    fetch_odds_batch,
+    add_live_odds_subscriber,
+    remove_live_odds_subscriber,
+    versioned_odds,
 )
 
 # Initialize FastMCP server for TAB API Betting tools (SSE)
@@ -19,30 +28,33 @@ mcp = FastMCP("tab-api-betting")
 # Account Management Tools
 
 @mcp.tool()
+@instrument_tool
 async def get_account_details() -> str:
     """Get details about the user's TAB account."""
     endpoint = "/v1/account-service/accounts"
     
     try:
         data = await make_tab_api_request(endpoint)
-        return json.dumps(data, indent=2)
+        return await encode_response(data)
     except Exception as e:
         return f"Error fetching account details: {str(e)}"
 
 
 @mcp.tool()
+@instrument_tool
 async def get_account_balance() -> str:
     """Get the current balance of the user's TAB account."""
     endpoint = "/v1/account-service/accounts/balance"
     
     try:
         data = await make_tab_api_request(endpoint)
-        return json.dumps(data, indent=2)
+        return await encode_response(data)
     except Exception as e:
         return f"Error fetching account balance: {str(e)}"
 
 
 @mcp.tool()
+@instrument_tool
 async def get_transaction_history(from_date: str = None, to_date: str = None, transaction_type: str = None) -> str:
     """Get transaction history for the user's TAB account.
     
@@ -63,13 +75,14 @@ async def get_transaction_history(from_date: str = None, to_date: str = None, tr
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(data)
     except Exception as e:
         return f"Error fetching transaction history: {str(e)}"
 
 # Betting Tools
 
 @mcp.tool()
+@instrument_tool
 async def place_bet(
     bet_type: str, 
     selections: List[Dict], 
@@ -95,12 +108,13 @@ async def place_bet(
     
     try:
         response = await make_tab_api_request(endpoint, method="POST", data=data)
-        return json.dumps(response, indent=2)
+        return await encode_response(response)
     except Exception as e:
         return f"Error placing bet: {str(e)}"
 
 
 @mcp.tool()
+@instrument_tool
 async def get_bet_history(from_date: str = None, to_date: str = None, status: str = None) -> str:
     """Get betting history for the user's TAB account.
     
@@ -121,24 +135,26 @@ async def get_bet_history(from_date: str = None, to_date: str = None, status: st
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(data)
     except Exception as e:
         return f"Error fetching bet history: {str(e)}"
 
 
 @mcp.tool()
+@instrument_tool
 async def get_active_bets() -> str:
     """Get all active (unsettled) bets for the user's TAB account."""
     endpoint = "/v1/tab-betting-service/bets/active"
     
     try:
         data = await make_tab_api_request(endpoint)
-        return json.dumps(data, indent=2)
+        return await encode_response(data)
     except Exception as e:
         return f"Error fetching active bets: {str(e)}"
 
 
 @mcp.tool()
+@instrument_tool
 async def cancel_bet(bet_id: str) -> str:
     """Cancel a pending bet.
     
@@ -149,130 +165,206 @@ async def cancel_bet(bet_id: str) -> str:
     
     try:
         response = await make_tab_api_request(endpoint, method="POST")
-        return json.dumps(response, indent=2)
+        return await encode_response(response)
     except Exception as e:
         return f"Error cancelling bet: {str(e)}"
 
 # Markets and Odds Tools
 
 @mcp.tool()
-async def get_markets(event_id: str, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_markets(event_id: str, jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
     """Get available markets for a specific event.
     
     Args:
         event_id: ID of the event
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., markets.marketName,markets.propositions.name)
     """
     endpoint = f"/v1/tab-info-service/events/{event_id}/markets"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching markets for event {event_id}: {str(e)}"
 
 
 @mcp.tool()
-async def get_odds(market_id: str, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_odds(market_id: str, jurisdiction: str = DEFAULT_JURISDICTION, since_version: str = None, fields: str = None) -> str:
     """Get odds for a specific market.
     
+    The response includes an "oddsVersion" token. Pass it back as
+    since_version to get only the selections whose price or status changed.
+    
     Args:
         market_id: ID of the market
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        since_version: Optional oddsVersion from an earlier response
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., propositions.name,propositions.returnWin)
     """
     endpoint = f"/v1/tab-info-service/markets/{market_id}/odds"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        data = versioned_odds(f"market:{market_id}:{jurisdiction}", data, since_version, fields)
+        return await encode_response(data)
     except Exception as e:
         return f"Error fetching odds for market {market_id}: {str(e)}"
 
 
 @mcp.tool()
-async def get_live_odds(event_id: str, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool(deadline=60)
+async def get_odds_batch(market_ids: List[str], jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
+    """Get odds for several markets in one call.
+    
+    Args:
+        market_ids: IDs of the markets (duplicates are fetched once)
+        jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., propositions.name,propositions.returnWin)
+    """
+    try:
+        data = await fetch_odds_batch(market_ids, jurisdiction)
+        data["markets"] = {market_id: project_fields(odds, fields) for market_id, odds in data["markets"].items()}
+        return await encode_response(data)
+    except Exception as e:
+        return f"Error fetching odds for markets {', '.join(map(str, market_ids))}: {str(e)}"
+
+
+@mcp.tool()
+@instrument_tool
+async def get_live_odds(event_id: str, jurisdiction: str = DEFAULT_JURISDICTION, since_version: str = None, fields: str = None) -> str:
     """Get live odds updates for a specific event.
     
+    The response includes an "oddsVersion" token. Pass it back as
+    since_version to get only the selections whose price or status changed.
+    
     Args:
         event_id: ID of the event
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        since_version: Optional oddsVersion from an earlier response
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., markets.propositions.name,markets.propositions.returnWin)
     """
     endpoint = f"/v1/tab-info-service/events/{event_id}/live-odds"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        data = versioned_odds(f"event:{event_id}:{jurisdiction}", data, since_version, fields)
+        return await encode_response(data)
     except Exception as e:
         return f"Error fetching live odds for event {event_id}: {str(e)}"
 
+
+@mcp.tool()
+@instrument_tool
+async def subscribe_live_odds(event_id: str, ctx: Context, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+    """Subscribe to live odds changes for a specific event.
+    
+    Returns the current live odds. Afterwards, only the selections whose
+    price or status changed are pushed to this session as log notifications
+    from the "tab_api_mcp.live_odds" logger, until unsubscribe_live_odds is
+    called or the session ends.
+    
+    Args:
+        event_id: ID of the event
+        jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+    """
+    try:
+        data = await add_live_odds_subscriber(ctx.session, event_id, jurisdiction)
+        return await encode_response(data)
+    except Exception as e:
+        return f"Error subscribing to live odds for event {event_id}: {str(e)}"
+
+
+@mcp.tool()
+@instrument_tool
+async def unsubscribe_live_odds(event_id: str, ctx: Context, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+    """Stop live odds change notifications for a specific event.
+    
+    Args:
+        event_id: ID of the event
+        jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+    """
+    unsubscribed = remove_live_odds_subscriber(ctx.session, event_id, jurisdiction)
+    return await encode_response({"eventId": event_id, "jurisdiction": jurisdiction, "unsubscribed": unsubscribed})
+
 # Additional Sports and Racing Data Tools
 
 @mcp.tool()
-async def get_event_details(event_id: str, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_event_details(event_id: str, jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
     """Get detailed information about a specific event.
     
     Args:
         event_id: ID of the event
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., name,startTime)
     """
     endpoint = f"/v1/tab-info-service/events/{event_id}"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching details for event {event_id}: {str(e)}"
 
 
 @mcp.tool()
-async def get_race_details(race_id: str, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_race_details(race_id: str, jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
     """Get detailed information about a specific race.
     
     Args:
         race_id: ID of the race
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., runners.runnerName,runners.fixedOdds.returnWin)
     """
     endpoint = f"/v1/tab-info-service/racing/races/{race_id}"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching details for race {race_id}: {str(e)}"
 
 
 @mcp.tool()
-async def get_runner_details(race_id: str, runner_id: str, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_runner_details(race_id: str, runner_id: str, jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
     """Get detailed information about a specific runner in a race.
     
     Args:
         race_id: ID of the race
         runner_id: ID of the runner
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., runnerName,fixedOdds.returnWin)
     """
     endpoint = f"/v1/tab-info-service/racing/races/{race_id}/runners/{runner_id}"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching details for runner {runner_id} in race {race_id}: {str(e)}"
 
 
 @mcp.tool()
-async def get_sport_events(sport_name: str, competition_id: str = None, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_sport_events(sport_name: str, competition_id: str = None, jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
     """Get events for a specific sport and optionally a specific competition.
     
     Args:
         sport_name: Name of the sport (e.g., Rugby League, Soccer)
         competition_id: Optional ID of a specific competition
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., events.name,events.startTime)
     """
     if competition_id:
         endpoint = f"/v1/tab-info-service/sports/{sport_name}/competitions/{competition_id}/events"
@@ -283,7 +375,7 @@ async def get_sport_events(sport_name: str, competition_id: str = None, jurisdic
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching events for sport {sport_name}: {str(e)}"
 
@@ -294,7 +386,9 @@ def main():
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to')
     parser.add_argument('--port', type=int, default=8082, help='Port to listen on')
     parser.add_argument('--no-prompt', action='store_true', help='Skip prompting for credentials')
+    add_common_arguments(parser)
     args = parser.parse_args()
+    apply_common_arguments(args)
 
     print("=== TAB API Betting MCP Server ===")
     
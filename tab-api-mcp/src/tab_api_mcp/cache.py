@@ -0,0 +1,411 @@
+"""In-process response cache for TAB API GET requests."""
+
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urlencode
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+# Only responses from the information service are cached
+CACHEABLE_PREFIX = "/v1/tab-info-service/"
+
+# Cache settings
+CACHE_ENABLED = os.environ.get("TAB_CACHE_ENABLED", "1") != "0"
+CACHE_MAX_ENTRIES = int(os.environ.get("TAB_CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.environ.get("TAB_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Optional SQLite file that keeps cached responses across restarts
+CACHE_PATH = os.environ.get("TAB_CACHE_PATH", "")
+
+# Persisted responses older than this are discarded
+CACHE_PATH_MAX_AGE = 24 * 60 * 60
+
+# Seconds between prunes of persisted responses that can no longer be used
+CACHE_PRUNE_INTERVAL = 60 * 60
+
+# Most queued writes committed to the persistent cache in one transaction
+CACHE_WRITE_BATCH = 100
+
+# Serve expired responses immediately while refreshing them in the background
+STALE_WHILE_REVALIDATE = os.environ.get("TAB_CACHE_STALE_WHILE_REVALIDATE", "0") == "1"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Caching rules for a class of information service endpoints."""
+
+    name: str
+    pattern: re.Pattern
+    ttl: float
+    # Seconds past expiry that a stale response may still be served
+    # while it is refreshed (only with stale-while-revalidate enabled)
+    max_stale: float = 0
+    # Whether responses are written to the persistent cache, if one is open
+    persist: bool = True
+    # Whether odds payloads are held packed, with their prices in columns
+    # (see marketbook), and rebuilt for each caller
+    compact: bool = False
+
+
+# Endpoint classes, matched in order against the request path
+CACHE_POLICIES: List[CachePolicy] = [
+    CachePolicy("odds", re.compile(r"/(odds|live-odds)$"), 2, persist=False, compact=True),
+    CachePolicy("races", re.compile(r"/races(/.*)?$"), 15),
+    CachePolicy("meetings", re.compile(r"/meetings$"), 60),
+    CachePolicy("markets", re.compile(r"/events/[^/]+/markets$"), 30, compact=True),
+    CachePolicy("events", re.compile(r"/(events|markets)(/[^/]+)?$"), 30),
+    CachePolicy("catalog", re.compile(r"/(sports/?|competitions|racing/dates)$"), 600, max_stale=3600),
+]
+
+
+def get_cache_policy(endpoint: str) -> Optional[CachePolicy]:
+    """Return the caching policy for an endpoint, or None if it is not cacheable."""
+    if not endpoint.startswith(CACHEABLE_PREFIX):
+        return None
+    for policy in CACHE_POLICIES:
+        if policy.pattern.search(endpoint):
+            return policy
+    return None
+
+
+def cache_key(endpoint: str, params: Optional[Dict] = None) -> str:
+    """Build a cache key from an endpoint and its normalized query parameters."""
+    if not params:
+        return endpoint
+    items = sorted((str(k), str(v)) for k, v in params.items() if v is not None)
+    return f"{endpoint}?{urlencode(items)}" if items else endpoint
+
+
+class CacheEntry:
+    """A cached response body, its expiry time and its HTTP validators."""
+
+    __slots__ = ("data", "size", "stored_at", "expires_at", "stale_until", "etag", "last_modified")
+
+    def __init__(self, data: Any, size: int, stored_at: float, expires_at: float,
+                 stale_until: Optional[float] = None,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.data = data
+        self.size = size
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.stale_until = expires_at if stale_until is None else stale_until
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, now: float) -> bool:
+        """Return True if the entry has not yet expired."""
+        return self.expires_at > now
+
+    def is_servable_stale(self, now: float) -> bool:
+        """Return True if the expired entry is still within its max-staleness window."""
+        return self.stale_until > now
+
+    def has_validators(self) -> bool:
+        """Return True if the entry can be revalidated with a conditional request."""
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Return the headers that ask upstream to confirm the entry is unchanged."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """A TTL cache with least-recently-used eviction bounded by entries and bytes.
+
+    Entry sizes are the size of the upstream response body, which is used as an
+    approximation of the memory held by the decoded data. Cached data is shared
+    between callers and must not be mutated.
+
+    Expired entries that carry an ETag or Last-Modified validator, or that
+    are still within their max-staleness window, are kept (until evicted) so
+    they can be revalidated or served stale.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self.stale_hits = 0
+        self.store: Optional["DiskCacheStore"] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the fresh entry for a key, counting the lookup as a hit or miss."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and not entry.is_fresh(now):
+            if not entry.has_validators() and not entry.is_servable_stale(now):
+                self._discard(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for a key, fresh or not, without counting a lookup."""
+        return self._entries.get(key)
+
+    def get_stale(self, key: str) -> Optional[CacheEntry]:
+        """Return an expired entry that is still within its max-staleness window."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is None or entry.is_fresh(now) or not entry.is_servable_stale(now):
+            return None
+
+        self._entries.move_to_end(key)
+        self.stale_hits += 1
+        return entry
+
+    def set(self, key: str, data: Any, ttl: float, size: int = 0,
+            etag: Optional[str] = None, last_modified: Optional[str] = None,
+            max_stale: float = 0, body: Optional[bytes] = None) -> CacheEntry:
+        """Store a response body for ttl seconds, evicting old entries if needed.
+
+        If a persistent store is attached and the raw body is given, the
+        entry is also written through to disk.
+        """
+        now = time.time()
+        entry = CacheEntry(data, size, now, now + ttl, now + ttl + max_stale, etag, last_modified)
+        self._insert(key, entry)
+
+        if self.store is not None and body is not None:
+            self.store.save(key, entry, body)
+        return entry
+
+    def revalidate(self, key: str, ttl: float, max_stale: float = 0) -> Optional[CacheEntry]:
+        """Renew an entry for ttl seconds after upstream confirmed it is unchanged."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        now = time.time()
+        entry.stored_at = now
+        entry.expires_at = now + ttl
+        entry.stale_until = now + ttl + max_stale
+        self._entries.move_to_end(key)
+        self.revalidations += 1
+
+        if self.store is not None:
+            self.store.update_expiry(key, entry)
+        return entry
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self._entries.clear()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self.stale_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "revalidations": self.revalidations,
+            "stale_hits": self.stale_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _insert(self, key: str, entry: CacheEntry):
+        self._remove(key)
+        self._entries[key] = entry
+        self.total_bytes += entry.size
+        self._evict()
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+    def _discard(self, key: str):
+        """Remove an entry from memory and from the persistent store."""
+        self._remove(key)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self.total_bytes -= entry.size
+            self.evictions += 1
+            if self.store is not None:
+                self.store.delete(key)
+
+
+class DiskCacheStore:
+    """SQLite (WAL mode) store that keeps cached responses across restarts.
+
+    Responses are written through as their raw upstream bodies, one row per
+    cache key. Writes are queued to a single writer thread with its own
+    connection, which commits them in batches, so the event loop never waits
+    on the disk. Rows are deleted when their entries leave the in-memory
+    cache, and rows that can no longer be used are pruned periodically, so
+    the file stays about the size of the cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, expires_at REAL NOT NULL, stale_until REAL NOT NULL, "
+            "etag TEXT, last_modified TEXT)"
+        )
+        self._connection.commit()
+        # Statements waiting for the writer thread, and None to stop it
+        self._writes: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="tab-api-cache-writer", daemon=True)
+        self._writer.start()
+
+    def _write_loop(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        next_prune = time.monotonic() + CACHE_PRUNE_INTERVAL
+        try:
+            while True:
+                try:
+                    batch = [self._writes.get(timeout=max(0.0, next_prune - time.monotonic()))]
+                except queue.Empty:
+                    batch = []
+                while batch and batch[-1] is not None and len(batch) < CACHE_WRITE_BATCH:
+                    try:
+                        batch.append(self._writes.get_nowait())
+                    except queue.Empty:
+                        break
+
+                try:
+                    for write in batch:
+                        if write is not None:
+                            connection.execute(*write)
+                    if time.monotonic() >= next_prune:
+                        self._prune(connection)
+                        next_prune = time.monotonic() + CACHE_PRUNE_INTERVAL
+                    connection.commit()
+                except sqlite3.Error as e:
+                    connection.rollback()
+                    print(f"Error writing to the persistent cache {self.path}: {str(e)}")
+                finally:
+                    for _ in batch:
+                        self._writes.task_done()
+                if batch and batch[-1] is None:
+                    return
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _prune(connection: sqlite3.Connection):
+        """Delete rows that can no longer be served or revalidated."""
+        now = time.time()
+        connection.execute(
+            "DELETE FROM responses WHERE stored_at < ? OR "
+            "(stale_until <= ? AND etag IS NULL AND last_modified IS NULL)",
+            (now - CACHE_PATH_MAX_AGE, now),
+        )
+
+    def save(self, key: str, entry: CacheEntry, body: bytes):
+        """Queue a write of a cache entry and its raw response body."""
+        self._writes.put((
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, body, entry.size, entry.stored_at, entry.expires_at, entry.stale_until,
+             entry.etag, entry.last_modified),
+        ))
+
+    def update_expiry(self, key: str, entry: CacheEntry):
+        """Queue a write of the new expiry of a revalidated entry."""
+        self._writes.put((
+            "UPDATE responses SET stored_at = ?, expires_at = ?, stale_until = ? WHERE key = ?",
+            (entry.stored_at, entry.expires_at, entry.stale_until, key),
+        ))
+
+    def delete(self, key: str):
+        """Queue the removal of an entry that left the in-memory cache."""
+        self._writes.put(("DELETE FROM responses WHERE key = ?", (key,)))
+
+    def flush(self):
+        """Wait until every queued write has been committed."""
+        self._writes.join()
+
+    def load_into(self, cache: ResponseCache) -> int:
+        """Load the stored responses that are still usable into a cache.
+
+        Rows that can no longer be served or revalidated are deleted first.
+        Returns the number of entries loaded.
+        """
+        self._prune(self._connection)
+        self._connection.commit()
+
+        loaded = 0
+        rows = self._connection.execute(
+            "SELECT key, body, size, stored_at, expires_at, stale_until, etag, last_modified "
+            "FROM responses ORDER BY stored_at"
+        )
+        for key, body, size, stored_at, expires_at, stale_until, etag, last_modified in rows:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                continue
+            cache._insert(key, CacheEntry(data, size, stored_at, expires_at, stale_until, etag, last_modified))
+            loaded += 1
+        return loaded
+
+    def close(self):
+        """Commit the queued writes, stop the writer thread and close the database."""
+        self._writes.put(None)
+        self._writer.join()
+        self._connection.close()
+
+
+# Shared response cache for all servers in the process
+response_cache = ResponseCache()
+
+
+def open_persistent_cache(path: str = None) -> int:
+    """Attach a persistent store to the shared cache and load what it holds.
+
+    Returns the number of responses loaded, or 0 if no path is configured.
+    """
+    path = path or CACHE_PATH
+    if not path or response_cache.store is not None:
+        return 0
+
+    response_cache.store = DiskCacheStore(path)
+    return response_cache.store.load_into(response_cache)
+
+
+def close_persistent_cache():
+    """Detach and close the persistent store of the shared cache."""
+    if response_cache.store is not None:
+        store, response_cache.store = response_cache.store, None
+        store.close()
@@ -1,6 +1,8 @@
 """Common functionality for TAB API MCP servers."""
 
 from typing import Any, Dict, Optional
+import asyncio
+import contextlib
 import httpx
 import os
 import json
@@ -11,6 +13,8 @@ from starlette.requests import Request
 from starlette.routing import Mount, Route
 from mcp.server import Server
 from mcp.server.sse import SseServerTransport
+from . import cache, deadlines, hedging, instrumentation, loopmonitor, marketbook, metrics, offload, profiling, ratelimit, resilience, serialization, tracing
+from .cache import response_cache, get_cache_policy, cache_key
 
 # Constants
 TAB_API_BASE = "https://api.beta.tab.com.au"
@@ -27,6 +31,187 @@ access_token_cache = {
     "expires_at": 0
 }
 
+# Seconds before expiry at which the access token is refreshed in the background
+TOKEN_REFRESH_MARGIN = float(os.environ.get("TAB_TOKEN_REFRESH_MARGIN", "60"))
+
+# Seconds to wait before retrying a failed background token refresh
+TOKEN_RETRY_DELAY = 5
+
+# Fewest seconds between background token refreshes, whatever the token lifetime and margin
+TOKEN_MIN_REFRESH_INTERVAL = 1
+
+# In-flight token request shared by concurrent callers
+_token_request_task: Optional[asyncio.Task] = None
+
+# Background task that refreshes the token before it expires
+_token_refresher_task: Optional[asyncio.Task] = None
+
+# Upstream GET requests in flight, keyed on endpoint and params
+_inflight_requests: Dict[str, asyncio.Task] = {}
+
+# Callers waiting on each shared in-flight request
+_inflight_waiters: Dict[asyncio.Task, int] = {}
+
+# Counters for upstream requests and callers that joined one already in flight
+request_stats = {
+    "upstream": 0,
+    "coalesced": 0
+}
+
+# Connection pool settings for the shared upstream HTTP client
+HTTP_MAX_CONNECTIONS = int(os.environ.get("TAB_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("TAB_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("TAB_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.environ.get("TAB_HTTP_TIMEOUT", "30"))
+
+# Prefetch today's racing meetings and races into the cache at startup
+WARM_CACHE = os.environ.get("TAB_WARM_CACHE", "0") == "1"
+WARM_CONCURRENCY = int(os.environ.get("TAB_WARM_CONCURRENCY", "8"))
+
+# Maximum concurrent upstream requests made by a single fan-out tool call
+FANOUT_CONCURRENCY = int(os.environ.get("TAB_FANOUT_CONCURRENCY", "10"))
+
+# Shared upstream HTTP client (created lazily or by the app lifespan)
+http_client: Optional[httpx.AsyncClient] = None
+
+
+class TabApiError(Exception):
+    """A failed TAB API request, with the upstream HTTP status if there was one."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create an HTTP client that keeps connections to the TAB API alive."""
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=HTTP_TIMEOUT)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global http_client
+
+    if http_client is None or http_client.is_closed:
+        http_client = create_http_client()
+    return http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client and release its pooled connections."""
+    global http_client
+
+    if http_client is not None:
+        client, http_client = http_client, None
+        await client.aclose()
+
+
+def add_common_arguments(parser):
+    """Add the command line options shared by all TAB API MCP servers."""
+    parser.add_argument('--max-connections', type=int, default=HTTP_MAX_CONNECTIONS,
+                        help='Maximum number of upstream connections')
+    parser.add_argument('--max-keepalive-connections', type=int, default=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                        help='Maximum number of idle upstream connections kept alive')
+    parser.add_argument('--keepalive-expiry', type=float, default=HTTP_KEEPALIVE_EXPIRY,
+                        help='Seconds an idle upstream connection is kept alive')
+    parser.add_argument('--token-refresh-margin', type=float, default=TOKEN_REFRESH_MARGIN,
+                        help='Seconds before expiry at which the access token is refreshed')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the response cache')
+    parser.add_argument('--stale-while-revalidate', action='store_true', default=cache.STALE_WHILE_REVALIDATE,
+                        help='Serve expired catalog responses immediately and refresh them in the background')
+    parser.add_argument('--cache-max-entries', type=int, default=cache.CACHE_MAX_ENTRIES,
+                        help='Maximum number of cached responses')
+    parser.add_argument('--cache-max-bytes', type=int, default=cache.CACHE_MAX_BYTES,
+                        help='Maximum total size of cached responses in bytes')
+    parser.add_argument('--cache-path', default=cache.CACHE_PATH,
+                        help='SQLite file that keeps cached responses across restarts')
+    parser.add_argument('--fanout-concurrency', type=int, default=FANOUT_CONCURRENCY,
+                        help='Maximum concurrent upstream requests made by a single tool call')
+    parser.add_argument('--warm-cache', action='store_true', default=WARM_CACHE,
+                        help="Prefetch today's racing meetings and races at startup")
+    parser.add_argument('--warm-concurrency', type=int, default=WARM_CONCURRENCY,
+                        help='Maximum concurrent requests while warming the cache')
+    parser.add_argument('--rate-limit', type=float, default=ratelimit.RATE_LIMIT,
+                        help='Requests per second sent to each TAB service (0 disables rate limiting)')
+    parser.add_argument('--rate-limit-burst', type=int, default=ratelimit.RATE_LIMIT_BURST,
+                        help='Requests that may be sent to a TAB service at once after an idle period')
+    parser.add_argument('--retries', type=int, default=resilience.RETRY_MAX_RETRIES,
+                        help='Extra attempts made for a GET after a transient upstream failure')
+    parser.add_argument('--circuit-failure-threshold', type=int, default=resilience.CIRCUIT_FAILURE_THRESHOLD,
+                        help='Consecutive failures after which requests to a TAB service fail fast')
+    parser.add_argument('--circuit-reset-timeout', type=float, default=resilience.CIRCUIT_RESET_TIMEOUT,
+                        help='Seconds requests to a failing TAB service fail fast before it is tried again')
+    parser.add_argument('--hedge', action='store_true', default=hedging.HEDGE_ENABLED,
+                        help='Send a backup request for information service GETs that are unusually slow')
+    parser.add_argument('--hedge-percentile', type=float, default=hedging.HEDGE_PERCENTILE,
+                        help='Percentile of recent latency after which a backup request is sent')
+    parser.add_argument('--hedge-budget', type=float, default=hedging.HEDGE_BUDGET,
+                        help='Most backup requests sent, as a fraction of eligible requests')
+    parser.add_argument('--tool-deadline', type=float, default=deadlines.TOOL_DEADLINE,
+                        help='Seconds a tool call may take, including its upstream requests (0 for no limit)')
+    parser.add_argument('--tool-deadline-for', action='append', default=[], metavar='TOOL=SECONDS',
+                        help='Deadline for one tool, overriding --tool-deadline (may be repeated)')
+    parser.add_argument('--no-tracing', action='store_true', help='Do not record traces of tool calls')
+    parser.add_argument('--trace-buffer-size', type=int, default=tracing.TRACE_BUFFER_SIZE,
+                        help='Number of recent tool call traces kept for /debug/traces')
+    parser.add_argument('--enable-profiling', action='store_true', default=profiling.PROFILING_ENABLED,
+                        help='Serve /debug/profile and /debug/memory for profiling the running server')
+    parser.add_argument('--output-format', choices=serialization.OUTPUT_FORMATS, default=serialization.OUTPUT_FORMAT,
+                        help='How tool responses are written: pretty, compact or fast (compact, using orjson if installed)')
+    parser.add_argument('--offload-threshold', type=int, default=offload.OFFLOAD_THRESHOLD,
+                        help='Bytes from which payloads are decoded and encoded on a worker thread (0 to never offload)')
+    parser.add_argument('--offload-workers', type=int, default=offload.OFFLOAD_WORKERS,
+                        help='Worker threads for decoding and encoding large payloads')
+    parser.add_argument('--no-loop-monitor', action='store_true', help='Do not measure event loop lag or watch for blocking calls')
+    parser.add_argument('--blocking-threshold', type=float, default=loopmonitor.BLOCKING_THRESHOLD,
+                        help='Seconds the event loop may be blocked before the blocking call is logged')
+
+
+def apply_common_arguments(args):
+    """Apply the shared command line options to the module settings."""
+    global HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY
+    global TOKEN_REFRESH_MARGIN, FANOUT_CONCURRENCY, WARM_CACHE, WARM_CONCURRENCY
+
+    HTTP_MAX_CONNECTIONS = args.max_connections
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = args.max_keepalive_connections
+    HTTP_KEEPALIVE_EXPIRY = args.keepalive_expiry
+    TOKEN_REFRESH_MARGIN = args.token_refresh_margin
+    FANOUT_CONCURRENCY = args.fanout_concurrency
+    WARM_CACHE = args.warm_cache
+    WARM_CONCURRENCY = args.warm_concurrency
+
+    cache.CACHE_ENABLED = cache.CACHE_ENABLED and not args.no_cache
+    cache.STALE_WHILE_REVALIDATE = args.stale_while_revalidate
+    response_cache.max_entries = args.cache_max_entries
+    response_cache.max_bytes = args.cache_max_bytes
+    cache.CACHE_PATH = args.cache_path
+    ratelimit.RATE_LIMIT = args.rate_limit
+    ratelimit.RATE_LIMIT_BURST = args.rate_limit_burst
+    ratelimit.reset_rate_limiters()
+    resilience.RETRY_MAX_RETRIES = args.retries
+    resilience.CIRCUIT_FAILURE_THRESHOLD = args.circuit_failure_threshold
+    resilience.CIRCUIT_RESET_TIMEOUT = args.circuit_reset_timeout
+    deadlines.TOOL_DEADLINE = args.tool_deadline
+    for override in args.tool_deadline_for:
+        name, _, seconds = override.partition("=")
+        deadlines.TOOL_DEADLINES[name.strip()] = float(seconds)
+    hedging.HEDGE_ENABLED = args.hedge
+    hedging.HEDGE_PERCENTILE = args.hedge_percentile
+    hedging.HEDGE_BUDGET = args.hedge_budget
+    tracing.TRACING_ENABLED = tracing.TRACING_ENABLED and not args.no_tracing
+    tracing.set_buffer_size(args.trace_buffer_size)
+    profiling.PROFILING_ENABLED = args.enable_profiling
+    serialization.set_output_format(args.output_format)
+    offload.OFFLOAD_THRESHOLD = args.offload_threshold
+    offload.OFFLOAD_WORKERS = args.offload_workers
+    loopmonitor.LOOP_MONITOR_ENABLED = loopmonitor.LOOP_MONITOR_ENABLED and not args.no_loop_monitor
+    loopmonitor.BLOCKING_THRESHOLD = args.blocking_threshold
+
 
 def prompt_for_credentials():
     """Prompt the user for TAB API credentials."""
@@ -51,17 +236,9 @@ def prompt_for_credentials():
     print("TAB API credentials set successfully.")
 
 
-async def get_access_token() -> str:
-    """Get an access token for the TAB API using client credentials."""
-    if not CLIENT_ID or not CLIENT_SECRET:
-        raise ValueError("TAB API credentials are not set")
-    
-    # Check if we have a valid token in cache
+async def _request_access_token() -> str:
+    """Request a new access token from the TAB API and cache it."""
     current_time = int(time.time())
-    if access_token_cache["token"] and access_token_cache["expires_at"] > current_time:
-        return access_token_cache["token"]
-    
-    # Request a new token
     data = {
         "grant_type": "client_credentials",
         "client_id": CLIENT_ID,
@@ -71,53 +248,524 @@ async def get_access_token() -> str:
         "Content-Type": "application/x-www-form-urlencoded"
     }
     
-    async with httpx.AsyncClient() as client:
+    client = get_http_client()
+    try:
         response = await client.post(TOKEN_ENDPOINT, data=data, headers=headers)
         response.raise_for_status()
         token_data = response.json()
-        
-        # Cache the token
-        access_token_cache["token"] = token_data["access_token"]
-        access_token_cache["expires_in"] = token_data.get("expires_in", 3600)
-        access_token_cache["expires_at"] = current_time + token_data.get("expires_in", 3600)
-        
-        return token_data["access_token"]
+    except Exception:
+        metrics.TOKEN_REFRESHES.inc("error")
+        raise
+    metrics.TOKEN_REFRESHES.inc("success")
+    
+    # Cache the token
+    access_token_cache["token"] = token_data["access_token"]
+    access_token_cache["expires_in"] = token_data.get("expires_in", 3600)
+    access_token_cache["expires_at"] = current_time + token_data.get("expires_in", 3600)
+    
+    return token_data["access_token"]
 
 
-async def make_tab_api_request(endpoint: str, method: str = "GET", params: Dict = None, data: Dict = None) -> Dict[str, Any]:
-    """Make a request to the TAB API with proper error handling."""
-    token = await get_access_token()
+async def refresh_access_token() -> str:
+    """Request a new access token, sharing one in-flight request between callers."""
+    global _token_request_task
+
+    if not CLIENT_ID or not CLIENT_SECRET:
+        raise ValueError("TAB API credentials are not set")
+
+    if _token_request_task is None or _token_request_task.done():
+        _token_request_task = asyncio.ensure_future(_request_access_token())
+
+    # Shield the shared request so one cancelled caller does not fail the others
+    return await asyncio.shield(_token_request_task)
+
+
+async def get_access_token() -> str:
+    """Get an access token for the TAB API using client credentials."""
+    if not CLIENT_ID or not CLIENT_SECRET:
+        raise ValueError("TAB API credentials are not set")
     
+    # Check if we have a valid token in cache
+    current_time = int(time.time())
+    if access_token_cache["token"] and access_token_cache["expires_at"] > current_time:
+        return access_token_cache["token"]
+    
+    return await refresh_access_token()
+
+
+def invalidate_access_token(token: str):
+    """Drop the cached access token if it is still the given (rejected) token."""
+    if access_token_cache.get("token") == token:
+        access_token_cache["token"] = None
+        access_token_cache["expires_at"] = 0
+
+
+async def _refresh_access_token_periodically():
+    """Keep the cached access token fresh ahead of its expiry."""
+    while True:
+        # Refresh no earlier than halfway through a token's lifetime, so a margin
+        # longer than a short-lived token does not trigger refreshes back-to-back
+        expires_in = access_token_cache.get("expires_in")
+        margin = min(TOKEN_REFRESH_MARGIN, expires_in / 2) if expires_in is not None else TOKEN_REFRESH_MARGIN
+        delay = access_token_cache.get("expires_at", 0) - margin - time.time()
+        if access_token_cache.get("token") and delay > 0:
+            # The token may be replaced while we sleep, so re-check afterwards
+            await asyncio.sleep(delay)
+            continue
+
+        try:
+            await refresh_access_token()
+        except Exception as e:
+            print(f"Error refreshing TAB API access token: {str(e)}")
+            await asyncio.sleep(TOKEN_RETRY_DELAY)
+            continue
+        await asyncio.sleep(TOKEN_MIN_REFRESH_INTERVAL)
+
+
+def start_token_refresher():
+    """Start refreshing the access token in the background."""
+    global _token_refresher_task
+
+    if not CLIENT_ID or not CLIENT_SECRET:
+        return
+    if _token_refresher_task is None or _token_refresher_task.done():
+        _token_refresher_task = asyncio.ensure_future(_refresh_access_token_periodically())
+
+
+async def stop_token_refresher():
+    """Stop the background access token refresh."""
+    global _token_refresher_task
+
+    if _token_refresher_task is not None:
+        task, _token_refresher_task = _token_refresher_task, None
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+async def _send_request(client: httpx.AsyncClient, method: str, url: str, token: str,
+                        params: Dict = None, data: Dict = None,
+                        extra_headers: Dict[str, str] = None) -> httpx.Response:
+    """Send a single authorised request to the TAB API."""
     headers = {
         "Authorization": f"Bearer {token}",
         "Accept": "application/json"
     }
+    if extra_headers:
+        headers.update(extra_headers)
+    
+    # Give up in time for the tool call's deadline
+    timeout = deadlines.request_timeout(HTTP_TIMEOUT)
     
-    url = f"{TAB_API_BASE}{endpoint}"
+    # Split the request into pool wait, connect, send, time to first byte and download
+    http_trace = tracing.start_http_trace()
+    extensions = {"trace": http_trace} if http_trace is not None else None
     
-    async with httpx.AsyncClient() as client:
+    try:
+        if method == "GET":
+            return await client.get(url, headers=headers, params=params, timeout=timeout, extensions=extensions)
+        elif method == "POST":
+            headers["Content-Type"] = "application/json"
+            return await client.post(url, headers=headers, json=data, timeout=timeout, extensions=extensions)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+    finally:
+        if http_trace is not None:
+            http_trace.finish()
+
+
+async def _send_observed_request(client: httpx.AsyncClient, method: str, endpoint: str, token: str,
+                                 params: Dict = None, data: Dict = None,
+                                 extra_headers: Dict[str, str] = None) -> httpx.Response:
+    """Send a request to the TAB API, recording its latency per endpoint template."""
+    status = "error"
+    metrics.UPSTREAM_IN_FLIGHT.inc()
+    start = time.monotonic()
+    try:
+        response = await _send_request(client, method, f"{TAB_API_BASE}{endpoint}", token, params, data, extra_headers)
+        status = str(response.status_code)
+        return response
+    except asyncio.CancelledError:
+        status = "cancelled"
+        raise
+    finally:
+        metrics.UPSTREAM_IN_FLIGHT.dec()
+        metrics.UPSTREAM_DURATION.observe(time.monotonic() - start, method, hedging.endpoint_template(endpoint), status)
+
+
+async def _send_rate_limited_request(client: httpx.AsyncClient, method: str, endpoint: str, token: str,
+                                     params: Dict = None, data: Dict = None,
+                                     extra_headers: Dict[str, str] = None) -> httpx.Response:
+    """Send a request once its service family's rate limiter admits it.
+    
+    A 429 slows the limiter down (honouring Retry-After) and the request is
+    queued again, since a throttled request was not processed upstream.
+    """
+    limiter = ratelimit.get_rate_limiter(endpoint)
+    if limiter is None:
+        return await _send_observed_request(client, method, endpoint, token, params, data, extra_headers)
+    
+    for _ in range(ratelimit.RATE_LIMIT_MAX_RETRIES + 1):
+        with tracing.span("rate_limit_wait"):
+            await limiter.acquire()
+        response = await _send_observed_request(client, method, endpoint, token, params, data, extra_headers)
+        if response.status_code != 429:
+            limiter.on_success()
+            break
+        limiter.on_throttled(ratelimit.parse_retry_after(response.headers.get("Retry-After")))
+        print(f"TAB API throttled {ratelimit.service_family(endpoint)} requests; "
+              f"rate lowered to {limiter.rate:.1f}/s")
+    return response
+
+
+async def _send_authorized_request(client: httpx.AsyncClient, method: str, endpoint: str,
+                                   params: Dict = None, data: Dict = None,
+                                   extra_headers: Dict[str, str] = None) -> httpx.Response:
+    """Send a request with the current access token, replaying it once on a 401."""
+    with tracing.span("token"):
+        token = await get_access_token()
+    response = await _send_rate_limited_request(client, method, endpoint, token, params, data, extra_headers)
+    
+    # The token was rejected (e.g. revoked early), so refresh it once and replay
+    if response.status_code == 401:
+        invalidate_access_token(token)
+        with tracing.span("token", refreshed=True):
+            token = await get_access_token()
+        response = await _send_rate_limited_request(client, method, endpoint, token, params, data, extra_headers)
+    return response
+
+
+async def _send_timed_request(client: httpx.AsyncClient, endpoint: str, template: str,
+                             params: Dict = None, extra_headers: Dict[str, str] = None) -> httpx.Response:
+    """Send a GET and record its latency for hedging if it succeeds."""
+    start = time.monotonic()
+    response = await _send_authorized_request(client, "GET", endpoint, params, None, extra_headers)
+    if response.status_code < 400:
+        hedging.record_latency(template, time.monotonic() - start)
+    return response
+
+
+async def _send_hedged_request(client: httpx.AsyncClient, endpoint: str, params: Dict = None,
+                               extra_headers: Dict[str, str] = None) -> httpx.Response:
+    """Send a GET, racing a backup request against it if it is unusually slow.
+    
+    Once the first request has taken longer than the configured percentile
+    of recent latencies for its endpoint template, an identical request is
+    sent (within the hedge budget). The first successful response wins and
+    the other request is cancelled.
+    """
+    template = hedging.endpoint_template(endpoint)
+    delay = hedging.hedge_delay(template)
+    if delay is None:
+        return await _send_timed_request(client, endpoint, template, params, extra_headers)
+    
+    primary = asyncio.ensure_future(_send_timed_request(client, endpoint, template, params, extra_headers))
+    pending = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done or not hedging.spend_hedge_budget():
+            return await primary
+        
+        backup = asyncio.ensure_future(_send_timed_request(client, endpoint, template, params, extra_headers))
+        pending.add(backup)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                winner = succeeded[0]
+                if winner is backup:
+                    hedging.hedge_stats["backup_wins"] += 1
+                return winner.result()
+            # A failed request only loses while the other one can still answer
+            if not pending:
+                return done.pop().result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _request_tab_api(endpoint: str, method: str = "GET", params: Dict = None, data: Dict = None,
+                           extra_headers: Dict[str, str] = None) -> httpx.Response:
+    """Send a request to the TAB API and return the successful (or 304) response.
+    
+    GETs that fail with a network error or a retryable status are retried
+    with jittered exponential backoff, honouring Retry-After. Requests to a
+    service whose circuit is open fail fast with CircuitOpenError.
+    """
+    client = get_http_client()
+    breaker = resilience.get_circuit_breaker(endpoint)
+    attempts = resilience.RETRY_MAX_RETRIES + 1 if method == "GET" else 1
+    
+    for attempt in range(attempts):
+        breaker.before_request()
+        # A timeout cut short by the deadline says nothing about the service's health
+        remaining = deadlines.remaining_time()
+        cut_short = remaining is not None and remaining < HTTP_TIMEOUT
         try:
-            if method == "GET":
-                response = await client.get(url, headers=headers, params=params)
-            elif method == "POST":
-                headers["Content-Type"] = "application/json"
-                response = await client.post(url, headers=headers, json=data)
+            if method == "GET" and hedging.HEDGE_ENABLED and endpoint.startswith(cache.CACHEABLE_PREFIX):
+                response = await _send_hedged_request(client, endpoint, params, extra_headers)
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+                response = await _send_authorized_request(client, method, endpoint, params, data, extra_headers)
+        except httpx.TimeoutException as e:
+            if not cut_short:
+                breaker.record_failure()
+            delay = resilience.backoff_delay(attempt)
+            if attempt + 1 == attempts or not deadlines.has_time_for(delay):
+                if cut_short:
+                    raise deadlines.DeadlineExceeded("Deadline exceeded while waiting for the TAB API") from e
+                raise
+            await asyncio.sleep(delay)
+            continue
+        except httpx.TransportError:
+            breaker.record_failure()
+            delay = resilience.backoff_delay(attempt)
+            if attempt + 1 == attempts or not deadlines.has_time_for(delay):
+                raise
+            await asyncio.sleep(delay)
+            continue
+        
+        if response.status_code not in resilience.RETRY_STATUSES:
+            breaker.record_success()
+            break
+        breaker.record_failure()
+        delay = resilience.backoff_delay(attempt, ratelimit.parse_retry_after(response.headers.get("Retry-After")))
+        if attempt + 1 == attempts or delay is None or not deadlines.has_time_for(delay):
+            break
+        await asyncio.sleep(delay)
+    
+    # Not Modified answers a conditional request for a cached response
+    if extra_headers and response.status_code == 304:
+        return response
+    
+    response.raise_for_status()
+    return response
+
+
+async def _load_tab_api_data(endpoint: str, method: str, params: Dict, data: Dict,
+                             key: str, policy: Optional[cache.CachePolicy]) -> Any:
+    """Fetch and decode a TAB API response, storing it in the cache if allowed.
+    
+    An expired cache entry with validators is revalidated with a conditional
+    request, and a 304 response renews it without transferring the body.
+    """
+    stale = response_cache.peek(key) if policy is not None else None
+    conditional_headers = stale.conditional_headers() if stale is not None else None
+    
+    request_stats["upstream"] += 1
+    try:
+        response = await _request_tab_api(endpoint, method, params, data, conditional_headers)
+        if response.status_code == 304:
+            entry = response_cache.revalidate(key, policy.ttl, policy.max_stale)
+            if entry is not None:
+                offload.note_payload(entry.size)
+                return marketbook.expand_prices(entry.data)
+            # The entry was evicted while we waited, so fetch the body again
+            response = await _request_tab_api(endpoint, method, params, data)
+        size = len(response.content)
+        offload.note_payload(size)
+        with tracing.span("decode", bytes=size, offloaded=offload.should_offload(size)):
+            result = await offload.run_blocking("decode", size, response.json)
+    except httpx.HTTPStatusError as e:
+        error_message = f"HTTP error: {e.response.status_code}"
+        try:
+            error_data = e.response.json()
+            if "error" in error_data:
+                error_message = f"{error_message} - {error_data['error'].get('message', '')}"
+        except:
+            pass
+        raise TabApiError(error_message, e.response.status_code)
+    except resilience.CircuitOpenError as e:
+        raise TabApiError(str(e))
+    except Exception as e:
+        raise TabApiError(f"Error making TAB API request: {str(e) or type(e).__name__}")
+    
+    if policy is not None:
+        # Odds are held packed, so a day's open markets fit in memory
+        stored = result
+        if policy.compact:
+            stored = await offload.run_blocking("compact", size, marketbook.compact_prices, result)
+        response_cache.set(key, stored, policy.ttl, size,
+                           etag=response.headers.get("ETag"),
+                           last_modified=response.headers.get("Last-Modified"),
+                           max_stale=policy.max_stale,
+                           body=response.content if policy.persist else None)
+    return result
+
+
+def _forget_inflight_request(key: str, task: asyncio.Task):
+    """Remove a finished request from the in-flight table."""
+    if _inflight_requests.get(key) is task:
+        del _inflight_requests[key]
+
+
+async def _load_shared_request(endpoint: str, params: Dict, key: str, policy: Optional[cache.CachePolicy]) -> Any:
+    """Load a GET shared by identical calls, free of the deadline of the call that started it.
+
+    Each caller waits only as long as its own deadline allows, and the
+    request is cancelled once the last of them has gone.
+    """
+    deadlines.clear_deadline()
+    return await _load_tab_api_data(endpoint, "GET", params, None, key, policy)
+
+
+async def _refresh_in_background(endpoint: str, params: Dict, key: str, policy: cache.CachePolicy) -> Any:
+    """Refresh a cached response independently of the tool call that found it stale."""
+    instrumentation.detach_from_tool_call()
+    return await _load_tab_api_data(endpoint, "GET", params, None, key, policy)
+
+
+def _start_inflight_request(endpoint: str, params: Dict, key: str,
+                            policy: Optional[cache.CachePolicy], background: bool = False) -> asyncio.Task:
+    """Return the in-flight GET for a key, starting one if none is running.
+
+    A background request (a stale-while-revalidate refresh) is detached from
+    the calling tool call, which returns without waiting for it.
+    """
+    task = _inflight_requests.get(key)
+    if task is None:
+        if background:
+            task = asyncio.ensure_future(_refresh_in_background(endpoint, params, key, policy))
+        else:
+            task = asyncio.ensure_future(_load_shared_request(endpoint, params, key, policy))
+        _inflight_requests[key] = task
+        task.add_done_callback(lambda done: _forget_inflight_request(key, done))
+    else:
+        request_stats["coalesced"] += 1
+    return task
+
+
+async def _await_inflight_request(key: str, task: asyncio.Task) -> Any:
+    """Wait on a shared in-flight request until the caller's deadline, cancelling it once no caller is left."""
+    _inflight_waiters[task] = _inflight_waiters.get(task, 0) + 1
+    timeout = asyncio.timeout(deadlines.remaining_time())
+    try:
+        # Shield the shared request so one cancelled caller does not fail the others
+        async with timeout:
+            return await asyncio.shield(task)
+    except TimeoutError:
+        if not timeout.expired():
+            raise
+        raise TabApiError("Deadline exceeded while waiting for the TAB API") from None
+    finally:
+        _inflight_waiters[task] -= 1
+        if not _inflight_waiters[task]:
+            del _inflight_waiters[task]
+            # Every caller gave up, so stop the upstream request and free its connection.
+            # Forget it first, so a caller arriving before it finishes starts a new one
+            # rather than joining a cancelled request.
+            if not task.done():
+                _forget_inflight_request(key, task)
+                task.cancel()
+
+
+def _report_background_refresh(task: asyncio.Task):
+    """Log the outcome of a background cache refresh nobody is waiting on."""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error refreshing cached TAB API response: {str(task.exception())}")
+
+
+async def make_tab_api_request(endpoint: str, method: str = "GET", params: Dict = None, data: Dict = None) -> Dict[str, Any]:
+    """Make a request to the TAB API with proper error handling.
+    
+    GET requests to the information service are served from the response
+    cache while a fresh copy is held, and identical GETs already in flight
+    share a single upstream request, which is cancelled if every caller
+    waiting on it is. With stale-while-revalidate enabled,
+    an expired response still within its policy's max-staleness window is
+    returned immediately and refreshed in the background. Requests that do
+    go upstream wait their turn in their service family's rate limiter.
+    Odds payloads are cached packed and rebuilt for each caller.
+    Returned data may be shared between callers and must not be mutated.
+    """
+    with tracing.span("request", method=method, endpoint=endpoint) as request_span:
+        key = cache_key(endpoint, params)
+        policy = get_cache_policy(endpoint) if method == "GET" and cache.CACHE_ENABLED else None
+        if policy is not None:
+            entry = response_cache.get(key)
+            if entry is not None:
+                tracing.annotate(request_span, cache="hit")
+                offload.note_payload(entry.size)
+                return marketbook.expand_prices(entry.data)
             
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            error_message = f"HTTP error: {e.response.status_code}"
-            try:
-                error_data = e.response.json()
-                if "error" in error_data:
-                    error_message = f"{error_message} - {error_data['error'].get('message', '')}"
-            except:
-                pass
-            raise Exception(error_message)
-        except Exception as e:
-            raise Exception(f"Error making TAB API request: {str(e)}")
+            if cache.STALE_WHILE_REVALIDATE and policy.max_stale > 0:
+                entry = response_cache.get_stale(key)
+                if entry is not None:
+                    if key not in _inflight_requests:
+                        task = _start_inflight_request(endpoint, params, key, policy, background=True)
+                        task.add_done_callback(_report_background_refresh)
+                    tracing.annotate(request_span, cache="stale")
+                    offload.note_payload(entry.size)
+                    return marketbook.expand_prices(entry.data)
+        
+        if method != "GET":
+            return await _load_tab_api_data(endpoint, method, params, data, key, policy)
+        
+        # The shared request runs without the caller's deadline, so check it here
+        if not deadlines.has_time_for(0):
+            raise TabApiError("Deadline exceeded before the request was sent")
+        coalesced = key in _inflight_requests
+        tracing.annotate(request_span, cache="coalesced" if coalesced else "miss")
+        task = _start_inflight_request(endpoint, params, key, policy)
+        result = await _await_inflight_request(key, task)
+        if coalesced:
+            # The request that was joined counted its payload for its own caller
+            entry = response_cache.peek(key)
+            if entry is not None:
+                offload.note_payload(entry.size)
+        return result
+
+
+def http_pool_stats() -> Optional[Dict[str, int]]:
+    """Return the number of active and idle pooled connections, and queued requests.
+    
+    Returns None when the shared client has no connection pool (e.g. it is
+    closed or uses a mock transport).
+    """
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    if pool is None:
+        return None
+    connections = list(pool.connections)
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "active": len(connections) - idle,
+        "idle": idle,
+        "queued": sum(1 for request in pool._requests if request.is_queued()),  # noqa: SLF001
+    }
+
+
+def _collect_metrics():
+    """Update the point-in-time metrics before they are rendered."""
+    metrics.SHARED_REQUESTS_IN_FLIGHT.set(len(_inflight_requests))
+    metrics.COALESCED_REQUESTS.set(request_stats["coalesced"])
+    
+    metrics.POOL_MAX_CONNECTIONS.set(HTTP_MAX_CONNECTIONS)
+    pool = http_pool_stats()
+    if pool is not None:
+        for state, count in pool.items():
+            metrics.POOL_CONNECTIONS.set(count, state)
+    
+    lookups = response_cache.hits + response_cache.misses
+    metrics.CACHE_REQUESTS.set(response_cache.hits, "hit")
+    metrics.CACHE_REQUESTS.set(response_cache.stale_hits, "stale")
+    metrics.CACHE_REQUESTS.set(response_cache.misses, "miss")
+    metrics.CACHE_REQUESTS.set(response_cache.revalidations, "revalidated")
+    metrics.CACHE_HIT_RATIO.set(response_cache.hits / lookups if lookups else 0)
+    metrics.CACHE_ENTRIES.set(len(response_cache))
+    metrics.CACHE_BYTES.set(response_cache.total_bytes)
+    metrics.CACHE_EVICTIONS.set(response_cache.evictions)
+    
+    for service, stats in ratelimit.rate_limit_stats().items():
+        metrics.RATE_LIMIT.set(stats["rate"], service)
+        metrics.RATE_LIMIT_WAITING.set(stats["waiting"], service)
+        metrics.RATE_LIMIT_THROTTLED.set(stats["throttled"], service)
+    for service, stats in resilience.circuit_breaker_stats().items():
+        metrics.CIRCUIT_OPEN.set({"closed": 0, "half-open": 0.5, "open": 1}[stats["state"]], service)
+    metrics.HEDGED_REQUESTS.set(hedging.hedge_stats["hedged"], "sent")
+    metrics.HEDGED_REQUESTS.set(hedging.hedge_stats["backup_wins"], "won")
+    metrics.HEDGED_REQUESTS.set(hedging.hedge_stats["over_budget"], "over_budget")
+
+
+metrics.register_collector(_collect_metrics)
 
 
 def prompt_for_jurisdiction():
@@ -150,24 +798,29 @@ def prompt_for_jurisdiction():
 
 def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlette:
     """Create a Starlette application that can serve the provided mcp server with SSE."""
-    from starlette.responses import JSONResponse
+    from starlette.responses import JSONResponse, PlainTextResponse
     sse = SseServerTransport("/messages/")
 
     async def handle_sse(request: Request) -> None:
+        from .odds import live_odds_connection
+        metrics.SSE_SESSIONS.inc()
         try:
-            async with sse.connect_sse(
-                    request.scope,
-                    request.receive,
-                    request._send,  # noqa: SLF001
-            ) as (read_stream, write_stream):
-                await mcp_server.run(
-                    read_stream,
-                    write_stream,
-                    mcp_server.create_initialization_options(),
-                )
+            with live_odds_connection():
+                async with sse.connect_sse(
+                        request.scope,
+                        request.receive,
+                        request._send,  # noqa: SLF001
+                ) as (read_stream, write_stream):
+                    await mcp_server.run(
+                        read_stream,
+                        write_stream,
+                        mcp_server.create_initialization_options(),
+                    )
         except Exception as e:
             print(f"Error in SSE connection: {str(e)}")
             raise
+        finally:
+            metrics.SSE_SESSIONS.dec()
 
     async def handle_root(request: Request) -> JSONResponse:
         """Handle the root route."""
@@ -177,15 +830,101 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
             "status": "running",
             "endpoints": {
                 "sse": "/sse",
-                "messages": "/messages/"
+                "messages": "/messages/",
+                "metrics": "/metrics",
+                "traces": "/debug/traces"
             }
         })
 
+    async def handle_metrics(request: Request) -> PlainTextResponse:
+        """Handle the metrics route."""
+        return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
+    async def handle_traces(request: Request) -> JSONResponse:
+        """Handle the traces route: the slowest recent tool calls and a per-tool breakdown."""
+        try:
+            limit = int(request.query_params.get("limit", "10"))
+        except ValueError:
+            return JSONResponse({"error": "limit must be an integer"}, status_code=400)
+        return JSONResponse(tracing.trace_report(limit=limit, tool=request.query_params.get("tool")))
+
+    def profiling_disabled() -> JSONResponse:
+        return JSONResponse({"error": "Profiling is disabled; start the server with --enable-profiling"},
+                            status_code=404)
+
+    async def handle_profile(request: Request) -> PlainTextResponse:
+        """Handle the profile route: profile the event loop for ?seconds=N."""
+        if not profiling.PROFILING_ENABLED:
+            return profiling_disabled()
+        query = request.query_params
+        try:
+            output = await profiling.profile(float(query.get("seconds", "10")), mode=query.get("mode", "sample"),
+                                             sort=query.get("sort", "cumulative"), limit=int(query.get("limit", "50")))
+        except profiling.ProfilerBusy as e:
+            return JSONResponse({"error": str(e)}, status_code=409)
+        except (ValueError, KeyError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return PlainTextResponse(output)
+
+    async def handle_memory(request: Request) -> JSONResponse:
+        """Handle the memory route: top allocators and their growth since the last call."""
+        if not profiling.PROFILING_ENABLED:
+            return profiling_disabled()
+        try:
+            limit = int(request.query_params.get("limit", "20"))
+        except ValueError:
+            return JSONResponse({"error": "limit must be an integer"}, status_code=400)
+        return JSONResponse(profiling.memory_report(limit=limit, stop=request.query_params.get("stop") == "1"))
+
+    async def warm_cache():
+        from .racing import warm_racing_cache
+        try:
+            stats = await warm_racing_cache()
+            print(f"Warmed TAB API cache for {stats['date']} in {stats['duration']}s: "
+                  f"{stats['requests']} requests ({stats['upstream_requests']} upstream), "
+                  f"{stats['meetings']} meetings, {stats['races']} races, {stats['errors']} errors")
+        except Exception as e:
+            print(f"Error warming TAB API cache: {str(e)}")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette):
+        """Open the shared upstream HTTP client, token refresher and persistent cache for the lifetime of the app."""
+        loopmonitor.start_loop_monitor()
+        await close_http_client()
+        get_http_client()
+        if cache.CACHE_ENABLED and cache.CACHE_PATH:
+            loaded = cache.open_persistent_cache()
+            print(f"Loaded {loaded} cached TAB API responses from {cache.CACHE_PATH}")
+        start_token_refresher()
+        # Warm in the background so the server starts accepting connections right away
+        warm_task = None
+        if WARM_CACHE and cache.CACHE_ENABLED and CLIENT_ID and CLIENT_SECRET:
+            warm_task = asyncio.ensure_future(warm_cache())
+        try:
+            yield
+        finally:
+            if warm_task is not None:
+                warm_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await warm_task
+            from .odds import stop_live_odds_pollers
+            await stop_live_odds_pollers()
+            await stop_token_refresher()
+            await close_http_client()
+            cache.close_persistent_cache()
+            await asyncio.get_running_loop().run_in_executor(None, offload.shutdown_executor)
+            await loopmonitor.stop_loop_monitor()
+
     return Starlette(
         debug=debug,
+        lifespan=lifespan,
         routes=[
             Route("/", endpoint=handle_root),
             Route("/sse", endpoint=handle_sse),
+            Route("/metrics", endpoint=handle_metrics),
+            Route("/debug/traces", endpoint=handle_traces),
+            Route("/debug/profile", endpoint=handle_profile),
+            Route("/debug/memory", endpoint=handle_memory),
             Mount("/messages/", app=sse.handle_post_message),
         ],
     )
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Deadlines that bound the upstream work done for a tool call."""
+
+from contextvars import ContextVar
+from typing import Dict, Optional
+import contextlib
+import os
+import time
+
+# Seconds a tool call may take, including every upstream request it makes (0 for no limit)
+TOOL_DEADLINE = float(os.environ.get("TAB_TOOL_DEADLINE", "30"))
+
+# Per-tool deadlines set on the command line, overriding the tool's own default
+TOOL_DEADLINES: Dict[str, float] = {}
+
+# Monotonic time by which the current tool call must finish
+_deadline: ContextVar[Optional[float]] = ContextVar("tab_api_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting upstream work after a tool call's deadline."""
+
+
+def tool_deadline(name: str, default: Optional[float] = None) -> float:
+    """Return the deadline in seconds for a tool."""
+    if name in TOOL_DEADLINES:
+        return TOOL_DEADLINES[name]
+    return default if default is not None else TOOL_DEADLINE
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: float):
+    """Run the enclosed code under a deadline, keeping any earlier one in force.
+
+    Tasks started inside the scope inherit the deadline, so fan-out
+    requests share the budget of the tool call that made them.
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def clear_deadline():
+    """Remove the deadline from the current context, for long-lived background tasks."""
+    _deadline.set(None)
+
+
+def remaining_time() -> Optional[float]:
+    """Return the seconds left before the current deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def has_time_for(seconds: float) -> bool:
+    """Return whether waiting this long still leaves time before the deadline."""
+    remaining = remaining_time()
+    return remaining is None or seconds < remaining
+
+
+def request_timeout(default: float) -> float:
+    """Return the timeout for an upstream request: the default, cut short by the deadline."""
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    if remaining <= 0:
+        raise DeadlineExceeded("Deadline exceeded before the request was sent")
+    return min(default, remaining)
@@ -0,0 +1,118 @@
+"""Hedged requests: a second identical GET when the first is unusually slow."""
+
+from collections import deque
+from typing import Deque, Dict, Optional
+import math
+import os
+import re
+
+# Send a backup request for slow information service GETs
+HEDGE_ENABLED = os.environ.get("TAB_HEDGE", "0") == "1"
+
+# The backup is sent once the first request has taken longer than this
+# percentile of recent latencies for the same endpoint template
+HEDGE_PERCENTILE = float(os.environ.get("TAB_HEDGE_PERCENTILE", "95"))
+
+# Backups sent, as a fraction of eligible requests, and the most that can be saved up
+HEDGE_BUDGET = float(os.environ.get("TAB_HEDGE_BUDGET", "0.05"))
+HEDGE_BUDGET_BURST = 10.0
+
+# Never hedge sooner than this, nor before enough latencies have been seen
+HEDGE_MIN_DELAY = 0.05
+HEDGE_MIN_SAMPLES = 20
+
+# Recent latencies kept per endpoint template
+LATENCY_WINDOW = 200
+
+# Path segments that name a resource rather than identify one
+_LITERAL_SEGMENTS = frozenset({
+    "v1", "tab-info-service", "tab-betting-service", "account-service",
+    "racing", "dates", "meetings", "races", "runners", "sports", "competitions",
+    "events", "markets", "odds", "live-odds", "bets", "active", "cancel",
+    "accounts", "balance", "transactions",
+})
+
+_REPEATED_PLACEHOLDERS = re.compile(r"(/\{\})+")
+
+
+def endpoint_template(endpoint: str) -> str:
+    """Return an endpoint with its identifiers replaced by {}.
+
+    e.g. /v1/tab-info-service/racing/dates/2024-01-01/meetings/R/RAN/races
+    becomes /v1/tab-info-service/racing/dates/{}/meetings/{}/races, so that
+    latencies of the same kind of request are grouped together.
+    """
+    segments = [segment if segment in _LITERAL_SEGMENTS else "{}" for segment in endpoint.strip("/").split("/")]
+    return _REPEATED_PLACEHOLDERS.sub("/{}", "/" + "/".join(segments))
+
+
+class LatencyWindow:
+    """The most recent latencies of one endpoint template."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Return the given percentile of the recent latencies, if there are any."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(percentile / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+# Recent latencies per endpoint template
+_latencies: Dict[str, LatencyWindow] = {}
+
+# Backups that may still be sent; each eligible request adds HEDGE_BUDGET
+_budget = {"tokens": HEDGE_BUDGET_BURST}
+
+hedge_stats = {
+    "eligible": 0,
+    "hedged": 0,
+    "backup_wins": 0,
+    "over_budget": 0,
+}
+
+
+def record_latency(template: str, seconds: float):
+    """Record how long a successful request to an endpoint template took."""
+    window = _latencies.get(template)
+    if window is None:
+        window = _latencies[template] = LatencyWindow()
+    window.record(seconds)
+
+
+def hedge_delay(template: str) -> Optional[float]:
+    """Return how long to wait before hedging a request, or None not to hedge it.
+
+    Each call counts as an eligible request and adds to the hedge budget.
+    """
+    hedge_stats["eligible"] += 1
+    _budget["tokens"] = min(HEDGE_BUDGET_BURST, _budget["tokens"] + HEDGE_BUDGET)
+
+    window = _latencies.get(template)
+    if window is None or len(window.samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return max(HEDGE_MIN_DELAY, window.percentile(HEDGE_PERCENTILE))
+
+
+def spend_hedge_budget() -> bool:
+    """Take one backup request from the budget, if any is left."""
+    if _budget["tokens"] < 1:
+        hedge_stats["over_budget"] += 1
+        return False
+    _budget["tokens"] -= 1
+    hedge_stats["hedged"] += 1
+    return True
+
+
+def reset_hedging():
+    """Forget recorded latencies, refill the budget and zero the counters."""
+    _latencies.clear()
+    _budget["tokens"] = HEDGE_BUDGET_BURST
+    for name in hedge_stats:
+        hedge_stats[name] = 0
@@ -0,0 +1,78 @@
+"""Wrapping of MCP tool functions with per-call deadlines, metrics and tracing."""
+
+from typing import Any, Callable, Optional
+import asyncio
+import functools
+import time
+
+from . import deadlines, loopmonitor, metrics, offload, tracing
+
+
+def _is_error(result: Any) -> bool:
+    """Return whether a tool result reports an error (tools return errors as text)."""
+    return isinstance(result, str) and result.startswith("Error")
+
+
+async def _call_with_deadline(func: Callable, name: str, seconds: float, args, kwargs) -> Any:
+    """Call a tool, cancelling it if it is still running after the given seconds."""
+    if seconds <= 0:
+        return await func(*args, **kwargs)
+    timeout = asyncio.timeout(seconds)
+    with deadlines.deadline_scope(seconds):
+        try:
+            async with timeout:
+                return await func(*args, **kwargs)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            return f"Error: {name} did not finish within its {seconds:g}s deadline"
+
+
+def detach_from_tool_call():
+    """Detach a background task from the tool call that started it.
+
+    Tasks copy the context of the call that creates them, so without this a
+    task that outlives the call would keep its deadline, add spans to its
+    finished trace and count towards its tool in the loop monitor and the
+    offload threshold.
+    """
+    deadlines.clear_deadline()
+    tracing.detach()
+    loopmonitor.detach()
+    offload.detach()
+
+
+def instrument_tool(func: Callable = None, *, deadline: Optional[float] = None) -> Callable:
+    """Wrap a tool so that each call runs under a deadline, is measured and is traced.
+
+    Apply it below @mcp.tool(), either bare or as
+    @instrument_tool(deadline=seconds) to give a slow tool a longer default.
+    The deadline is passed to every upstream request the call makes, and a
+    call still running when it expires is cancelled along with its
+    upstream work.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            metrics.TOOL_CALLS.inc(name)
+            metrics.TOOL_CALLS_IN_PROGRESS.inc()
+            start = time.monotonic()
+            failed = True
+            try:
+                with tracing.trace_tool(name) as trace, loopmonitor.tool_scope(name), offload.payload_scope():
+                    result = await _call_with_deadline(func, name, deadlines.tool_deadline(name, deadline), args, kwargs)
+                    failed = _is_error(result)
+                    return result
+            finally:
+                if trace is not None:
+                    trace.error = failed
+                metrics.TOOL_CALLS_IN_PROGRESS.dec()
+                metrics.TOOL_DURATION.observe(time.monotonic() - start, name)
+                if failed:
+                    metrics.TOOL_ERRORS.inc(name)
+
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
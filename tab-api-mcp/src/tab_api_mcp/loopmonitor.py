@@ -0,0 +1,145 @@
+"""Event loop lag monitoring and detection of work that blocks the loop."""
+
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import asyncio
+import contextlib
+import os
+import sys
+import threading
+import time
+
+from . import metrics
+
+# Measure event loop lag while the server is running
+LOOP_MONITOR_ENABLED = os.environ.get("TAB_LOOP_MONITOR", "1") != "0"
+
+# Seconds between lag measurements
+LOOP_LAG_INTERVAL = 0.1
+
+# Seconds the loop may be stalled before the blocking work is logged
+BLOCKING_THRESHOLD = float(os.environ.get("TAB_BLOCKING_THRESHOLD", "0.25"))
+
+# Tool whose call is running in the current context
+_current_tool: ContextVar[Optional[str]] = ContextVar("tab_api_tool", default=None)
+
+# The blocking section running on the loop right now, read by the watchdog thread
+_activity: Dict[str, Any] = {}
+
+# Monotonic time of the monitor's last tick on the loop
+_heartbeat = {"at": 0.0}
+
+_monitor_task: Optional[asyncio.Task] = None
+_watchdog: Optional["Watchdog"] = None
+
+
+@contextlib.contextmanager
+def tool_scope(name: str):
+    """Mark the enclosed code as running for a tool."""
+    token = _current_tool.set(name)
+    try:
+        yield
+    finally:
+        _current_tool.reset(token)
+
+
+def detach():
+    """Stop attributing blocking work in the current context to a tool."""
+    _current_tool.set(None)
+
+
+@contextlib.contextmanager
+def blocking_section(stage: str, size: Optional[int] = None, unit: str = "bytes"):
+    """Mark synchronous work that may hold the loop, such as decoding a payload.
+
+    If the watchdog finds the loop stalled, it reports this stage, the
+    tool it runs for and the payload size (in bytes, or another unit).
+    """
+    previous = dict(_activity)
+    _activity.clear()
+    _activity.update(stage=stage, tool=_current_tool.get(), size=size, unit=unit)
+    try:
+        yield
+    finally:
+        _activity.clear()
+        _activity.update(previous)
+
+
+def describe_activity(activity: Optional[Dict[str, Any]] = None) -> str:
+    """Describe a snapshot of the blocking section in progress, taking one if none is given.
+
+    The loop changes the section while the watchdog reads it, so a report
+    reads only from a single copy.
+    """
+    if activity is None:
+        activity = dict(_activity)
+    if not activity:
+        return "outside any marked section"
+    size = f" of {activity['size']} {activity['unit']}" if activity.get("size") is not None else ""
+    return f"in {activity['stage']}{size} for tool {activity['tool'] or '(none)'}"
+
+
+class Watchdog(threading.Thread):
+    """Logs when the event loop stops answering for longer than the threshold."""
+
+    def __init__(self, loop_thread_id: int):
+        super().__init__(name="tab-api-loop-watchdog", daemon=True)
+        self.loop_thread_id = loop_thread_id
+        self.stopped = threading.Event()
+        self.reported_heartbeat = None
+
+    def _loop_frame(self) -> str:
+        frame = sys._current_frames().get(self.loop_thread_id)  # noqa: SLF001
+        if frame is None:
+            return "unknown"
+        return f"{frame.f_code.co_name} ({frame.f_code.co_filename}:{frame.f_lineno})"
+
+    def run(self):
+        while not self.stopped.wait(LOOP_LAG_INTERVAL):
+            heartbeat = _heartbeat["at"]
+            stalled = time.monotonic() - heartbeat - LOOP_LAG_INTERVAL
+            # Report each stall once, while it is still happening
+            if stalled > BLOCKING_THRESHOLD and heartbeat != self.reported_heartbeat:
+                self.reported_heartbeat = heartbeat
+                activity = dict(_activity)
+                metrics.LOOP_BLOCKED.inc(activity.get("tool") or "none")
+                print(f"Event loop blocked for {stalled:.2f}s {describe_activity(activity)}, at {self._loop_frame()}")
+
+    def stop(self):
+        self.stopped.set()
+
+
+async def _measure_lag():
+    """Measure how late the loop runs a callback scheduled at a fixed interval."""
+    while True:
+        _heartbeat["at"] = start = time.monotonic()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lag = max(0.0, time.monotonic() - start - LOOP_LAG_INTERVAL)
+        metrics.LOOP_LAG.observe(lag)
+        metrics.LOOP_LAG_LAST.set(lag)
+
+
+def start_loop_monitor():
+    """Start measuring loop lag and watching for blocking work."""
+    global _monitor_task, _watchdog
+
+    if not LOOP_MONITOR_ENABLED or (_monitor_task is not None and not _monitor_task.done()):
+        return
+    _heartbeat["at"] = time.monotonic()
+    _monitor_task = asyncio.ensure_future(_measure_lag())
+    _watchdog = Watchdog(threading.get_ident())
+    _watchdog.start()
+
+
+async def stop_loop_monitor():
+    """Stop the lag monitor and its watchdog thread."""
+    global _monitor_task, _watchdog
+
+    if _watchdog is not None:
+        _watchdog.stop()
+        _watchdog = None
+    if _monitor_task is not None:
+        task, _monitor_task = _monitor_task, None
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
@@ -0,0 +1,330 @@
+"""Market prices held in compact array-backed columns instead of nested dicts."""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+from array import array
+import math
+import time
+
+# Keys used by the TAB API for selections and their prices
+SELECTION_LIST_KEYS = ("selections", "propositions", "runners")
+SELECTION_ID_KEYS = ("selectionId", "propositionId", "id", "runnerNumber")
+PRICE_CONTAINER_KEYS = ("fixedOdds", "odds")
+WIN_PRICE_KEYS = ("winPrice", "returnWin", "price")
+PLACE_PRICE_KEYS = ("placePrice", "returnPlace")
+STATUS_KEYS = ("status", "bettingStatus")
+
+
+def _first_key(item: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[str]:
+    for key in keys:
+        if item.get(key) is not None:
+            return key
+    return None
+
+
+def _first(item: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    key = _first_key(item, keys)
+    return item[key] if key is not None else None
+
+
+def _is_selection(item: Any) -> bool:
+    return isinstance(item, dict) and _first(item, SELECTION_ID_KEYS) is not None
+
+
+def _price_container(item: Dict[str, Any]) -> Optional[str]:
+    return next((key for key in PRICE_CONTAINER_KEYS if isinstance(item.get(key), dict)), None)
+
+
+def _collect_selections(data: Any, market_id: Optional[str], selections: Dict[str, Dict[str, Any]]):
+    if isinstance(data, list):
+        for item in data:
+            _collect_selections(item, market_id, selections)
+        return
+    if not isinstance(data, dict):
+        return
+
+    for key, value in data.items():
+        if key in SELECTION_LIST_KEYS and isinstance(value, list):
+            for item in value:
+                if not _is_selection(item):
+                    continue
+                container = _price_container(item)
+                prices = item[container] if container is not None else item
+                selection_id = _first(item, SELECTION_ID_KEYS)
+                selection_key = f"{market_id}/{selection_id}" if market_id is not None else str(selection_id)
+                selections[selection_key] = {
+                    "win": _first(prices, WIN_PRICE_KEYS),
+                    "place": _first(prices, PLACE_PRICE_KEYS),
+                    "status": _first(prices, STATUS_KEYS) or _first(item, STATUS_KEYS),
+                }
+        elif key == "markets" and isinstance(value, list):
+            for market in value:
+                if isinstance(market, dict):
+                    _collect_selections(market, market.get("marketId", market.get("id", market_id)), selections)
+        elif isinstance(value, (dict, list)):
+            _collect_selections(value, market_id, selections)
+
+
+def extract_selections(data: Any) -> Dict[str, Dict[str, Any]]:
+    """Flatten an odds payload into the win price, place price and status of each selection.
+
+    Selections are keyed by their ID, prefixed with their market ID when they
+    sit in a list of markets (e.g. "123/4").
+    """
+    selections = {}
+    _collect_selections(data, None, selections)
+    return selections
+
+
+# Betting statuses interned as small integers for the status column
+_STATUS_NAMES: List[Optional[str]] = [None]
+_STATUS_CODES: Dict[Optional[str], int] = {None: 0}
+
+
+def _status_code(status: Optional[str]) -> int:
+    code = _STATUS_CODES.get(status)
+    if code is None:
+        code = _STATUS_CODES[status] = len(_STATUS_NAMES)
+        _STATUS_NAMES.append(status)
+    return code
+
+
+def _price(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _same_price(a: float, b: float) -> bool:
+    return a == b or (math.isnan(a) and math.isnan(b))
+
+
+class MarketBook:
+    """Prices of one market's (or event's) selections held in compact columns.
+
+    Each selection is a row across typed arrays (win price, place price,
+    interned status and last-update time) instead of a dict per selection.
+    Missing prices are stored as NaN.
+    """
+
+    __slots__ = ("ids", "_index", "win", "place", "status", "updated_at")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.win = array("d")
+        self.place = array("d")
+        self.status = array("H")
+        self.updated_at = array("d")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a selection's win price, place price and status."""
+        row = self._index.get(key)
+        if row is None:
+            return None
+        win, place = self.win[row], self.place[row]
+        return {
+            "win": None if math.isnan(win) else win,
+            "place": None if math.isnan(place) else place,
+            "status": _STATUS_NAMES[self.status[row]],
+        }
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return every selection as a dict keyed by selection."""
+        return {key: self.get(key) for key in self.ids}
+
+    def update(self, selections: Dict[str, Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+        """Replace the book's selections, returning the keys that changed and those removed."""
+        now = time.time()
+        changed = []
+        for key, values in selections.items():
+            win, place = _price(values.get("win")), _price(values.get("place"))
+            status = _status_code(values.get("status"))
+            row = self._index.get(key)
+            if row is None:
+                self._index[key] = len(self.ids)
+                self.ids.append(key)
+                self.win.append(win)
+                self.place.append(place)
+                self.status.append(status)
+                self.updated_at.append(now)
+            elif (not _same_price(self.win[row], win) or not _same_price(self.place[row], place)
+                  or self.status[row] != status):
+                self.win[row], self.place[row], self.status[row] = win, place, status
+                self.updated_at[row] = now
+            else:
+                continue
+            changed.append(key)
+
+        removed = [key for key in self.ids if key not in selections]
+        if removed:
+            self._drop(set(removed))
+        return changed, removed
+
+    def _drop(self, keys: Set[str]):
+        keep = [row for row, key in enumerate(self.ids) if key not in keys]
+        self.ids = [self.ids[row] for row in keep]
+        self._index = {key: row for row, key in enumerate(self.ids)}
+        self.win = array("d", (self.win[row] for row in keep))
+        self.place = array("d", (self.place[row] for row in keep))
+        self.status = array("H", (self.status[row] for row in keep))
+        self.updated_at = array("d", (self.updated_at[row] for row in keep))
+
+
+# Actions in a selection layout: copy the next packed value, or take a price column
+_VALUE, _WIN, _PLACE, _STATUS = range(4)
+
+# How packed selections are rebuilt, as ((key, action), ...) in the selection's
+# key order, where the action of a price container is its own layout. Layouts
+# are interned, since the selections of a payload mostly share one.
+_LAYOUTS: List[Tuple] = []
+_LAYOUT_CODES: Dict[Tuple, int] = {}
+
+
+def _layout_code(layout: Tuple) -> int:
+    code = _LAYOUT_CODES.get(layout)
+    if code is None:
+        code = _LAYOUT_CODES[layout] = len(_LAYOUTS)
+        _LAYOUTS.append(layout)
+    return code
+
+
+class _PackedSelections:
+    """A list of selections in which each selection is a tuple of its layout code and values."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: List[Any]):
+        self.items = items
+
+
+class CompactOdds:
+    """An odds payload with its selections packed and their prices in typed columns.
+
+    Each selection becomes a row: its win price, place price and interned
+    status go into arrays, and its other fields into a tuple, with the key
+    names kept once in a layout shared by selections of the same shape. The
+    rest of the payload (event and market names and other metadata) is kept
+    as it was. Only float prices and string statuses go into columns, so
+    expand() returns a payload equal to the original, in the same key order.
+    """
+
+    __slots__ = ("skeleton", "win", "place", "status")
+
+    def __init__(self, data: Any):
+        self.win = array("d")
+        self.place = array("d")
+        self.status = array("H")
+        self.skeleton = self._pack(data)
+
+    def __len__(self) -> int:
+        return len(self.win)
+
+    def _pack(self, data: Any) -> Any:
+        if isinstance(data, list):
+            return [self._pack(item) for item in data]
+        if not isinstance(data, dict):
+            return data
+
+        packed = {}
+        for key, value in data.items():
+            if key in SELECTION_LIST_KEYS and isinstance(value, list):
+                packed[key] = _PackedSelections([self._pack_selection(item) if _is_selection(item) else item
+                                                 for item in value])
+            elif isinstance(value, (dict, list)):
+                packed[key] = self._pack(value)
+            else:
+                packed[key] = value
+        return packed
+
+    def _pack_selection(self, item: Dict[str, Any]) -> Tuple:
+        container = _price_container(item)
+        prices = item[container] if container is not None else item
+        status_holder = prices if _first_key(prices, STATUS_KEYS) is not None else item
+
+        # The fields moved into columns, as (holder, key) -> action. Only values
+        # that come back unchanged from a column are moved.
+        moved = {}
+        row = {_WIN: math.nan, _PLACE: math.nan, _STATUS: None}
+        for holder, keys, action, kind in ((prices, WIN_PRICE_KEYS, _WIN, float),
+                                           (prices, PLACE_PRICE_KEYS, _PLACE, float),
+                                           (status_holder, STATUS_KEYS, _STATUS, str)):
+            key = _first_key(holder, keys)
+            if key is not None and type(holder[key]) is kind:
+                moved[(id(holder), key)] = action
+                row[action] = holder[key]
+        self.win.append(row[_WIN])
+        self.place.append(row[_PLACE])
+        self.status.append(_status_code(row[_STATUS]))
+
+        values = []
+
+        def layout_of(obj):
+            entries = []
+            for key, value in obj.items():
+                action = moved.get((id(obj), key))
+                if action is None:
+                    if obj is item and key == container:
+                        action = layout_of(value)
+                    else:
+                        action = _VALUE
+                        values.append(value)
+                entries.append((key, action))
+            return tuple(entries)
+
+        return (_layout_code(layout_of(item)), *values)
+
+    def expand(self) -> Any:
+        """Return the payload with every selection rebuilt from its row."""
+        rows = iter(range(len(self.win)))
+
+        def unpack(layout, values):
+            obj = {}
+            for key, action in layout:
+                if action == _VALUE:
+                    obj[key] = next(values)
+                elif action == _WIN:
+                    obj[key] = self.win[row]
+                elif action == _PLACE:
+                    obj[key] = self.place[row]
+                elif action == _STATUS:
+                    obj[key] = _STATUS_NAMES[self.status[row]]
+                else:
+                    obj[key] = unpack(action, values)
+            return obj
+
+        def restore(data):
+            nonlocal row
+            if isinstance(data, _PackedSelections):
+                items = []
+                for item in data.items:
+                    if type(item) is tuple:
+                        row = next(rows)
+                        item = unpack(_LAYOUTS[item[0]], iter(item[1:]))
+                    items.append(item)
+                return items
+            if isinstance(data, list):
+                return [restore(item) for item in data]
+            if isinstance(data, dict):
+                return {key: restore(value) for key, value in data.items()}
+            return data
+
+        row = 0
+        return restore(self.skeleton)
+
+
+def compact_prices(data: Any) -> Any:
+    """Return an odds payload as CompactOdds, or unchanged if it has no selections."""
+    compact = CompactOdds(data)
+    return compact if len(compact) else data
+
+
+def expand_prices(data: Any) -> Any:
+    """Return the full payload of data held by compact_prices."""
+    return data.expand() if isinstance(data, CompactOdds) else data
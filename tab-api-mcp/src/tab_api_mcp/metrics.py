@@ -0,0 +1,175 @@
+"""In-process metrics, rendered in the Prometheus text exposition format."""
+
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Every metric, in the order it is rendered
+_registry: List["Metric"] = []
+
+# Functions called before rendering to update point-in-time gauges
+_collectors: List[Callable[[], None]] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """A named metric with a value per combination of label values."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # A metric without labels always has a value, starting at zero
+        self.values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0}
+        _registry.append(self)
+
+    def clear(self):
+        """Drop every recorded value."""
+        self.values.clear()
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in self.values.items()]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, value: float, *labels: str):
+        """Mirror a total that is counted elsewhere."""
+        self.values[labels] = value
+
+
+class Gauge(Metric):
+    """A value that can go up and down."""
+
+    type = "gauge"
+
+    def set(self, value: float, *labels: str):
+        self.values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram(Metric):
+    """Counts of observations in cumulative buckets, with their sum."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label values: [count per bucket (the last is +Inf)..., sum]
+        self.observations: Dict[Tuple[str, ...], List[float]] = {}
+
+    def clear(self):
+        self.observations.clear()
+
+    def observe(self, value: float, *labels: str):
+        observation = self.observations.get(labels)
+        if observation is None:
+            observation = self.observations[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        observation[bisect_left(self.buckets, value)] += 1
+        observation[-1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, observation in self.observations.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), observation):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(observation[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def register_collector(collector: Callable[[], None]):
+    """Call a function before every render, to update point-in-time gauges."""
+    _collectors.append(collector)
+
+
+def render_metrics() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+    for collector in _collectors:
+        collector()
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# Tool calls
+TOOL_CALLS = Counter("tab_mcp_tool_calls_total", "Tool calls started.", ["tool"])
+TOOL_ERRORS = Counter("tab_mcp_tool_errors_total", "Tool calls that returned or raised an error.", ["tool"])
+TOOL_DURATION = Histogram("tab_mcp_tool_duration_seconds", "Time taken by tool calls.", ["tool"])
+TOOL_CALLS_IN_PROGRESS = Gauge("tab_mcp_tool_calls_in_progress", "Tool calls currently running.")
+
+# Upstream requests
+UPSTREAM_DURATION = Histogram("tab_mcp_upstream_request_duration_seconds",
+                              "Time taken by upstream TAB API requests, per endpoint template.",
+                              ["method", "template", "status"])
+UPSTREAM_IN_FLIGHT = Gauge("tab_mcp_upstream_requests_in_flight", "Upstream TAB API requests awaiting a response.")
+SHARED_REQUESTS_IN_FLIGHT = Gauge("tab_mcp_shared_requests_in_flight",
+                                  "Upstream GETs in flight that identical calls can join.")
+COALESCED_REQUESTS = Counter("tab_mcp_coalesced_requests_total", "Calls that joined an identical request in flight.")
+TOKEN_REFRESHES = Counter("tab_mcp_token_refreshes_total", "Access token requests, by outcome.", ["outcome"])
+
+# Connections
+SSE_SESSIONS = Gauge("tab_mcp_sse_sessions", "Open SSE sessions.")
+POOL_CONNECTIONS = Gauge("tab_mcp_http_pool_connections", "Upstream connections in the pool, by state.", ["state"])
+POOL_MAX_CONNECTIONS = Gauge("tab_mcp_http_pool_max_connections", "Most upstream connections the pool may open.")
+
+# Response cache
+CACHE_REQUESTS = Counter("tab_mcp_cache_requests_total", "Response cache lookups by result, and expired entries renewed by a 304.", ["result"])
+CACHE_HIT_RATIO = Gauge("tab_mcp_cache_hit_ratio", "Fraction of response cache lookups that were hits.")
+CACHE_ENTRIES = Gauge("tab_mcp_cache_entries", "Responses held in the cache.")
+CACHE_BYTES = Gauge("tab_mcp_cache_bytes", "Size of the responses held in the cache.")
+CACHE_EVICTIONS = Counter("tab_mcp_cache_evictions_total", "Responses evicted from the cache.")
+
+# Admission control
+RATE_LIMIT = Gauge("tab_mcp_rate_limit_per_second", "Current request rate allowed per service.", ["service"])
+RATE_LIMIT_WAITING = Gauge("tab_mcp_rate_limit_waiting", "Requests queued for a service's rate limiter.", ["service"])
+RATE_LIMIT_THROTTLED = Counter("tab_mcp_rate_limit_throttled_total", "429 responses per service.", ["service"])
+CIRCUIT_OPEN = Gauge("tab_mcp_circuit_open", "Whether a service's circuit is open (1) or half-open (0.5).", ["service"])
+HEDGED_REQUESTS = Counter("tab_mcp_hedged_requests_total", "Backup requests sent for slow GETs, by outcome.", ["outcome"])
+
+# Event loop
+LOOP_LAG = Histogram("tab_mcp_event_loop_lag_seconds", "Delay in running a callback scheduled on the event loop.")
+LOOP_LAG_LAST = Gauge("tab_mcp_event_loop_lag_last_seconds", "Most recently measured event loop lag.")
+LOOP_BLOCKED = Counter("tab_mcp_event_loop_blocked_total",
+                       "Times the event loop was blocked past the threshold, by the tool that blocked it.", ["tool"])
+OFFLOADED = Counter("tab_mcp_offloaded_total", "Payloads decoded, packed or encoded on a worker thread, by stage.", ["stage"])
@@ -0,0 +1,287 @@
+"""Helpers for fetching market odds and pushing live odds changes."""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+import asyncio
+import contextlib
+import os
+import uuid
+from . import common
+from .instrumentation import detach_from_tool_call
+from .marketbook import MarketBook, extract_selections
+from .serialization import project_fields
+
+# Seconds between upstream polls for an event with live odds subscribers
+LIVE_ODDS_POLL_INTERVAL = float(os.environ.get("TAB_LIVE_ODDS_POLL_INTERVAL", "2"))
+
+# Logger name on the MCP log notifications that carry live odds changes
+LIVE_ODDS_LOGGER = "tab_api_mcp.live_odds"
+
+# Number of changes remembered per market for answering since_version requests
+ODDS_HISTORY_LENGTH = int(os.environ.get("TAB_ODDS_HISTORY_LENGTH", "100"))
+
+# Maximum number of markets (and events) with a version history
+ODDS_MAX_BOOKS = int(os.environ.get("TAB_ODDS_MAX_BOOKS", "20000"))
+
+# Prefix of version tokens, so tokens issued before a restart are not trusted
+_VERSION_EPOCH = uuid.uuid4().hex[:8]
+
+
+def odds_endpoint(market_id: str) -> str:
+    """Return the endpoint with the odds of a market."""
+    return f"/v1/tab-info-service/markets/{market_id}/odds"
+
+
+def live_odds_endpoint(event_id: str) -> str:
+    """Return the endpoint with the live odds of an event."""
+    return f"/v1/tab-info-service/events/{event_id}/live-odds"
+
+
+class OddsVersionHistory:
+    """The current prices of a market (or event) and the keys changed in each version."""
+
+    __slots__ = ("version", "book", "changes")
+
+    def __init__(self):
+        self.version = 0
+        self.book = MarketBook()
+        # (version, keys changed or removed in that version), oldest first
+        self.changes = deque(maxlen=ODDS_HISTORY_LENGTH)
+
+    def update(self, selections: Dict[str, Dict[str, Any]]) -> int:
+        """Record the latest selections, returning the (possibly new) version."""
+        changed, removed = self.book.update(selections)
+        if self.version == 0 or changed or removed:
+            self.version += 1
+            self.changes.append((self.version, frozenset(changed).union(removed)))
+        return self.version
+
+    def changes_since(self, version: int) -> Optional[Dict[str, Any]]:
+        """Return what changed after a version, or None if it is no longer known."""
+        if version > self.version or not self.changes or version < self.changes[0][0] - 1:
+            return None
+
+        keys = set()
+        for changed_in, changed_keys in self.changes:
+            if changed_in > version:
+                keys |= changed_keys
+        return {
+            "changed": {key: self.book.get(key) for key in keys if key in self.book},
+            "removed": sorted(key for key in keys if key not in self.book),
+        }
+
+
+# Version histories, least recently used first
+_odds_histories: "OrderedDict[str, OddsVersionHistory]" = OrderedDict()
+
+
+def _parse_version(token: str) -> Optional[int]:
+    epoch, _, version = str(token).partition("-")
+    if epoch != _VERSION_EPOCH or not version.isdigit():
+        return None
+    return int(version)
+
+
+def _get_history(book_key: str) -> OddsVersionHistory:
+    """Return the version history of a book, creating it (and evicting old ones) if needed."""
+    history = _odds_histories.get(book_key)
+    if history is None:
+        history = _odds_histories[book_key] = OddsVersionHistory()
+        while len(_odds_histories) > ODDS_MAX_BOOKS:
+            _odds_histories.popitem(last=False)
+    _odds_histories.move_to_end(book_key)
+    return history
+
+
+def versioned_odds(book_key: str, data: Any, since_version: Optional[str] = None,
+                   fields: Optional[str] = None) -> Any:
+    """Record an odds payload in its version history and answer relative to since_version.
+
+    Without since_version (or with one that is unknown or too old), the full
+    payload, projected to fields if given, is returned with an "oddsVersion"
+    token added. With a known since_version, only the selections that changed
+    or were removed since then are returned, with the new token.
+    """
+    history = _get_history(book_key)
+    token = f"{_VERSION_EPOCH}-{history.update(extract_selections(data))}"
+
+    if since_version:
+        since = _parse_version(since_version)
+        delta = history.changes_since(since) if since is not None else None
+        if delta is not None:
+            return {"oddsVersion": token, "sinceVersion": since_version, **delta}
+
+    data = project_fields(data, fields)
+    if isinstance(data, dict):
+        return dict(data, oddsVersion=token)
+    return {"oddsVersion": token, "odds": data}
+
+
+async def fetch_odds_batch(market_ids: List[str], jurisdiction: str = None, concurrency: int = None) -> Dict[str, Any]:
+    """Fetch the odds of several markets concurrently.
+
+    Duplicate IDs are fetched once, and at most concurrency requests are in
+    flight. Each request goes through make_tab_api_request, so it shares the
+    response cache and in-flight coalescing with single-market calls.
+    Returns the odds by market ID and, separately, the error for each market
+    that could not be fetched.
+    """
+    params = {"jurisdiction": jurisdiction or common.DEFAULT_JURISDICTION}
+    semaphore = asyncio.Semaphore(max(1, concurrency or common.FANOUT_CONCURRENCY))
+    unique_ids = list(dict.fromkeys(str(market_id) for market_id in market_ids))
+
+    async def fetch(market_id):
+        async with semaphore:
+            return await common.make_tab_api_request(odds_endpoint(market_id), params=params)
+
+    results = await asyncio.gather(*(fetch(market_id) for market_id in unique_ids), return_exceptions=True)
+
+    markets, errors = {}, {}
+    for market_id, result in zip(unique_ids, results):
+        if isinstance(result, Exception):
+            errors[market_id] = str(result)
+        else:
+            markets[market_id] = result
+    return {"markets": markets, "errors": errors}
+
+
+class LiveOddsSubscription:
+    """A single upstream poller for an event, shared by every subscribed session."""
+
+    def __init__(self, event_id: str, jurisdiction: str):
+        self.event_id = event_id
+        self.jurisdiction = jurisdiction
+        self.sessions: Set[Any] = set()
+        self.book = MarketBook()
+        self.task: Optional[asyncio.Task] = None
+
+    async def poll(self):
+        """Poll the event's live odds and push the changes to every session."""
+        # The poller outlives the subscribe call that started it, so drop that call's deadline and trace
+        detach_from_tool_call()
+        endpoint = live_odds_endpoint(self.event_id)
+        params = {"jurisdiction": self.jurisdiction}
+        while self.sessions:
+            await asyncio.sleep(LIVE_ODDS_POLL_INTERVAL)
+            try:
+                data = await common.make_tab_api_request(endpoint, params=params)
+            except Exception as e:
+                print(f"Error polling live odds for event {self.event_id}: {str(e)}")
+                continue
+
+            changed, removed = self.book.update(extract_selections(data))
+            if changed or removed:
+                await self.publish({
+                    "eventId": self.event_id,
+                    "jurisdiction": self.jurisdiction,
+                    "changed": {key: self.book.get(key) for key in changed},
+                    "removed": removed,
+                })
+
+    async def publish(self, message: Dict[str, Any]):
+        """Send a change notification to every session, dropping sessions that have gone away."""
+        sessions = list(self.sessions)
+        results = await asyncio.gather(
+            *(session.send_log_message(level="info", data=message, logger=LIVE_ODDS_LOGGER) for session in sessions),
+            return_exceptions=True,
+        )
+        for session, result in zip(sessions, results):
+            if isinstance(result, Exception):
+                self.sessions.discard(session)
+
+
+# Live odds subscriptions, keyed on event ID and jurisdiction
+_live_odds_subscriptions: Dict[Tuple[str, str], LiveOddsSubscription] = {}
+
+
+# Subscriptions made over the current SSE connection, as (session, event ID, jurisdiction)
+_connection_subscriptions: ContextVar[Optional[Set[Tuple[Any, str, str]]]] = ContextVar(
+    "tab_api_live_odds_subscriptions", default=None)
+
+
+@contextlib.contextmanager
+def live_odds_connection():
+    """Unsubscribe the sessions of the enclosed SSE connection from their live odds when it ends.
+
+    Tool calls made over the connection run in tasks that inherit this
+    context, so subscriptions they make are recorded here. Without this a
+    client that disconnects without unsubscribing keeps its pollers running
+    for as long as the odds do not change.
+    """
+    subscriptions: Set[Tuple[Any, str, str]] = set()
+    token = _connection_subscriptions.set(subscriptions)
+    try:
+        yield
+    finally:
+        _connection_subscriptions.reset(token)
+        for session, event_id, jurisdiction in list(subscriptions):
+            remove_live_odds_subscriber(session, event_id, jurisdiction)
+
+
+def _forget_subscription(key: Tuple[str, str], subscription: LiveOddsSubscription):
+    """Remove a subscription whose poller has stopped."""
+    if _live_odds_subscriptions.get(key) is subscription:
+        del _live_odds_subscriptions[key]
+
+
+async def add_live_odds_subscriber(session: Any, event_id: str, jurisdiction: str = None) -> Dict[str, Any]:
+    """Subscribe a session to an event's live odds changes.
+
+    The event is polled upstream once however many sessions watch it. The
+    current odds are fetched straight away and returned, and later changes
+    are pushed to the session as MCP log notifications.
+    """
+    jurisdiction = jurisdiction or common.DEFAULT_JURISDICTION
+    key = (str(event_id), jurisdiction)
+
+    data = await common.make_tab_api_request(live_odds_endpoint(event_id), params={"jurisdiction": jurisdiction})
+
+    subscription = _live_odds_subscriptions.get(key)
+    if subscription is None or subscription.task.done():
+        subscription = LiveOddsSubscription(str(event_id), jurisdiction)
+        subscription.book.update(extract_selections(data))
+        _live_odds_subscriptions[key] = subscription
+    subscription.sessions.add(session)
+
+    if subscription.task is None:
+        subscription.task = asyncio.ensure_future(subscription.poll())
+        subscription.task.add_done_callback(lambda done: _forget_subscription(key, subscription))
+
+    connection_subscriptions = _connection_subscriptions.get()
+    if connection_subscriptions is not None:
+        connection_subscriptions.add((session, *key))
+
+    return {
+        "eventId": str(event_id),
+        "jurisdiction": jurisdiction,
+        "subscribed": True,
+        "pollInterval": LIVE_ODDS_POLL_INTERVAL,
+        "logger": LIVE_ODDS_LOGGER,
+        "odds": data,
+    }
+
+
+def remove_live_odds_subscriber(session: Any, event_id: str, jurisdiction: str = None) -> bool:
+    """Unsubscribe a session from an event's live odds. Returns False if it was not subscribed."""
+    key = (str(event_id), jurisdiction or common.DEFAULT_JURISDICTION)
+    subscription = _live_odds_subscriptions.get(key)
+    if subscription is None or session not in subscription.sessions:
+        return False
+
+    subscription.sessions.discard(session)
+    connection_subscriptions = _connection_subscriptions.get()
+    if connection_subscriptions is not None:
+        connection_subscriptions.discard((session, *key))
+    if not subscription.sessions and subscription.task is not None:
+        subscription.task.cancel()
+    return True
+
+
+async def stop_live_odds_pollers():
+    """Cancel every live odds poller."""
+    tasks = [s.task for s in _live_odds_subscriptions.values() if s.task is not None]
+    _live_odds_subscriptions.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
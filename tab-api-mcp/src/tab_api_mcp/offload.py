@@ -0,0 +1,90 @@
+"""Decoding and encoding of large payloads on worker threads, off the event loop."""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional
+import asyncio
+import contextlib
+import os
+
+from . import loopmonitor, metrics
+
+# Payloads of at least this many bytes are decoded and encoded on a worker thread (0 to never offload)
+OFFLOAD_THRESHOLD = int(os.environ.get("TAB_OFFLOAD_THRESHOLD", str(256 * 1024)))
+
+# Worker threads for offloaded work
+OFFLOAD_WORKERS = int(os.environ.get("TAB_OFFLOAD_WORKERS", "4"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Upstream bytes behind the data the current tool call has fetched so far
+_payload_bytes: ContextVar[Optional[List[int]]] = ContextVar("tab_api_payload_bytes", default=None)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the worker pool, creating it on first use."""
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=OFFLOAD_WORKERS, thread_name_prefix="tab-api-json")
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the worker pool once queued work has finished."""
+    global _executor
+
+    if _executor is not None:
+        executor, _executor = _executor, None
+        executor.shutdown(wait=True)
+
+
+@contextlib.contextmanager
+def payload_scope():
+    """Count the upstream bytes fetched by the enclosed tool call."""
+    token = _payload_bytes.set([0])
+    try:
+        yield
+    finally:
+        _payload_bytes.reset(token)
+
+
+def detach():
+    """Stop counting payloads in the current context towards a tool call."""
+    _payload_bytes.set(None)
+
+
+def note_payload(size: int):
+    """Add the size of a response the current tool call is using."""
+    total = _payload_bytes.get()
+    if total is not None:
+        total[0] += size
+
+
+def payload_size() -> Optional[int]:
+    """Return the upstream bytes behind the current tool call's data, if counted."""
+    total = _payload_bytes.get()
+    return total[0] if total is not None else None
+
+
+def should_offload(size: Optional[int]) -> bool:
+    """Return whether a payload is large enough to be handled on a worker thread."""
+    return OFFLOAD_THRESHOLD > 0 and size is not None and size >= OFFLOAD_THRESHOLD
+
+
+async def run_in_worker(stage: str, func: Callable, *args) -> Any:
+    """Run a synchronous function on a worker thread and wait for its result."""
+    metrics.OFFLOADED.inc(stage)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), func, *args)
+
+
+async def run_blocking(stage: str, size: int, func: Callable, *args) -> Any:
+    """Run synchronous work on a payload, on a worker thread if the payload is large.
+
+    Small payloads are handled inline, where handing them to a thread would
+    cost more than it saves.
+    """
+    if should_offload(size):
+        return await run_in_worker(stage, func, *args)
+    with loopmonitor.blocking_section(stage, size):
+        return func(*args)
@@ -0,0 +1,161 @@
+"""On-demand CPU and memory profiling of the running server."""
+
+from collections import Counter
+from typing import Any, Dict
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+# Serve /debug/profile and /debug/memory (off by default)
+PROFILING_ENABLED = os.environ.get("TAB_DEBUG_PROFILING", "0") == "1"
+
+# Longest profile that may be requested, in seconds
+MAX_PROFILE_SECONDS = 60
+
+# Seconds between stack samples of the event loop thread
+SAMPLE_INTERVAL = 0.005
+
+# Frames of the allocating stack kept by tracemalloc
+TRACEMALLOC_FRAMES = 1
+
+# Only one profile runs at a time, since profilers cannot be nested
+_profile_lock = threading.Lock()
+
+# Snapshot the memory growth is measured against, and when it was taken
+_last_snapshot: Dict[str, Any] = {"snapshot": None, "at": 0.0}
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another is running."""
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class StackSampler:
+    """Samples the stack of one thread from a background thread.
+
+    The stacks are counted in collapsed form ("outer;inner;leaf"), ready for
+    flamegraph tools. Sampling costs the profiled thread almost nothing.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tab-api-stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # noqa: SLF001
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Return the sampled stacks, most frequent first, one "stack count" per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+async def profile(seconds: float, mode: str = "sample", sort: str = "cumulative", limit: int = 50) -> str:
+    """Profile the event loop thread for a number of seconds.
+
+    "sample" mode returns collapsed stacks from a stack sampler. "cprofile"
+    mode runs cProfile on the loop thread and returns the pstats report,
+    sorted by the given key and limited to that many functions.
+    """
+    if mode not in ("sample", "cprofile"):
+        raise ValueError(f"Unknown profile mode: {mode} (expected sample or cprofile)")
+    seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        if mode == "sample":
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                sampler.stop()
+            return f"# {sampler.samples} samples over {seconds:g}s\n" + sampler.collapsed()
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+    finally:
+        _profile_lock.release()
+
+
+def _location(statistic) -> str:
+    frame = statistic.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def memory_report(limit: int = 20, stop: bool = False) -> Dict[str, Any]:
+    """Return the top allocators by line and their growth since the last report.
+
+    tracemalloc is started by the first report, so growth is measured from
+    then on. Pass stop to turn it off again and drop its snapshots.
+    """
+    if stop:
+        tracemalloc.stop()
+        _last_snapshot["snapshot"] = None
+        return {"tracing": False}
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    report = {
+        "tracing": True,
+        "started": started,
+        "tracedBytes": current,
+        "peakBytes": peak,
+        "top": [
+            {"location": _location(statistic), "bytes": statistic.size, "count": statistic.count}
+            for statistic in snapshot.statistics("lineno")[:limit]
+        ],
+        "growth": [],
+    }
+    if _last_snapshot["snapshot"] is not None:
+        report["sinceSeconds"] = round(time.time() - _last_snapshot["at"], 3)
+        report["growth"] = [
+            {"location": _location(statistic), "bytesDiff": statistic.size_diff,
+             "countDiff": statistic.count_diff, "bytes": statistic.size}
+            for statistic in snapshot.compare_to(_last_snapshot["snapshot"], "lineno")[:limit]
+        ]
+    _last_snapshot["snapshot"] = snapshot
+    _last_snapshot["at"] = time.time()
+    return report
@@ -0,0 +1,157 @@
+"""Helpers for walking a racing day's meetings and races."""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import datetime
+import time
+from . import common
+
+RACING_DATES_ENDPOINT = "/v1/tab-info-service/racing/dates"
+
+# How far a racing day snapshot expands each meeting
+SNAPSHOT_DEPTHS = ("meetings", "races", "details")
+
+
+def meetings_endpoint(date: str) -> str:
+    """Return the endpoint listing the meetings on a date."""
+    return f"/v1/tab-info-service/racing/dates/{date}/meetings"
+
+
+def races_endpoint(date: str, meeting_code: str) -> str:
+    """Return the endpoint listing the races of a meeting."""
+    return f"/v1/tab-info-service/racing/dates/{date}/meetings/{meeting_code}/races"
+
+
+def race_details_endpoint(race_id: str) -> str:
+    """Return the endpoint with the details of a race."""
+    return f"/v1/tab-info-service/racing/races/{race_id}"
+
+
+def get_meeting_code(meeting: Dict[str, Any]) -> Optional[str]:
+    """Return the meeting code (e.g. R/MEL) that identifies a meeting's races."""
+    if meeting.get("meetingCode"):
+        return meeting["meetingCode"]
+    if meeting.get("raceType") and meeting.get("venueMnemonic"):
+        return f"{meeting['raceType']}/{meeting['venueMnemonic']}"
+    return None
+
+
+def get_race_id(race: Dict[str, Any]) -> Optional[str]:
+    """Return the ID used to look up a race's details."""
+    return race.get("raceId") or race.get("id")
+
+
+def get_items(data: Any, key: str) -> List[Dict[str, Any]]:
+    """Return the list of items under key, or the data itself if it is a list."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and isinstance(data.get(key), list):
+        return data[key]
+    return []
+
+
+async def build_racing_day_snapshot(
+    date: str,
+    jurisdiction: str = None,
+    depth: str = "races",
+    concurrency: int = None,
+    fetch: Callable[[str, Dict], Awaitable[Any]] = None,
+) -> Dict[str, Any]:
+    """Fetch a racing day's meetings and expand them into one merged structure.
+
+    With depth "races" each meeting gets its races, and with "details" each
+    race also gets its details. Requests run concurrently with at most
+    concurrency in flight. A failed branch is recorded on the meeting or race
+    it belongs to ("racesError" / "detailsError") instead of failing the
+    whole snapshot. Upstream data is copied, never modified.
+    """
+    if depth not in SNAPSHOT_DEPTHS:
+        raise ValueError(f"depth must be one of {', '.join(SNAPSHOT_DEPTHS)}")
+
+    params = {"jurisdiction": jurisdiction or common.DEFAULT_JURISDICTION}
+    fetch = fetch or common.make_tab_api_request
+    semaphore = asyncio.Semaphore(max(1, concurrency or common.FANOUT_CONCURRENCY))
+    errors = []
+
+    async def limited_fetch(endpoint):
+        async with semaphore:
+            return await fetch(endpoint, params=params)
+
+    async def load_race(race):
+        race = dict(race)
+        race_id = get_race_id(race)
+        if race_id is None:
+            return race
+        try:
+            race["details"] = await limited_fetch(race_details_endpoint(race_id))
+        except Exception as e:
+            race["detailsError"] = str(e)
+            errors.append(str(e))
+        return race
+
+    async def load_meeting(meeting):
+        meeting = dict(meeting)
+        code = get_meeting_code(meeting)
+        if code is None:
+            return meeting
+        try:
+            races = get_items(await limited_fetch(races_endpoint(date, code)), "races")
+        except Exception as e:
+            meeting["racesError"] = str(e)
+            errors.append(str(e))
+            return meeting
+        if depth == "details":
+            races = await asyncio.gather(*(load_race(race) for race in races))
+        meeting["races"] = list(races)
+        return meeting
+
+    meetings = get_items(await limited_fetch(meetings_endpoint(date)), "meetings")
+    if depth != "meetings":
+        meetings = await asyncio.gather(*(load_meeting(meeting) for meeting in meetings))
+
+    return {
+        "date": date,
+        "jurisdiction": params["jurisdiction"],
+        "depth": depth,
+        "meetings": list(meetings),
+        "errors": len(errors),
+    }
+
+
+async def warm_racing_cache(date: str = None, jurisdiction: str = None, concurrency: int = None) -> Dict[str, Any]:
+    """Prefetch the racing dates, a day's meetings and each meeting's races.
+
+    The requests use the same endpoints and parameters as the racing tools,
+    so their responses land in the response cache under the same keys.
+    Returns how long the walk took and how many requests it made.
+    """
+    date = date or datetime.date.today().isoformat()
+    concurrency = concurrency or common.WARM_CONCURRENCY
+
+    start = time.perf_counter()
+    upstream_before = common.request_stats["upstream"]
+    stats = {"date": date, "requests": 0, "errors": 0, "meetings": 0, "races": 0}
+
+    async def fetch(endpoint, params=None):
+        stats["requests"] += 1
+        try:
+            return await common.make_tab_api_request(endpoint, params=params)
+        except Exception:
+            stats["errors"] += 1
+            raise
+
+    # The dates request is independent of the walk, so run them together
+    _, snapshot = await asyncio.gather(
+        fetch(RACING_DATES_ENDPOINT),
+        build_racing_day_snapshot(date, jurisdiction, "races", concurrency, fetch),
+        return_exceptions=True,
+    )
+
+    if not isinstance(snapshot, Exception):
+        meetings = [meeting for meeting in snapshot["meetings"] if get_meeting_code(meeting)]
+        stats["meetings"] = len(meetings)
+        stats["races"] = sum(len(meeting.get("races", [])) for meeting in meetings)
+
+    stats["upstream_requests"] = common.request_stats["upstream"] - upstream_before
+    stats["duration"] = round(time.perf_counter() - start, 3)
+    return stats
@@ -0,0 +1,147 @@
+"""Client-side rate limiting of TAB API requests per service family."""
+
+from typing import Dict, Optional
+from email.utils import parsedate_to_datetime
+import asyncio
+import os
+import re
+import time
+
+# Requests per second first allowed to each service family (0 disables limiting)
+RATE_LIMIT = float(os.environ.get("TAB_RATE_LIMIT", "50"))
+
+# Requests that may be sent at once after an idle period
+RATE_LIMIT_BURST = int(os.environ.get("TAB_RATE_LIMIT_BURST", "50"))
+
+# Times a throttled (429) request is queued again before the 429 is returned
+RATE_LIMIT_MAX_RETRIES = 3
+
+# The rate is multiplied by this on a 429 and never drops below RATE_LIMIT_MIN
+RATE_LIMIT_DECREASE = 0.5
+RATE_LIMIT_MIN = 0.5
+
+# Fraction of the configured rate added with each successful request the bucket held back
+RATE_LIMIT_RECOVERY = 0.01
+
+# Service family of an endpoint, e.g. "tab-info-service" in /v1/tab-info-service/sports
+_FAMILY_PATTERN = re.compile(r"^/v\d+/([^/]+)/")
+
+
+def service_family(endpoint: str) -> str:
+    """Return the service family an endpoint belongs to."""
+    match = _FAMILY_PATTERN.match(endpoint)
+    return match.group(1) if match else "default"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the seconds to wait from a Retry-After header, if it has one."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket that admits waiting requests in arrival order.
+
+    The configured rate is only a starting point and adapts to upstream
+    feedback, AIMD-style: a 429 cuts it and pauses the bucket for the
+    Retry-After period, and while requests are being held back each success
+    raises it additively, past the starting rate, until upstream pushes back.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.start_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waiting = 0
+        self.admitted = 0
+        self.throttled = 0
+        # Whether a request has had to wait for a token since the rate last rose
+        self.saturated = False
+        # asyncio.Lock wakes its waiters first come, first served
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = max(self.updated, now)
+
+    async def acquire(self):
+        """Wait for a token, queueing behind earlier callers."""
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    delay = self.paused_until - now
+                    if delay <= 0:
+                        if self.tokens >= 1:
+                            self.tokens -= 1
+                            self.admitted += 1
+                            return
+                        self.saturated = True
+                        delay = (1 - self.tokens) / self.rate
+                    await asyncio.sleep(delay)
+        finally:
+            self.waiting -= 1
+
+    def on_success(self):
+        """Probe a higher rate after a success, if the rate is holding requests back."""
+        if self.saturated:
+            self.saturated = False
+            self.rate += self.start_rate * RATE_LIMIT_RECOVERY
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """Slow down after a 429, pausing for Retry-After if it was given."""
+        now = time.monotonic()
+        self.throttled += 1
+        self.rate = max(RATE_LIMIT_MIN, self.rate * RATE_LIMIT_DECREASE)
+        # Start again from an empty bucket once the pause is over
+        self.tokens = 0.0
+        self.paused_until = max(self.paused_until, now + (retry_after if retry_after is not None else 1 / self.rate))
+        self.updated = self.paused_until
+
+    def stats(self) -> Dict[str, float]:
+        """Return the current rate and counters."""
+        return {
+            "rate": self.rate,
+            "start_rate": self.start_rate,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+        }
+
+
+# One bucket per service family, created on first use
+_rate_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_rate_limiter(endpoint: str) -> Optional[TokenBucket]:
+    """Return the bucket for an endpoint's service family, or None if limiting is off."""
+    if RATE_LIMIT <= 0:
+        return None
+    family = service_family(endpoint)
+    limiter = _rate_limiters.get(family)
+    if limiter is None:
+        limiter = _rate_limiters[family] = TokenBucket(RATE_LIMIT, RATE_LIMIT_BURST)
+    return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, float]]:
+    """Return the state of every service family's bucket."""
+    return {family: limiter.stats() for family, limiter in _rate_limiters.items()}
+
+
+def reset_rate_limiters():
+    """Forget all buckets so they are recreated with the current settings."""
+    _rate_limiters.clear()
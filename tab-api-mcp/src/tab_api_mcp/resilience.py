@@ -0,0 +1,118 @@
+"""Retries and circuit breaking for TAB API requests."""
+
+from typing import Dict, Optional
+import os
+import random
+import time
+
+from .ratelimit import service_family
+
+# Extra attempts made for an idempotent GET after a transient failure
+RETRY_MAX_RETRIES = int(os.environ.get("TAB_RETRIES", "2"))
+
+# Exponential backoff: attempt n waits up to RETRY_BASE_DELAY * 2**n seconds
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 5.0
+
+# Upstream statuses worth retrying (server-side failures; 429s are queued again by the rate limiter)
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+# Consecutive failures that open a service's circuit, and seconds it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("TAB_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.environ.get("TAB_CIRCUIT_RESET_TIMEOUT", "30"))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit is open."""
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+    """Return the seconds to wait before retrying, or None if it is not worth waiting.
+
+    The delay is drawn uniformly up to the exponential backoff ("full
+    jitter"), so callers that failed together do not retry together. A
+    Retry-After from upstream takes precedence, unless it asks for longer
+    than RETRY_MAX_DELAY.
+    """
+    if retry_after is not None:
+        return retry_after if retry_after <= RETRY_MAX_DELAY else None
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fail fast while a service keeps failing.
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive failures the circuit opens
+    and requests are rejected without going upstream. Once
+    CIRCUIT_RESET_TIMEOUT has passed a single trial request is let
+    through: success closes the circuit and failure opens it again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.opened_until = 0.0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.failures < CIRCUIT_FAILURE_THRESHOLD:
+            return "closed"
+        return "open" if time.monotonic() < self.opened_until else "half-open"
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent now."""
+        state = self.state
+        if state == "open":
+            self.rejected += 1
+            raise CircuitOpenError(f"TAB API {self.name} is unavailable; failing fast for "
+                                   f"{self.opened_until - time.monotonic():.0f}s")
+        if state == "half-open":
+            # Let this request through as the trial and hold back the rest
+            self.opened_until = time.monotonic() + CIRCUIT_RESET_TIMEOUT
+
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        self.failures = 0
+
+    def record_failure(self):
+        """Count a failed request, opening the circuit at the threshold."""
+        self.failures += 1
+        if self.failures >= CIRCUIT_FAILURE_THRESHOLD:
+            if self.failures == CIRCUIT_FAILURE_THRESHOLD:
+                print(f"TAB API {self.name} circuit opened after {self.failures} consecutive failures")
+                self.opened += 1
+            self.opened_until = time.monotonic() + CIRCUIT_RESET_TIMEOUT
+
+    def stats(self) -> Dict[str, object]:
+        """Return the circuit's state and counters."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+# One circuit per service family, created on first use
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """Return the circuit breaker for an endpoint's service family."""
+    family = service_family(endpoint)
+    breaker = _circuit_breakers.get(family)
+    if breaker is None:
+        breaker = _circuit_breakers[family] = CircuitBreaker(family)
+    return breaker
+
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, object]]:
+    """Return the state of every service family's circuit."""
+    return {family: breaker.stats() for family, breaker in _circuit_breakers.items()}
+
+
+def reset_circuit_breakers():
+    """Close and forget all circuits."""
+    _circuit_breakers.clear()
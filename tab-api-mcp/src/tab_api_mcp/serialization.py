@@ -0,0 +1,117 @@
+"""Shaping of tool responses before they are returned to the client."""
+
+import json
+import os
+from typing import Any, Dict, List, Union
+
+from . import loopmonitor, offload, tracing
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Matches every key of an object in a field path
+WILDCARD = "*"
+
+# How tool responses are written: "pretty" (indented), "compact" (no
+# whitespace) or "fast" (compact, using orjson when it is installed)
+OUTPUT_FORMATS = ("pretty", "compact", "fast")
+OUTPUT_FORMAT = os.environ.get("TAB_OUTPUT_FORMAT", "fast")
+
+
+def parse_fields(fields: Union[str, List[str]]) -> Dict[str, Any]:
+    """Parse field paths into a tree of nested keys.
+
+    Paths are dotted (e.g. "races.raceNumber") and may be given as a
+    comma-separated string or a list. A JSONPath-style "$." prefix and "[*]"
+    or "[]" list markers are accepted and ignored, because lists are always
+    traversed.
+    """
+    if isinstance(fields, str):
+        fields = fields.split(",")
+
+    tree: Dict[str, Any] = {}
+    for path in fields:
+        path = path.strip().replace("[*]", "").replace("[]", "")
+        if path.startswith("$"):
+            path = path[1:].lstrip(".")
+        node = tree
+        for key in filter(None, path.split(".")):
+            node = node.setdefault(key, {})
+    return tree
+
+
+def _project(data: Any, tree: Dict[str, Any]) -> Any:
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [_project(item, tree) for item in data]
+    if not isinstance(data, dict):
+        return data
+
+    projected = {}
+    if WILDCARD in tree:
+        for key, value in data.items():
+            projected[key] = _project(value, tree[WILDCARD])
+    for key, subtree in tree.items():
+        if key != WILDCARD and key in data:
+            projected[key] = _project(data[key], subtree)
+    return projected
+
+
+def project_fields(data: Any, fields: Union[str, List[str], None] = None) -> Any:
+    """Return only the requested fields of a response, keeping its structure.
+
+    Lists are projected item by item, and a path that ends on an object keeps
+    the whole object. Without fields the data is returned unchanged. The
+    input is never modified.
+    """
+    if not fields:
+        return data
+    return _project(data, parse_fields(fields))
+
+
+def set_output_format(output_format: str):
+    """Set the format used by dump_json for every tool response."""
+    global OUTPUT_FORMAT
+
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+    OUTPUT_FORMAT = output_format
+
+
+def _encode(data: Any, output_format: str) -> str:
+    if output_format == "pretty":
+        return json.dumps(data, indent=2)
+    if output_format == "fast" and orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # Values orjson cannot encode (e.g. integers over 64 bits) fall back to json
+            pass
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def dump_json(data: Any, output_format: str = None) -> str:
+    """Serialize a tool response in the configured output format."""
+    output_format = output_format or OUTPUT_FORMAT
+
+    # The encoded size is not known until encoding finishes, so report the top-level item count
+    items = len(data) if isinstance(data, (dict, list)) else None
+    with tracing.span("serialize", format=output_format), loopmonitor.blocking_section("serialize", items, "items"):
+        return _encode(data, output_format)
+
+
+async def encode_response(data: Any, output_format: str = None) -> str:
+    """Serialize a tool response, on a worker thread if it was built from large upstream payloads.
+
+    The encoded size is estimated by the size of the upstream responses the
+    tool call used, so small responses are still encoded inline.
+    """
+    size = offload.payload_size()
+    if not offload.should_offload(size):
+        return dump_json(data, output_format)
+    output_format = output_format or OUTPUT_FORMAT
+    with tracing.span("serialize", format=output_format, offloaded=True):
+        return await offload.run_in_worker("serialize", _encode, data, output_format)
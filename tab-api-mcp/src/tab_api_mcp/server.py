@@ -1,6 +1,5 @@
 """TAB API MCP Server for sports and racing information."""
 
-import json
 import argparse
 import uvicorn
 from mcp.server.fastmcp import FastMCP
@@ -10,103 +9,141 @@ from .common import (
     prompt_for_credentials,
     prompt_for_jurisdiction,
     create_starlette_app,
+    add_common_arguments,
+    apply_common_arguments,
 )
+from .serialization import project_fields, encode_response
+from .instrumentation import instrument_tool
+from .racing import build_racing_day_snapshot
 
 # Initialize FastMCP server for TAB API tools (SSE)
 mcp = FastMCP("tab-api")
 
 
 @mcp.tool()
-async def get_sports(jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_sports(jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
     """Get a list of available sports.
     
     Args:
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., sports.id,sports.name)
     """
     endpoint = "/v1/tab-info-service/sports/"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching sports: {str(e)}"
 
 
 @mcp.tool()
-async def get_sport_competitions(sport_name: str, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_sport_competitions(sport_name: str, jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
     """Get competitions for a specific sport.
     
     Args:
         sport_name: The name of the sport (e.g., Rugby League, Soccer)
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., competitions.id,competitions.name)
     """
     endpoint = f"/v1/tab-info-service/sports/{sport_name}/competitions"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching competitions for {sport_name}: {str(e)}"
 
 
 @mcp.tool()
-async def get_racing_dates() -> str:
-    """Get available racing dates."""
+@instrument_tool
+async def get_racing_dates(fields: str = None) -> str:
+    """Get available racing dates.
+    
+    Args:
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., dates.meetingDate)
+    """
     endpoint = "/v1/tab-info-service/racing/dates"
     
     try:
         data = await make_tab_api_request(endpoint)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching racing dates: {str(e)}"
 
 
 @mcp.tool()
-async def get_racing_meetings(date: str, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_racing_meetings(date: str, jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
     """Get racing meetings for a specific date.
     
     Args:
         date: The date in YYYY-MM-DD format
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., meetings.meetingName,meetings.venueMnemonic)
     """
     endpoint = f"/v1/tab-info-service/racing/dates/{date}/meetings"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching racing meetings for {date}: {str(e)}"
 
 
 @mcp.tool()
-async def get_racing_races(date: str, meeting_code: str, jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+@instrument_tool
+async def get_racing_races(date: str, meeting_code: str, jurisdiction: str = DEFAULT_JURISDICTION, fields: str = None) -> str:
     """Get races for a specific meeting.
     
     Args:
         date: The date in YYYY-MM-DD format
         meeting_code: The meeting code (e.g., R/MEL for Melbourne Racing)
         jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., races.raceNumber,races.raceName)
     """
     endpoint = f"/v1/tab-info-service/racing/dates/{date}/meetings/{meeting_code}/races"
     params = {"jurisdiction": jurisdiction}
     
     try:
         data = await make_tab_api_request(endpoint, params=params)
-        return json.dumps(data, indent=2)
+        return await encode_response(project_fields(data, fields))
     except Exception as e:
         return f"Error fetching races for meeting {meeting_code} on {date}: {str(e)}"
 
 
+@mcp.tool()
+@instrument_tool(deadline=120)
+async def get_racing_day_snapshot(date: str, jurisdiction: str = DEFAULT_JURISDICTION, depth: str = "races", fields: str = None) -> str:
+    """Get a racing day's meetings, their races and optionally each race's details in one call.
+    
+    Args:
+        date: The date in YYYY-MM-DD format
+        jurisdiction: The jurisdiction code (e.g., NSW, VIC, QLD)
+        depth: How far to expand each meeting: meetings, races, or details (races with their details)
+        fields: Optional comma-separated dotted paths of the fields to return (e.g., meetings.meetingName,meetings.races.raceNumber)
+    """
+    try:
+        data = await build_racing_day_snapshot(date, jurisdiction, depth)
+        return await encode_response(project_fields(data, fields))
+    except Exception as e:
+        return f"Error fetching racing day snapshot for {date}: {str(e)}"
+
+
 def main():
     """Run the TAB API MCP server."""
     parser = argparse.ArgumentParser(description='Run TAB API MCP SSE-based server')
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to')
     parser.add_argument('--port', type=int, default=8081, help='Port to listen on')
     parser.add_argument('--no-prompt', action='store_true', help='Skip prompting for credentials')
+    add_common_arguments(parser)
     args = parser.parse_args()
+    apply_common_arguments(args)
 
     print("=== TAB API MCP Server ===")
     
@@ -0,0 +1,197 @@
+"""Lightweight in-process tracing of where tool calls spend their time."""
+
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+import contextlib
+import os
+import time
+
+# Record a trace of every tool call
+TRACING_ENABLED = os.environ.get("TAB_TRACING", "1") != "0"
+
+# Most recent traces kept in memory
+TRACE_BUFFER_SIZE = int(os.environ.get("TAB_TRACE_BUFFER_SIZE", "1000"))
+
+# Spans kept per trace, so fan-out calls cannot grow a trace without bound
+MAX_SPANS_PER_TRACE = 500
+
+# httpx trace events marking the start and end of each stage of an upstream request
+HTTP_STAGES = (
+    ("connect", "connect_tcp.started", ("start_tls.complete", "connect_tcp.complete")),
+    ("send", "send_request_headers.started", ("send_request_body.complete", "send_request_headers.complete")),
+    ("ttfb", "receive_response_headers.started", ("receive_response_headers.complete",)),
+    ("download", "receive_response_body.started", ("receive_response_body.complete",)),
+)
+
+
+class Trace:
+    """The spans recorded during one tool call."""
+
+    __slots__ = ("tool", "started_at", "start", "duration", "error", "spans")
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.started_at = time.time()
+        self.start = time.monotonic()
+        self.duration: Optional[float] = None
+        self.error = False
+        self.spans: List[Dict[str, Any]] = []
+
+    def add_span(self, name: str, start: float, end: float, **attributes):
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(dict(attributes, name=name, start=start - self.start, duration=end - start))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tool": self.tool,
+            "startedAt": self.started_at,
+            "durationMs": round((self.duration or 0) * 1000, 3),
+            "error": self.error,
+            "spans": [
+                dict(span, start=round(span["start"] * 1000, 3), duration=round(span["duration"] * 1000, 3))
+                for span in sorted(self.spans, key=lambda span: span["start"])
+            ],
+        }
+
+
+# Finished traces, oldest first
+_traces: Deque[Trace] = deque(maxlen=TRACE_BUFFER_SIZE)
+
+# Trace of the tool call being run
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("tab_api_trace", default=None)
+
+
+@contextlib.contextmanager
+def trace_tool(name: str):
+    """Trace a tool call, keeping the trace once it finishes.
+
+    Yields the trace (or None with tracing disabled) so the caller can mark
+    it as an error.
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        trace.duration = time.monotonic() - trace.start
+        _traces.append(trace)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Time the enclosed code as a span of the current trace.
+
+    Yields a dict of attributes that may be filled in before the span ends,
+    or None when no trace is being recorded.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    start = time.monotonic()
+    try:
+        yield attributes
+    finally:
+        trace.add_span(name, start, time.monotonic(), **attributes)
+
+
+def detach():
+    """Stop recording spans in the current context, for background tasks started by a tool call."""
+    _current_trace.set(None)
+
+
+def annotate(attributes: Optional[Dict[str, Any]], **values):
+    """Add attributes to a span yielded by span(), if it is being recorded."""
+    if attributes is not None:
+        attributes.update(values)
+
+
+class HttpTrace:
+    """Collects httpx trace events to split an upstream request into stages."""
+
+    __slots__ = ("trace", "start", "events")
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self.start = time.monotonic()
+        self.events: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]):
+        # e.g. "http11.receive_response_headers.started" -> "receive_response_headers.started"
+        self.events[event_name.split(".", 1)[1]] = time.monotonic()
+
+    def finish(self, **attributes):
+        """Add a span for the pool wait and every stage that was seen."""
+        if not self.events:
+            return
+        self.trace.add_span("upstream.pool_wait", self.start, min(self.events.values()), **attributes)
+        for stage, started, completed in HTTP_STAGES:
+            end = next((self.events[event] for event in completed if event in self.events), None)
+            if started in self.events and end is not None:
+                self.trace.add_span(f"upstream.{stage}", self.events[started], end, **attributes)
+
+
+def start_http_trace() -> Optional[HttpTrace]:
+    """Return a collector for httpx trace events if a trace is being recorded."""
+    trace = _current_trace.get()
+    return HttpTrace(trace) if trace is not None else None
+
+
+def set_buffer_size(size: int):
+    """Keep the given number of most recent traces."""
+    global TRACE_BUFFER_SIZE, _traces
+
+    TRACE_BUFFER_SIZE = size
+    _traces = deque(_traces, maxlen=size)
+
+
+def clear_traces():
+    """Forget every recorded trace."""
+    _traces.clear()
+
+
+def _percentile(ordered: List[float], percentile: float) -> float:
+    return ordered[min(len(ordered) - 1, int(percentile / 100 * len(ordered)))]
+
+
+def trace_report(limit: int = 10, tool: Optional[str] = None) -> Dict[str, Any]:
+    """Summarise the recorded traces.
+
+    Returns the slowest traces in full and, per tool, the call latency
+    percentiles and the mean time spent in each kind of span.
+    """
+    traces = [trace for trace in _traces if tool is None or trace.tool == tool]
+
+    by_tool: Dict[str, List[Trace]] = {}
+    for trace in traces:
+        by_tool.setdefault(trace.tool, []).append(trace)
+
+    tools = {}
+    for name, tool_traces in sorted(by_tool.items()):
+        durations = sorted(trace.duration for trace in tool_traces)
+        stages: Dict[str, float] = {}
+        for trace in tool_traces:
+            for recorded in trace.spans:
+                stages[recorded["name"]] = stages.get(recorded["name"], 0) + recorded["duration"]
+        tools[name] = {
+            "calls": len(tool_traces),
+            "errors": sum(1 for trace in tool_traces if trace.error),
+            "p50Ms": round(_percentile(durations, 50) * 1000, 3),
+            "p95Ms": round(_percentile(durations, 95) * 1000, 3),
+            "maxMs": round(durations[-1] * 1000, 3),
+            # Concurrent spans overlap, so stage times can add up to more than the call
+            "meanStageMs": {stage: round(total / len(tool_traces) * 1000, 3) for stage, total in sorted(stages.items())},
+        }
+
+    slowest = sorted(traces, key=lambda trace: trace.duration, reverse=True)[:limit]
+    return {
+        "traces": len(traces),
+        "bufferSize": TRACE_BUFFER_SIZE,
+        "tools": tools,
+        "slowest": [trace.to_dict() for trace in slowest],
+    }
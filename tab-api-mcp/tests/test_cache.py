@@ -0,0 +1,191 @@
+"""Tests for the cache module."""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp.cache import (
+    ResponseCache,
+    DiskCacheStore,
+    get_cache_policy,
+    cache_key,
+)
+
+
+class TestCachePolicy(unittest.TestCase):
+    """Test cases for endpoint classification and cache keys."""
+
+    def test_endpoint_classes(self):
+        """Test that information service endpoints map to the expected policies."""
+        cases = {
+            "/v1/tab-info-service/sports/": "catalog",
+            "/v1/tab-info-service/sports/Soccer/competitions": "catalog",
+            "/v1/tab-info-service/racing/dates": "catalog",
+            "/v1/tab-info-service/racing/dates/2024-01-01/meetings": "meetings",
+            "/v1/tab-info-service/racing/dates/2024-01-01/meetings/R/MEL/races": "races",
+            "/v1/tab-info-service/racing/races/123": "races",
+            "/v1/tab-info-service/sports/Soccer/events": "events",
+            "/v1/tab-info-service/events/123/markets": "markets",
+            "/v1/tab-info-service/markets/456/odds": "odds",
+            "/v1/tab-info-service/events/123/live-odds": "odds",
+        }
+        for endpoint, name in cases.items():
+            with self.subTest(endpoint=endpoint):
+                self.assertEqual(get_cache_policy(endpoint).name, name)
+
+    def test_account_and_betting_endpoints_are_not_cached(self):
+        """Test that only information service endpoints are cacheable."""
+        self.assertIsNone(get_cache_policy("/v1/account-service/accounts/balance"))
+        self.assertIsNone(get_cache_policy("/v1/tab-betting-service/bets/active"))
+
+    def test_cache_key_normalizes_params(self):
+        """Test that parameter order and None values do not change the key."""
+        self.assertEqual(
+            cache_key("/e", {"b": "2", "a": "1", "c": None}),
+            cache_key("/e", {"a": "1", "b": "2"}),
+        )
+        self.assertEqual(cache_key("/e", {}), "/e")
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the ResponseCache class."""
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted as hits or misses."""
+        cache = ResponseCache()
+        self.assertIsNone(cache.get("key"))
+        cache.set("key", {"data": 1}, ttl=60)
+        self.assertEqual(cache.get("key").data, {"data": 1})
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    @patch('tab_api_mcp.cache.time.time')
+    def test_entries_expire(self, mock_time):
+        """Test that entries are not served after their TTL."""
+        mock_time.return_value = 1000.0
+        cache = ResponseCache()
+        cache.set("key", {"data": 1}, ttl=10)
+
+        mock_time.return_value = 1011.0
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction_by_entries(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_eviction_by_bytes(self):
+        """Test that the cache stays within its byte budget."""
+        cache = ResponseCache(max_bytes=100)
+        cache.set("a", 1, ttl=60, size=60)
+        cache.set("b", 2, ttl=60, size=60)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.total_bytes, 60)
+
+
+class TestDiskCacheStore(unittest.TestCase):
+    """Test cases for the DiskCacheStore class."""
+
+    def setUp(self):
+        """Create a temporary database file."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        """Remove the temporary database file."""
+        self.tmpdir.cleanup()
+
+    def test_entries_survive_restart(self):
+        """Test that written entries are loaded into a new cache."""
+        cache = ResponseCache()
+        cache.store = DiskCacheStore(self.path)
+        cache.set("/sports", {"sports": ["Soccer"]}, ttl=60, size=22,
+                  etag='"v1"', body=b'{"sports": ["Soccer"]}')
+        cache.set("/odds", {"odds": 1}, ttl=60)
+        cache.store.close()
+
+        restarted = ResponseCache()
+        store = DiskCacheStore(self.path)
+        self.assertEqual(store.load_into(restarted), 1)
+        store.close()
+
+        entry = restarted.get("/sports")
+        self.assertEqual(entry.data, {"sports": ["Soccer"]})
+        self.assertEqual(entry.etag, '"v1"')
+        self.assertIsNone(restarted.get("/odds"))
+
+    def test_unusable_entries_are_pruned(self):
+        """Test that expired entries without validators are not loaded."""
+        cache = ResponseCache()
+        cache.store = DiskCacheStore(self.path)
+        cache.set("/expired", {"a": 1}, ttl=-1, body=b'{"a": 1}')
+        cache.set("/revalidatable", {"b": 2}, ttl=-1, etag='"v1"', body=b'{"b": 2}')
+        cache.store.close()
+
+        restarted = ResponseCache()
+        store = DiskCacheStore(self.path)
+        self.assertEqual(store.load_into(restarted), 1)
+        store.close()
+
+        self.assertIsNone(restarted.peek("/expired"))
+        self.assertIsNotNone(restarted.peek("/revalidatable"))
+
+    def stored_keys(self):
+        """Return the keys of the rows in the database."""
+        connection = sqlite3.connect(self.path)
+        try:
+            return sorted(key for key, in connection.execute("SELECT key FROM responses"))
+        finally:
+            connection.close()
+
+    def test_evicted_entries_are_deleted(self):
+        """Test that rows are deleted when their entries leave the in-memory cache."""
+        cache = ResponseCache(max_entries=3)
+        cache.store = DiskCacheStore(self.path)
+        for key in ("/a", "/b", "/c"):
+            cache.set(key, {"k": key}, ttl=60, body=b'{}')
+        # An expired entry without validators is dropped when it is next looked up
+        cache.set("/gone", {}, ttl=-1, body=b'{}')
+        self.assertIsNone(cache.get("/gone"))
+        cache.store.flush()
+
+        self.assertEqual(self.stored_keys(), ["/b", "/c"])
+        cache.store.close()
+
+    @patch('tab_api_mcp.cache.CACHE_PRUNE_INTERVAL', 0.05)
+    def test_unusable_rows_are_pruned_while_running(self):
+        """Test that rows past use are pruned periodically, not only at startup."""
+        cache = ResponseCache()
+        cache.store = DiskCacheStore(self.path)
+        cache.set("/expiring", {"a": 1}, ttl=0.01, body=b'{"a": 1}')
+        cache.set("/fresh", {"b": 2}, ttl=60, body=b'{"b": 2}')
+        cache.store.flush()
+        self.assertEqual(self.stored_keys(), ["/expiring", "/fresh"])
+
+        time.sleep(0.2)
+        self.assertEqual(self.stored_keys(), ["/fresh"])
+        cache.store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,9 @@ from unittest.mock import patch, MagicMock, AsyncMock
 import sys
 import os
 import json
+import time
+import asyncio
+import httpx
 
 # Add the parent directory to the path so we can import the tab_api_mcp module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -14,6 +17,10 @@ from tab_api_mcp.common import (
     get_access_token,
     make_tab_api_request,
     create_starlette_app,
+    get_http_client,
+    close_http_client,
+    start_token_refresher,
+    stop_token_refresher,
 )
 
 
@@ -38,6 +45,12 @@ class TestCommon(unittest.IsolatedAsyncioTestCase):
             "expires_at": 0
         }
 
+        # Reset the response cache and rate limiters
+        tab_api_mcp.common.response_cache.clear()
+        tab_api_mcp.common.ratelimit.reset_rate_limiters()
+        tab_api_mcp.common.resilience.reset_circuit_breakers()
+        tab_api_mcp.common.hedging.reset_hedging()
+
         # Explicitly set module globals for tests
         tab_api_mcp.common.CLIENT_ID = "test_client_id"
         tab_api_mcp.common.CLIENT_SECRET = "test_client_secret"
@@ -128,5 +141,619 @@ class TestCommon(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(kwargs["json"], {"data": "value"})
 
 
+    async def test_http_client_is_shared(self):
+        """Test that upstream requests reuse a single pooled client."""
+        await close_http_client()
+        client = get_http_client()
+
+        self.assertIs(get_http_client(), client)
+
+        await close_http_client()
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(get_http_client(), client)
+        await close_http_client()
+
+    async def test_lifespan_manages_http_client(self):
+        """Test that the Starlette lifespan opens and closes the shared client."""
+        import tab_api_mcp.common
+
+        app = create_starlette_app(MagicMock())
+        async with app.router.lifespan_context(app):
+            client = tab_api_mcp.common.http_client
+            self.assertIsNotNone(client)
+            self.assertFalse(client.is_closed)
+
+        self.assertTrue(client.is_closed)
+        self.assertIsNone(tab_api_mcp.common.http_client)
+
+
+    @patch('tab_api_mcp.common.httpx.AsyncClient.post', new_callable=AsyncMock)
+    async def test_concurrent_token_requests_are_collapsed(self, mock_post):
+        """Test that concurrent callers share one in-flight token request."""
+        async def slow_post(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            mock_response = MagicMock()
+            mock_response.json.return_value = {"access_token": "shared_token", "expires_in": 3600}
+            return mock_response
+        mock_post.side_effect = slow_post
+
+        tokens = await asyncio.gather(*(get_access_token() for _ in range(10)))
+
+        self.assertEqual(tokens, ["shared_token"] * 10)
+        self.assertEqual(mock_post.await_count, 1)
+
+    @patch('tab_api_mcp.common.httpx.AsyncClient.post', new_callable=AsyncMock)
+    async def test_token_refreshed_before_expiry(self, mock_post):
+        """Test that the background refresher replaces a token about to expire."""
+        import tab_api_mcp.common
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"access_token": "fresh_token", "expires_in": 3600}
+        mock_post.return_value = mock_response
+
+        # A token inside the refresh margin is still served while it is replaced
+        tab_api_mcp.common.access_token_cache = {
+            "token": "old_token",
+            "expires_at": int(time.time()) + 10
+        }
+        self.assertEqual(await get_access_token(), "old_token")
+
+        start_token_refresher()
+        await asyncio.sleep(0.01)
+        await stop_token_refresher()
+
+        self.assertEqual(tab_api_mcp.common.access_token_cache["token"], "fresh_token")
+        self.assertEqual(mock_post.await_count, 1)
+
+    @patch('tab_api_mcp.common.httpx.AsyncClient.post', new_callable=AsyncMock)
+    async def test_short_lived_token_is_not_refreshed_back_to_back(self, mock_post):
+        """Test that tokens living no longer than the refresh margin are not requested in a loop."""
+        import tab_api_mcp.common
+        for expires_in in (30, 0):
+            with self.subTest(expires_in=expires_in):
+                mock_post.reset_mock()
+                mock_response = MagicMock()
+                mock_response.json.return_value = {"access_token": "short_token", "expires_in": expires_in}
+                mock_post.return_value = mock_response
+                tab_api_mcp.common.access_token_cache = {"token": None, "expires_at": 0}
+
+                start_token_refresher()
+                await asyncio.sleep(0.2)
+                await stop_token_refresher()
+
+                self.assertEqual(mock_post.await_count, 1)
+
+    async def test_unauthorized_response_refreshes_token_and_replays(self):
+        """Test that a 401 refreshes the token once and replays the request."""
+        import tab_api_mcp.common
+        tab_api_mcp.common.access_token_cache = {
+            "token": "revoked_token",
+            "expires_at": int(time.time()) + 3600
+        }
+        seen_tokens = []
+
+        def handler(request):
+            if request.url.path == "/oauth/token":
+                return httpx.Response(200, json={"access_token": "new_token", "expires_in": 3600})
+            seen_tokens.append(request.headers["Authorization"])
+            if request.headers["Authorization"] == "Bearer revoked_token":
+                return httpx.Response(401)
+            return httpx.Response(200, json={"data": "test_data"})
+
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            result = await make_tab_api_request("/test/endpoint")
+        finally:
+            await close_http_client()
+
+        self.assertEqual(result, {"data": "test_data"})
+        self.assertEqual(seen_tokens, ["Bearer revoked_token", "Bearer new_token"])
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_throttled_request_is_queued_again(self, mock_get_token):
+        """Test that a 429 slows the service's limiter and the request is retried."""
+        mock_get_token.return_value = "test_token"
+        responses = [httpx.Response(429, headers={"Retry-After": "0"}),
+                     httpx.Response(200, json={"balance": 10})]
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+        try:
+            result = await make_tab_api_request("/v1/account-service/balance")
+        finally:
+            await close_http_client()
+
+        self.assertEqual(result, {"balance": 10})
+        stats = tab_api_mcp.common.ratelimit.rate_limit_stats()["account-service"]
+        self.assertEqual(stats["throttled"], 1)
+        self.assertLess(stats["rate"], stats["start_rate"])
+
+    @patch('tab_api_mcp.resilience.RETRY_BASE_DELAY', 0.001)
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_persistent_throttling_is_not_retried_twice(self, mock_get_token):
+        """Test that a 429 is only queued again by the rate limiter, not also by the retry loop."""
+        mock_get_token.return_value = "test_token"
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            with self.assertRaises(tab_api_mcp.common.TabApiError) as raised:
+                await make_tab_api_request("/v1/account-service/balance")
+        finally:
+            await close_http_client()
+
+        self.assertEqual(raised.exception.status_code, 429)
+        self.assertEqual(len(requests), tab_api_mcp.common.ratelimit.RATE_LIMIT_MAX_RETRIES + 1)
+
+    @patch('tab_api_mcp.resilience.RETRY_BASE_DELAY', 0.001)
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_transient_get_failures_are_retried(self, mock_get_token):
+        """Test that GETs are retried after network errors and 5xx responses."""
+        mock_get_token.return_value = "test_token"
+        outcomes = [httpx.ConnectError("connection reset"), httpx.Response(503),
+                    httpx.Response(200, json={"balance": 10})]
+
+        def handler(request):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            result = await make_tab_api_request("/v1/account-service/balance")
+        finally:
+            await close_http_client()
+
+        self.assertEqual(result, {"balance": 10})
+        self.assertEqual(outcomes, [])
+        observations = tab_api_mcp.common.metrics.UPSTREAM_DURATION.observations
+        for status in ("error", "503", "200"):
+            self.assertIn(("GET", "/v1/account-service/balance", status), observations)
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_post_is_not_retried(self, mock_get_token):
+        """Test that a failed POST is reported without being sent again."""
+        mock_get_token.return_value = "test_token"
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            with self.assertRaises(tab_api_mcp.common.TabApiError) as error:
+                await make_tab_api_request("/v1/tab-betting-service/bet", method="POST", data={})
+        finally:
+            await close_http_client()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(error.exception.status_code, 503)
+        self.assertEqual(str(error.exception), "HTTP error: 503")
+
+    @patch('tab_api_mcp.resilience.CIRCUIT_FAILURE_THRESHOLD', 2)
+    @patch('tab_api_mcp.resilience.RETRY_MAX_RETRIES', 0)
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_open_circuit_fails_fast(self, mock_get_token):
+        """Test that a failing service stops being called once its circuit opens."""
+        mock_get_token.return_value = "test_token"
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502)
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            for _ in range(2):
+                with self.assertRaises(Exception):
+                    await make_tab_api_request("/v1/account-service/balance")
+            with self.assertRaisesRegex(Exception, "account-service is unavailable"):
+                await make_tab_api_request("/v1/account-service/balance")
+            # Other services are unaffected
+            with self.assertRaisesRegex(Exception, "HTTP error: 502"):
+                await make_tab_api_request("/v1/tab-betting-service/bets")
+        finally:
+            await close_http_client()
+
+        self.assertEqual(len(calls), 3)
+
+    @patch('tab_api_mcp.hedging.HEDGE_ENABLED', True)
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_slow_get_is_hedged(self, mock_get_token):
+        """Test that a backup request answers for a slow first request, which is cancelled."""
+        mock_get_token.return_value = "test_token"
+        import tab_api_mcp.common
+        for _ in range(20):
+            tab_api_mcp.common.hedging.record_latency("/v1/tab-info-service/markets/{}/odds", 0.05)
+        calls = []
+        cancelled = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(request)
+                    raise
+            return httpx.Response(200, json={"call": len(calls)})
+
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            start = time.monotonic()
+            result = await make_tab_api_request("/v1/tab-info-service/markets/m1/odds")
+            elapsed = time.monotonic() - start
+            await asyncio.sleep(0)
+        finally:
+            await close_http_client()
+
+        self.assertEqual(result, {"call": 2})
+        self.assertLess(elapsed, 1)
+        self.assertEqual(len(cancelled), 1)
+        self.assertEqual(tab_api_mcp.common.hedging.hedge_stats["backup_wins"], 1)
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_info_service_get_is_cached(self, mock_get_token):
+        """Test that information service GETs are served from the response cache."""
+        mock_get_token.return_value = "test_token"
+        calls = []
+
+        def handler(request):
+            calls.append(str(request.url))
+            return httpx.Response(200, json={"sports": ["Soccer"]})
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            endpoint = "/v1/tab-info-service/sports/"
+            first = await make_tab_api_request(endpoint, params={"jurisdiction": "NSW"})
+            second = await make_tab_api_request(endpoint, params={"jurisdiction": "NSW"})
+            await make_tab_api_request(endpoint, params={"jurisdiction": "VIC"})
+        finally:
+            await close_http_client()
+
+        self.assertEqual(first, {"sports": ["Soccer"]})
+        self.assertIs(second, first)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(tab_api_mcp.common.response_cache.hits, 1)
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_cached_odds_are_held_packed(self, mock_get_token):
+        """Test that odds are cached as price columns and rebuilt in full for each caller."""
+        mock_get_token.return_value = "test_token"
+        odds = {"marketId": "m1", "propositions": [
+            {"id": "1", "name": "HOME", "returnWin": 1.8, "bettingStatus": "Open"},
+            {"id": "2", "name": "AWAY", "returnWin": 2.1, "bettingStatus": "Open"},
+        ]}
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json=odds)))
+        try:
+            endpoint = "/v1/tab-info-service/markets/m1/odds"
+            first = await make_tab_api_request(endpoint)
+            second = await make_tab_api_request(endpoint)
+        finally:
+            await close_http_client()
+
+        self.assertEqual(first, odds)
+        self.assertEqual(second, odds)
+        self.assertEqual(tab_api_mcp.common.response_cache.hits, 1)
+        stored = tab_api_mcp.common.response_cache.peek(endpoint).data
+        self.assertIsInstance(stored, tab_api_mcp.common.marketbook.CompactOdds)
+        self.assertEqual(list(stored.win), [1.8, 2.1])
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_account_get_is_not_cached(self, mock_get_token):
+        """Test that account service GETs always go upstream."""
+        mock_get_token.return_value = "test_token"
+        calls = []
+
+        def handler(request):
+            calls.append(str(request.url))
+            return httpx.Response(200, json={"balance": len(calls)})
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await make_tab_api_request("/v1/account-service/accounts/balance")
+            result = await make_tab_api_request("/v1/account-service/accounts/balance")
+        finally:
+            await close_http_client()
+
+        self.assertEqual(result, {"balance": 2})
+
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_identical_concurrent_gets_are_coalesced(self, mock_get_token):
+        """Test that identical in-flight GETs share one upstream request."""
+        mock_get_token.return_value = "test_token"
+        calls = []
+
+        async def handler(request):
+            calls.append(str(request.url))
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"odds": [1.5, 2.5]})
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.cache.CACHE_ENABLED = False
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            endpoint = "/v1/tab-info-service/markets/123/odds"
+            results = await asyncio.gather(*(
+                make_tab_api_request(endpoint, params={"jurisdiction": "NSW"}) for _ in range(5)
+            ))
+        finally:
+            tab_api_mcp.common.cache.CACHE_ENABLED = True
+            await close_http_client()
+
+        self.assertEqual(results, [{"odds": [1.5, 2.5]}] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(tab_api_mcp.common._inflight_requests, {})
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_upstream_request_cancelled_when_all_callers_are(self, mock_get_token):
+        """Test that a shared request survives one cancelled caller but not all of them."""
+        mock_get_token.return_value = "test_token"
+        cancelled = []
+
+        async def handler(request):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(request)
+                raise
+            return httpx.Response(200, json={})
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            endpoint = "/v1/tab-info-service/markets/123/odds"
+            callers = [asyncio.ensure_future(make_tab_api_request(endpoint)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            upstream = tab_api_mcp.common._inflight_requests[tab_api_mcp.common.cache_key(endpoint, None)]
+
+            callers[0].cancel()
+            await asyncio.sleep(0.01)
+            self.assertFalse(upstream.done())
+
+            callers[1].cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0.01)
+        finally:
+            await close_http_client()
+
+        self.assertTrue(upstream.cancelled())
+        self.assertEqual(len(cancelled), 1)
+        self.assertEqual(tab_api_mcp.common._inflight_requests, {})
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_caller_after_cancellation_does_not_join_cancelled_request(self, mock_get_token):
+        """Test that a call arriving just after every caller was cancelled starts a new request."""
+        mock_get_token.return_value = "test_token"
+        release = asyncio.Event()
+
+        async def handler(request):
+            try:
+                await release.wait()
+            except asyncio.CancelledError:
+                # Closing a real connection takes a moment, leaving the request cancelled but not done
+                await asyncio.sleep(0.05)
+                raise
+            return httpx.Response(200, json={"odds": 1})
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            endpoint = "/v1/tab-info-service/markets/456/odds"
+            first = asyncio.ensure_future(make_tab_api_request(endpoint))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            await asyncio.gather(first, return_exceptions=True)
+
+            # The cancelled request has not finished unwinding yet
+            second = asyncio.ensure_future(make_tab_api_request(endpoint))
+            await asyncio.sleep(0.01)
+            release.set()
+            result = await second
+        finally:
+            await close_http_client()
+
+        self.assertEqual(result, {"odds": 1})
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_upstream_timeout_follows_deadline(self, mock_get_token):
+        """Test that unshared requests are given the time left before the call's deadline."""
+        mock_get_token.return_value = "test_token"
+        import tab_api_mcp.common
+        timeouts = []
+
+        def handler(request):
+            timeouts.append(request.extensions["timeout"]["read"])
+            return httpx.Response(200, json={})
+
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await make_tab_api_request("/v1/tab-betting-service/bets", method="POST", data={})
+            with tab_api_mcp.common.deadlines.deadline_scope(2):
+                await make_tab_api_request("/v1/tab-betting-service/bets", method="POST", data={})
+                # A GET may be shared, so it is bounded by each caller's wait instead
+                await make_tab_api_request("/v1/account-service/balance")
+            with tab_api_mcp.common.deadlines.deadline_scope(0):
+                with self.assertRaisesRegex(Exception, "Deadline exceeded"):
+                    await make_tab_api_request("/v1/tab-betting-service/bets", method="POST", data={})
+                with self.assertRaisesRegex(Exception, "Deadline exceeded"):
+                    await make_tab_api_request("/v1/account-service/history")
+        finally:
+            await close_http_client()
+
+        self.assertEqual(timeouts[0], tab_api_mcp.common.HTTP_TIMEOUT)
+        self.assertLessEqual(timeouts[1], 2)
+        self.assertEqual(timeouts[2], tab_api_mcp.common.HTTP_TIMEOUT)
+        self.assertEqual(len(timeouts), 3)
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_coalesced_waiters_keep_their_own_deadlines(self, mock_get_token):
+        """Test that a caller joining a shared request is not bound by the first caller's deadline."""
+        mock_get_token.return_value = "test_token"
+        import tab_api_mcp.common
+        requests = []
+
+        async def handler(request):
+            requests.append(request)
+            await asyncio.sleep(0.3)
+            return httpx.Response(200, json={"balance": 10})
+
+        async def call(seconds):
+            with tab_api_mcp.common.deadlines.deadline_scope(seconds):
+                return await make_tab_api_request("/v1/account-service/balance")
+
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            short, long = await asyncio.gather(call(0.1), call(10), return_exceptions=True)
+        finally:
+            await close_http_client()
+
+        self.assertIsInstance(short, tab_api_mcp.common.TabApiError)
+        self.assertIn("Deadline exceeded", str(short))
+        self.assertEqual(long, {"balance": 10})
+        self.assertEqual(len(requests), 1)
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_deadline_timeouts_do_not_open_the_circuit(self, mock_get_token):
+        """Test that timeouts cut short by a tight deadline are reported but not counted against the service."""
+        mock_get_token.return_value = "test_token"
+        import tab_api_mcp.common
+
+        def handler(request):
+            raise httpx.ReadTimeout("")
+
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            for _ in range(tab_api_mcp.common.resilience.CIRCUIT_FAILURE_THRESHOLD + 1):
+                with tab_api_mcp.common.deadlines.deadline_scope(0.15):
+                    with self.assertRaisesRegex(tab_api_mcp.common.TabApiError, "Deadline exceeded"):
+                        await make_tab_api_request("/v1/tab-betting-service/bets", method="POST", data={})
+        finally:
+            await close_http_client()
+
+        breaker = tab_api_mcp.common.resilience.get_circuit_breaker("/v1/tab-betting-service/bets")
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.failures, 0)
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_coalesced_waiters_share_errors(self, mock_get_token):
+        """Test that an upstream error is delivered to every waiter."""
+        mock_get_token.return_value = "test_token"
+
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            return httpx.Response(503)
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            results = await asyncio.gather(
+                *(make_tab_api_request("/v1/tab-info-service/racing/races/1") for _ in range(3)),
+                return_exceptions=True,
+            )
+        finally:
+            await close_http_client()
+
+        self.assertEqual([str(r) for r in results], ["HTTP error: 503"] * 3)
+
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_expired_entry_is_revalidated(self, mock_get_token):
+        """Test that an expired entry is revalidated with its ETag and renewed on 304."""
+        mock_get_token.return_value = "test_token"
+        conditional_headers = []
+
+        def handler(request):
+            conditional_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"meetings": ["RAN"]}, headers={"ETag": '"v1"'})
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        endpoint = "/v1/tab-info-service/racing/dates/2024-01-01/meetings"
+        try:
+            first = await make_tab_api_request(endpoint, params={"jurisdiction": "NSW"})
+
+            # Expire the entry so the next call has to go upstream
+            key = tab_api_mcp.common.cache_key(endpoint, {"jurisdiction": "NSW"})
+            tab_api_mcp.common.response_cache.peek(key).expires_at = 0
+
+            second = await make_tab_api_request(endpoint, params={"jurisdiction": "NSW"})
+            third = await make_tab_api_request(endpoint, params={"jurisdiction": "NSW"})
+        finally:
+            await close_http_client()
+
+        self.assertEqual(conditional_headers, [None, '"v1"'])
+        self.assertIs(second, first)
+        self.assertIs(third, first)
+        self.assertEqual(tab_api_mcp.common.response_cache.revalidations, 1)
+
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_stale_while_revalidate(self, mock_get_token):
+        """Test that an expired catalog response is served while it is refreshed."""
+        mock_get_token.return_value = "test_token"
+        versions = iter([{"dates": ["v1"]}, {"dates": ["v2"]}])
+
+        async def handler(request):
+            return httpx.Response(200, json=next(versions))
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.cache.STALE_WHILE_REVALIDATE = True
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        endpoint = "/v1/tab-info-service/racing/dates"
+        try:
+            await make_tab_api_request(endpoint)
+            tab_api_mcp.common.response_cache.peek(endpoint).expires_at = time.time() - 1
+
+            stale = await make_tab_api_request(endpoint)
+            await asyncio.sleep(0.01)
+            refreshed = await make_tab_api_request(endpoint)
+        finally:
+            tab_api_mcp.common.cache.STALE_WHILE_REVALIDATE = False
+            await close_http_client()
+
+        self.assertEqual(stale, {"dates": ["v1"]})
+        self.assertEqual(refreshed, {"dates": ["v2"]})
+        self.assertEqual(tab_api_mcp.common.response_cache.stale_hits, 1)
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_stale_response_not_served_past_max_staleness(self, mock_get_token):
+        """Test that responses older than the max-staleness window are refetched."""
+        mock_get_token.return_value = "test_token"
+
+        async def handler(request):
+            return httpx.Response(200, json={"sports": ["new"]})
+
+        import tab_api_mcp.common
+        tab_api_mcp.common.cache.STALE_WHILE_REVALIDATE = True
+        tab_api_mcp.common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        endpoint = "/v1/tab-info-service/sports/"
+        tab_api_mcp.common.response_cache.set(endpoint, {"sports": ["old"]}, ttl=-10, max_stale=5)
+        try:
+            result = await make_tab_api_request(endpoint)
+        finally:
+            tab_api_mcp.common.cache.STALE_WHILE_REVALIDATE = False
+            await close_http_client()
+
+        self.assertEqual(result, {"sports": ["new"]})
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""Tests for the hedging module."""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp.hedging import (
+    endpoint_template,
+    LatencyWindow,
+    record_latency,
+    hedge_delay,
+    spend_hedge_budget,
+    hedge_stats,
+    reset_hedging,
+)
+
+
+class TestHedging(unittest.TestCase):
+    """Test cases for hedging decisions."""
+
+    def setUp(self):
+        """Start every test without recorded latencies."""
+        reset_hedging()
+
+    def test_endpoint_template(self):
+        """Test that identifiers are replaced so requests of one kind share a template."""
+        self.assertEqual(endpoint_template("/v1/tab-info-service/racing/dates/2024-01-01/meetings/R/RAN/races"),
+                         "/v1/tab-info-service/racing/dates/{}/meetings/{}/races")
+        self.assertEqual(endpoint_template("/v1/tab-info-service/markets/123/odds"),
+                         "/v1/tab-info-service/markets/{}/odds")
+        self.assertEqual(endpoint_template("/v1/tab-info-service/sports/"), "/v1/tab-info-service/sports")
+
+    def test_percentile(self):
+        """Test that percentiles are taken over the recent samples."""
+        window = LatencyWindow(size=100)
+        for millis in range(1, 201):
+            window.record(millis / 1000)
+
+        self.assertEqual(window.percentile(50), 0.15)
+        self.assertEqual(window.percentile(100), 0.2)
+        self.assertIsNone(LatencyWindow().percentile(95))
+
+    @patch('tab_api_mcp.hedging.HEDGE_MIN_DELAY', 0.01)
+    def test_hedge_delay_needs_enough_samples(self):
+        """Test that requests are only hedged once their template has a latency history."""
+        template = "/v1/tab-info-service/markets/{}/odds"
+        for _ in range(19):
+            record_latency(template, 0.1)
+        self.assertIsNone(hedge_delay(template))
+
+        record_latency(template, 0.5)
+
+        self.assertEqual(hedge_delay(template), 0.1)
+        with patch('tab_api_mcp.hedging.HEDGE_PERCENTILE', 100):
+            self.assertEqual(hedge_delay(template), 0.5)
+
+    @patch('tab_api_mcp.hedging.HEDGE_BUDGET', 0.1)
+    @patch('tab_api_mcp.hedging.HEDGE_BUDGET_BURST', 1.0)
+    def test_budget(self):
+        """Test that backups are limited to a fraction of eligible requests."""
+        reset_hedging()
+        self.assertTrue(spend_hedge_budget())
+        self.assertFalse(spend_hedge_budget())
+
+        for _ in range(11):
+            hedge_delay("/v1/tab-info-service/sports")
+
+        self.assertTrue(spend_hedge_budget())
+        self.assertEqual(hedge_stats["hedged"], 2)
+        self.assertEqual(hedge_stats["over_budget"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
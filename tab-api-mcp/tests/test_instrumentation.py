@@ -0,0 +1,75 @@
+"""Tests for the instrumentation and deadlines modules."""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import asyncio
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp import deadlines
+from tab_api_mcp.instrumentation import instrument_tool
+
+
+class TestDeadlines(unittest.IsolatedAsyncioTestCase):
+    """Test cases for tool call deadlines."""
+
+    def test_nested_scope_keeps_earlier_deadline(self):
+        """Test that an inner scope cannot extend the deadline of an outer one."""
+        self.assertIsNone(deadlines.remaining_time())
+        with deadlines.deadline_scope(1):
+            with deadlines.deadline_scope(60):
+                self.assertLessEqual(deadlines.remaining_time(), 1)
+                self.assertFalse(deadlines.has_time_for(5))
+            self.assertLessEqual(deadlines.request_timeout(30), 1)
+        self.assertIsNone(deadlines.remaining_time())
+        self.assertEqual(deadlines.request_timeout(30), 30)
+
+    async def test_tasks_inherit_deadline(self):
+        """Test that fan-out tasks started in a scope share its deadline."""
+        async def remaining():
+            return deadlines.remaining_time()
+
+        with deadlines.deadline_scope(5):
+            inherited = await asyncio.ensure_future(remaining())
+
+        self.assertLessEqual(inherited, 5)
+
+    async def test_tool_times_out_and_is_cancelled(self):
+        """Test that a tool still running at its deadline is cancelled and reports it."""
+        cancelled = []
+
+        @instrument_tool(deadline=0.05)
+        async def slow_tool(event_id: str) -> str:
+            """Take too long."""
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(event_id)
+                raise
+            return "done"
+
+        result = await slow_tool("E1")
+
+        self.assertEqual(result, "Error: slow_tool did not finish within its 0.05s deadline")
+        self.assertEqual(cancelled, ["E1"])
+        self.assertEqual(slow_tool.__name__, "slow_tool")
+        self.assertEqual(slow_tool.__doc__, "Take too long.")
+
+    async def test_per_tool_override(self):
+        """Test that a deadline set for one tool replaces the defaults."""
+        @instrument_tool
+        async def quick_tool() -> float:
+            return deadlines.remaining_time()
+
+        with patch.dict('tab_api_mcp.deadlines.TOOL_DEADLINES', {"quick_tool": 2}):
+            self.assertLessEqual(await quick_tool(), 2)
+        with patch('tab_api_mcp.deadlines.TOOL_DEADLINE', 0):
+            self.assertIsNone(await quick_tool())
+
+
+if __name__ == '__main__':
+    unittest.main()
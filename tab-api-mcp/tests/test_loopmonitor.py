@@ -0,0 +1,119 @@
+"""Tests for the loopmonitor module."""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import io
+import time
+import asyncio
+import contextlib
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp import loopmonitor, metrics
+from tab_api_mcp.instrumentation import instrument_tool
+
+
+def busy_for(seconds):
+    """Block the event loop, as decoding a large payload would."""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+@instrument_tool
+async def decode_large_payload():
+    """A tool that blocks the loop while decoding."""
+    await asyncio.sleep(0.15)
+    with loopmonitor.blocking_section("decode", 5000000):
+        busy_for(0.4)
+    return "ok"
+
+
+@patch('tab_api_mcp.loopmonitor.BLOCKING_THRESHOLD', 0.2)
+class TestLoopMonitor(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the event loop monitor."""
+
+    def setUp(self):
+        """Start from empty metrics."""
+        metrics.LOOP_LAG.clear()
+        metrics.LOOP_BLOCKED.clear()
+
+    async def asyncTearDown(self):
+        """Stop the monitor."""
+        await loopmonitor.stop_loop_monitor()
+
+    async def test_lag_is_measured(self):
+        """Test that lag is observed continuously and spikes when the loop blocks."""
+        loopmonitor.start_loop_monitor()
+        await asyncio.sleep(0.35)
+        observation = metrics.LOOP_LAG.observations[()]
+        self.assertGreaterEqual(sum(observation[:-1]), 2)
+        self.assertLess(observation[-1], 0.2)
+
+        await asyncio.sleep(0.05)
+        busy_for(0.3)
+        await asyncio.sleep(0.15)
+        self.assertGreater(observation[-1], 0.2)
+
+    async def test_blocking_call_is_logged_with_tool_and_size(self):
+        """Test that the watchdog names the tool and payload that block the loop."""
+        loopmonitor.start_loop_monitor()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(await decode_large_payload(), "ok")
+            await asyncio.sleep(0.15)
+
+        self.assertIn("Event loop blocked", output.getvalue())
+        self.assertIn("in decode of 5000000 bytes for tool decode_large_payload", output.getvalue())
+        self.assertIn("busy_for", output.getvalue())
+        # Each stall is reported once
+        self.assertEqual(output.getvalue().count("Event loop blocked"), 1)
+        self.assertEqual(metrics.LOOP_BLOCKED.values[("decode_large_payload",)], 1)
+
+    async def test_short_work_is_not_reported(self):
+        """Test that work shorter than the threshold is not logged."""
+        loopmonitor.start_loop_monitor()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            await asyncio.sleep(0.15)
+            busy_for(0.05)
+            await asyncio.sleep(0.25)
+        self.assertEqual(output.getvalue(), "")
+
+    def test_activity_is_restored_after_section(self):
+        """Test that nested sections restore the outer one and clear on exit."""
+        with loopmonitor.tool_scope("get_meetings"):
+            with loopmonitor.blocking_section("serialize", 3, "items"):
+                self.assertEqual(loopmonitor.describe_activity(), "in serialize of 3 items for tool get_meetings")
+                with loopmonitor.blocking_section("decode", 10):
+                    self.assertEqual(loopmonitor.describe_activity(), "in decode of 10 bytes for tool get_meetings")
+                self.assertIn("serialize", loopmonitor.describe_activity())
+        self.assertEqual(loopmonitor.describe_activity(), "outside any marked section")
+
+    def test_activity_is_read_from_one_snapshot(self):
+        """Test that a section ending while it is described does not break the report."""
+        class EndingActivity(dict):
+            """A section that ends as soon as one of its keys is read."""
+            def __getitem__(self, key):
+                value = super().__getitem__(key)
+                self.clear()
+                return value
+
+        activity = EndingActivity(stage="decode", tool="get_meetings", size=10, unit="bytes")
+        with patch('tab_api_mcp.loopmonitor._activity', activity):
+            self.assertEqual(loopmonitor.describe_activity(), "in decode of 10 bytes for tool get_meetings")
+
+    @patch('tab_api_mcp.loopmonitor.LOOP_MONITOR_ENABLED', False)
+    async def test_disabled_monitor_does_not_start(self):
+        """Test that the monitor can be turned off."""
+        loopmonitor.start_loop_monitor()
+        self.assertIsNone(loopmonitor._monitor_task)
+        self.assertIsNone(loopmonitor._watchdog)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""Tests for the marketbook module."""
+
+import unittest
+import sys
+import os
+import json
+import gc
+import tracemalloc
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp.marketbook import (
+    extract_selections,
+    MarketBook,
+    CompactOdds,
+    compact_prices,
+    expand_prices,
+)
+
+RACE_ODDS = {
+    "runners": [
+        {"runnerNumber": 1, "runnerName": "FAST", "fixedOdds": {"returnWin": 3.5, "returnPlace": 1.4, "bettingStatus": "Open"}},
+        {"runnerNumber": 2, "runnerName": "SLOW", "fixedOdds": {"returnWin": 12.0, "returnPlace": 3.2, "bettingStatus": "Open"}},
+    ]
+}
+
+EVENT_ODDS = {
+    "markets": [
+        {"id": "m1", "propositions": [{"id": "home", "returnWin": 1.8}, {"id": "away", "returnWin": 2.1}]},
+        {"marketId": "m2", "selections": [{"selectionId": "over", "winPrice": 1.9, "status": "SUSPENDED"}]},
+    ]
+}
+
+
+def market_odds(market):
+    """An odds payload shaped like the information service's, with twenty selections."""
+    return {"marketId": market, "marketName": "WIN", "propositions": [
+        {"id": f"{market}-{n}", "name": f"RUNNER {n}", "returnWin": 2.0 + n / 4, "returnPlace": 1.1 + n / 10,
+         "bettingStatus": "Open", "allowPlace": True, "differential": None}
+        for n in range(20)
+    ]}
+
+
+class TestSelections(unittest.TestCase):
+    """Test cases for flattening odds payloads."""
+
+    def test_extract_racing_runners(self):
+        """Test that runners with nested fixed odds are flattened."""
+        selections = extract_selections(RACE_ODDS)
+
+        self.assertEqual(selections["1"], {"win": 3.5, "place": 1.4, "status": "Open"})
+        self.assertEqual(len(selections), 2)
+
+    def test_extract_event_markets(self):
+        """Test that selections of several markets are keyed by market."""
+        selections = extract_selections(EVENT_ODDS)
+
+        self.assertEqual(set(selections), {"m1/home", "m1/away", "m2/over"})
+        self.assertEqual(selections["m2/over"], {"win": 1.9, "place": None, "status": "SUSPENDED"})
+
+
+class TestMarketBook(unittest.TestCase):
+    """Test cases for the MarketBook class."""
+
+    def test_update_reports_changed_and_removed(self):
+        """Test that only changed, new and removed selections are reported."""
+        book = MarketBook()
+        book.update({"1": {"win": 3.5}, "2": {"win": 12.0}, "3": {"win": 8.0, "status": "Open"}})
+
+        changed, removed = book.update({"1": {"win": 3.5}, "2": {"win": 11.0}, "4": {"win": 20.0}})
+
+        self.assertEqual(changed, ["2", "4"])
+        self.assertEqual(removed, ["3"])
+        self.assertEqual(book.to_dict(), {
+            "1": {"win": 3.5, "place": None, "status": None},
+            "2": {"win": 11.0, "place": None, "status": None},
+            "4": {"win": 20.0, "place": None, "status": None},
+        })
+
+    def test_missing_prices_do_not_count_as_changes(self):
+        """Test that selections without prices compare equal between updates."""
+        book = MarketBook()
+        book.update({"1": {"win": None, "status": "Suspended"}})
+
+        self.assertEqual(book.update({"1": {"win": None, "status": "Suspended"}}), ([], []))
+        self.assertEqual(book.update({"1": {"win": None, "status": "Open"}}), (["1"], []))
+
+
+class TestCompactOdds(unittest.TestCase):
+    """Test cases for packing odds payloads into price columns."""
+
+    def test_payloads_expand_to_the_original(self):
+        """Test that packed payloads come back equal and in the same key order."""
+        for payload in (RACE_ODDS, EVENT_ODDS, market_odds("m1")):
+            with self.subTest(payload=payload):
+                compact = compact_prices(json.loads(json.dumps(payload)))
+
+                self.assertIsInstance(compact, CompactOdds)
+                self.assertEqual(json.dumps(expand_prices(compact)), json.dumps(payload))
+
+        self.assertEqual(list(compact.win)[:2], [2.0, 2.25])
+
+    def test_values_that_do_not_fit_a_column_are_kept(self):
+        """Test that integer prices, missing prices and odd statuses survive packing unchanged."""
+        payload = {"propositions": [
+            {"id": "a", "returnWin": 3, "returnPlace": None, "bettingStatus": "Open"},
+            {"id": "b", "fixedOdds": {"returnWin": 1.5}, "status": {"code": "LATE"}},
+            {"name": "no id", "returnWin": 9.0},
+        ]}
+
+        self.assertEqual(expand_prices(compact_prices(payload)), payload)
+
+    def test_payloads_without_selections_are_not_packed(self):
+        """Test that other payloads are held as they are."""
+        payload = {"id": "e1", "name": "TEAM A V TEAM B"}
+
+        self.assertIs(compact_prices(payload), payload)
+        self.assertIs(expand_prices(payload), payload)
+
+    def test_packed_markets_take_much_less_memory(self):
+        """Test that packed odds take at most 60% of the memory of the decoded payload."""
+        bodies = [json.dumps(market_odds(f"m{n}")) for n in range(200)]
+        compact_prices(json.loads(bodies[0]))
+
+        def held_per_market(load):
+            gc.collect()
+            tracemalloc.start()
+            payloads = [load(body) for body in bodies]
+            gc.collect()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return size / len(payloads)
+
+        self.assertLess(held_per_market(lambda body: compact_prices(json.loads(body))), 0.6 * held_per_market(json.loads))
+
+
+if __name__ == '__main__':
+    unittest.main()
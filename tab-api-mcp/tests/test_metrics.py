@@ -0,0 +1,92 @@
+"""Tests for the metrics module."""
+
+import unittest
+import sys
+import os
+import httpx
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp import metrics
+from tab_api_mcp.common import create_starlette_app, response_cache
+from tab_api_mcp.instrumentation import instrument_tool
+
+
+class TestMetrics(unittest.IsolatedAsyncioTestCase):
+    """Test cases for metrics collection and rendering."""
+
+    def test_counter_and_gauge_rendering(self):
+        """Test that labelled values are rendered with escaped labels."""
+        counter = metrics.Counter("test_events_total", "Events seen.", ["kind"])
+        gauge = metrics.Gauge("test_level", "Current level.")
+        counter.inc('say "hi"')
+        counter.inc('say "hi"', amount=2)
+        gauge.set(0.25)
+
+        self.assertEqual(counter.render(), '# HELP test_events_total Events seen.\n'
+                                           '# TYPE test_events_total counter\n'
+                                           'test_events_total{kind="say \\"hi\\""} 3')
+        self.assertEqual(gauge.render().splitlines()[-1], "test_level 0.25")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that observations fall in their bucket and every larger one."""
+        histogram = metrics.Histogram("test_seconds", "Durations.", ["tool"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "get_sports")
+
+        lines = histogram.render().splitlines()[2:]
+
+        self.assertEqual(lines, [
+            'test_seconds_bucket{tool="get_sports",le="0.1"} 2',
+            'test_seconds_bucket{tool="get_sports",le="1"} 3',
+            'test_seconds_bucket{tool="get_sports",le="+Inf"} 4',
+            'test_seconds_sum{tool="get_sports"} 3.65',
+            'test_seconds_count{tool="get_sports"} 4',
+        ])
+
+    async def test_tool_calls_are_measured(self):
+        """Test that tool calls, errors and durations are recorded per tool."""
+        @instrument_tool
+        async def measured_tool(fail: bool) -> str:
+            return "Error fetching: HTTP error: 503" if fail else "{}"
+
+        await measured_tool(False)
+        await measured_tool(True)
+
+        self.assertEqual(metrics.TOOL_CALLS.values[("measured_tool",)], 2)
+        self.assertEqual(metrics.TOOL_ERRORS.values[("measured_tool",)], 1)
+        self.assertEqual(sum(metrics.TOOL_DURATION.observations[("measured_tool",)][:-1]), 2)
+
+    async def test_metrics_route(self):
+        """Test that the app serves every metric in the Prometheus text format."""
+        app = create_starlette_app(None)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        for name in ("tab_mcp_tool_duration_seconds", "tab_mcp_upstream_request_duration_seconds",
+                     "tab_mcp_token_refreshes_total", "tab_mcp_cache_hit_ratio", "tab_mcp_http_pool_max_connections",
+                     "tab_mcp_sse_sessions", "tab_mcp_upstream_requests_in_flight"):
+            self.assertIn(f"# TYPE {name} ", response.text)
+
+    async def test_cache_revalidations_are_exported(self):
+        """Test that expired entries renewed by a 304 are counted in the cache metrics."""
+        response_cache.clear()
+        response_cache.set("revalidated", {"data": 1}, ttl=0, max_stale=60, etag='"v1"')
+        response_cache.revalidate("revalidated", 60, 60)
+
+        app = create_starlette_app(None)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/metrics")
+        response_cache.clear()
+
+        self.assertIn('tab_mcp_cache_requests_total{result="revalidated"} 1', response.text)
+
+
+if __name__ == '__main__':
+    unittest.main()
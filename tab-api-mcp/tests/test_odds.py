@@ -0,0 +1,195 @@
+"""Tests for the odds module."""
+
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import sys
+import os
+import asyncio
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp.odds import (
+    fetch_odds_batch,
+    add_live_odds_subscriber,
+    remove_live_odds_subscriber,
+    live_odds_connection,
+    stop_live_odds_pollers,
+    versioned_odds,
+)
+
+RACE_ODDS = {
+    "runners": [
+        {"runnerNumber": 1, "runnerName": "FAST", "fixedOdds": {"returnWin": 3.5, "returnPlace": 1.4, "bettingStatus": "Open"}},
+        {"runnerNumber": 2, "runnerName": "SLOW", "fixedOdds": {"returnWin": 12.0, "returnPlace": 3.2, "bettingStatus": "Open"}},
+    ]
+}
+
+
+class TestVersionedOdds(unittest.TestCase):
+    """Test cases for answering odds requests relative to a version."""
+
+    def test_full_response_carries_version(self):
+        """Test that a request without since_version returns everything and a token."""
+        result = versioned_odds("market:full", RACE_ODDS)
+
+        self.assertEqual(result["runners"], RACE_ODDS["runners"])
+        self.assertIn("oddsVersion", result)
+        self.assertNotIn("oddsVersion", RACE_ODDS)
+
+    def test_delta_since_version(self):
+        """Test that only changed selections are returned since a known version."""
+        token = versioned_odds("market:delta", RACE_ODDS)["oddsVersion"]
+        moved = {"runners": [RACE_ODDS["runners"][0],
+                             dict(RACE_ODDS["runners"][1], fixedOdds={"returnWin": 10.0, "returnPlace": 3.2, "bettingStatus": "Open"})]}
+
+        delta = versioned_odds("market:delta", moved, token)
+
+        self.assertEqual(delta["changed"], {"2": {"win": 10.0, "place": 3.2, "status": "Open"}})
+        self.assertEqual(delta["removed"], [])
+        self.assertNotEqual(delta["oddsVersion"], token)
+
+        # Nothing has moved since the new version
+        unchanged = versioned_odds("market:delta", moved, delta["oddsVersion"])
+        self.assertEqual(unchanged["changed"], {})
+        self.assertEqual(unchanged["oddsVersion"], delta["oddsVersion"])
+
+    def test_full_response_projection_keeps_version(self):
+        """Test that fields project the full payload without dropping the version token."""
+        result = versioned_odds("market:fields", RACE_ODDS, fields="runners.runnerName")
+
+        self.assertEqual(result["runners"], [{"runnerName": "FAST"}, {"runnerName": "SLOW"}])
+        self.assertIn("oddsVersion", result)
+
+    def test_unknown_version_returns_full_response(self):
+        """Test that a token from another process or history falls back to the full payload."""
+        result = versioned_odds("market:unknown", RACE_ODDS, "deadbeef-1")
+
+        self.assertEqual(result["runners"], RACE_ODDS["runners"])
+
+    @patch('tab_api_mcp.odds.ODDS_HISTORY_LENGTH', 2)
+    def test_version_older_than_history_returns_full_response(self):
+        """Test that a version whose changes were forgotten falls back to the full payload."""
+        token = versioned_odds("market:old", {"runners": [{"runnerNumber": 1, "returnWin": 2.0}]})["oddsVersion"]
+        for price in (3.0, 4.0, 5.0):
+            versioned_odds("market:old", {"runners": [{"runnerNumber": 1, "returnWin": price}]})
+
+        result = versioned_odds("market:old", {"runners": [{"runnerNumber": 1, "returnWin": 5.0}]}, token)
+
+        self.assertIn("runners", result)
+        self.assertNotIn("changed", result)
+
+
+class TestOddsBatch(unittest.IsolatedAsyncioTestCase):
+    """Test cases for fetching odds in batches."""
+
+    @patch('tab_api_mcp.common.make_tab_api_request', new_callable=AsyncMock)
+    async def test_batch_deduplicates_and_isolates_errors(self, mock_request):
+        """Test that duplicate markets are fetched once and failures are reported per market."""
+        async def fake_request(endpoint, params=None):
+            if "/markets/bad/" in endpoint:
+                raise Exception("HTTP error: 404")
+            return {"endpoint": endpoint}
+        mock_request.side_effect = fake_request
+
+        result = await fetch_odds_batch(["1", "2", "1", "bad"], jurisdiction="VIC")
+
+        self.assertEqual(mock_request.await_count, 3)
+        self.assertEqual(result["markets"]["1"], {"endpoint": "/v1/tab-info-service/markets/1/odds"})
+        self.assertEqual(list(result["markets"]), ["1", "2"])
+        self.assertEqual(result["errors"], {"bad": "HTTP error: 404"})
+        self.assertEqual(mock_request.call_args.kwargs["params"], {"jurisdiction": "VIC"})
+
+    @patch('tab_api_mcp.common.make_tab_api_request', new_callable=AsyncMock)
+    async def test_batch_respects_concurrency_limit(self, mock_request):
+        """Test that no more than the concurrency limit of requests run at once."""
+        in_flight = []
+        peak = []
+
+        async def fake_request(endpoint, params=None):
+            in_flight.append(endpoint)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(endpoint)
+            return {}
+        mock_request.side_effect = fake_request
+
+        await fetch_odds_batch([str(i) for i in range(10)], concurrency=3)
+
+        self.assertEqual(max(peak), 3)
+
+
+class TestLiveOddsSubscriptions(unittest.IsolatedAsyncioTestCase):
+    """Test cases for live odds subscriptions."""
+
+    async def asyncTearDown(self):
+        """Stop any pollers left running."""
+        await stop_live_odds_pollers()
+
+    @patch('tab_api_mcp.odds.LIVE_ODDS_POLL_INTERVAL', 0.01)
+    @patch('tab_api_mcp.common.make_tab_api_request', new_callable=AsyncMock)
+    async def test_sessions_share_one_poller_and_receive_changes(self, mock_request):
+        """Test that one poller pushes only changed selections to every session."""
+        moved = {"runners": [dict(RACE_ODDS["runners"][0], fixedOdds={"returnWin": 3.0, "returnPlace": 1.4, "bettingStatus": "Open"}),
+                             RACE_ODDS["runners"][1]]}
+        mock_request.side_effect = [RACE_ODDS, RACE_ODDS, moved] + [moved] * 100
+        first, second = MagicMock(), MagicMock()
+        first.send_log_message = AsyncMock()
+        second.send_log_message = AsyncMock()
+
+        result = await add_live_odds_subscriber(first, "E1", "NSW")
+        await add_live_odds_subscriber(second, "E1", "NSW")
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(result["odds"], RACE_ODDS)
+        for session in (first, second):
+            session.send_log_message.assert_awaited_once()
+            message = session.send_log_message.call_args.kwargs["data"]
+            self.assertEqual(message["changed"], {"1": {"win": 3.0, "place": 1.4, "status": "Open"}})
+            self.assertEqual(message["removed"], [])
+
+    @patch('tab_api_mcp.odds.LIVE_ODDS_POLL_INTERVAL', 0.01)
+    @patch('tab_api_mcp.common.make_tab_api_request', new_callable=AsyncMock)
+    async def test_last_unsubscribe_stops_polling(self, mock_request):
+        """Test that the poller stops when its last session unsubscribes."""
+        mock_request.return_value = RACE_ODDS
+        session = MagicMock()
+        session.send_log_message = AsyncMock()
+
+        await add_live_odds_subscriber(session, "E2", "NSW")
+        self.assertTrue(remove_live_odds_subscriber(session, "E2", "NSW"))
+        await asyncio.sleep(0.05)
+        calls = mock_request.await_count
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(mock_request.await_count, calls)
+        self.assertFalse(remove_live_odds_subscriber(session, "E2", "NSW"))
+
+    @patch('tab_api_mcp.odds.LIVE_ODDS_POLL_INTERVAL', 0.01)
+    @patch('tab_api_mcp.common.make_tab_api_request', new_callable=AsyncMock)
+    async def test_closed_connection_stops_polling_without_changes(self, mock_request):
+        """Test that a session whose connection ends stops its poller even when no prices change."""
+        mock_request.return_value = RACE_ODDS
+        session, other = MagicMock(), MagicMock()
+        session.send_log_message = AsyncMock()
+        other.send_log_message = AsyncMock()
+
+        with live_odds_connection():
+            await add_live_odds_subscriber(session, "E3", "NSW")
+            await asyncio.sleep(0.03)
+        with live_odds_connection():
+            await add_live_odds_subscriber(other, "E4", "NSW")
+            # Unsubscribing before the connection ends is not undone twice
+            self.assertTrue(remove_live_odds_subscriber(other, "E4", "NSW"))
+        await asyncio.sleep(0.03)
+        calls = mock_request.await_count
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(mock_request.await_count, calls)
+        session.send_log_message.assert_not_awaited()
+        self.assertFalse(remove_live_odds_subscriber(session, "E3", "NSW"))
+
+
+if __name__ == '__main__':
+    unittest.main()
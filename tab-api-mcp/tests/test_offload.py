@@ -0,0 +1,103 @@
+"""Tests for the offload module."""
+
+import unittest
+from unittest.mock import patch, AsyncMock
+import sys
+import os
+import json
+import threading
+import httpx
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp import common, metrics, offload
+from tab_api_mcp.common import make_tab_api_request, close_http_client
+from tab_api_mcp.instrumentation import instrument_tool
+from tab_api_mcp.serialization import dump_json, encode_response
+
+EVENTS_ENDPOINT = "/v1/tab-info-service/sports/Soccer/competitions/EPL/events"
+EVENTS = {"events": [{"id": str(number), "name": f"Event {number}", "markets": []} for number in range(200)]}
+
+
+def current_thread() -> str:
+    return threading.current_thread().name
+
+
+@instrument_tool
+async def get_events() -> str:
+    """A tool that fetches a payload and returns it encoded."""
+    return await encode_response(await make_tab_api_request(EVENTS_ENDPOINT))
+
+
+@patch('tab_api_mcp.offload.OFFLOAD_THRESHOLD', 1000)
+class TestOffload(unittest.IsolatedAsyncioTestCase):
+    """Test cases for offloading large payloads to worker threads."""
+
+    def setUp(self):
+        """Start from an empty cache and counters."""
+        common.response_cache.clear()
+        common.ratelimit.reset_rate_limiters()
+        common.resilience.reset_circuit_breakers()
+        metrics.OFFLOADED.clear()
+
+    async def asyncTearDown(self):
+        """Close the client and stop the worker pool."""
+        await close_http_client()
+        offload.shutdown_executor()
+
+    async def test_small_payloads_stay_inline(self):
+        """Test that only payloads over the threshold go to a worker thread."""
+        self.assertEqual(await offload.run_blocking("decode", 999, current_thread), threading.current_thread().name)
+        self.assertTrue((await offload.run_blocking("decode", 1000, current_thread)).startswith("tab-api-json"))
+        self.assertEqual(metrics.OFFLOADED.values, {("decode",): 1})
+
+    async def test_zero_threshold_never_offloads(self):
+        """Test that a threshold of 0 keeps all work on the event loop."""
+        with patch('tab_api_mcp.offload.OFFLOAD_THRESHOLD', 0):
+            result = await offload.run_blocking("decode", 10 ** 9, current_thread)
+        self.assertEqual(result, threading.current_thread().name)
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_large_response_is_decoded_and_encoded_off_the_loop(self, mock_get_token):
+        """Test that a tool built on a large response decodes and encodes it on workers."""
+        mock_get_token.return_value = "test_token"
+        common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json=EVENTS)))
+
+        result = await get_events()
+
+        self.assertEqual(json.loads(result), EVENTS)
+        self.assertEqual(result, dump_json(EVENTS))
+        self.assertEqual(metrics.OFFLOADED.values, {("decode",): 1, ("serialize",): 1})
+
+        # A cache hit is still counted as a large payload when it is encoded
+        self.assertEqual(json.loads(await get_events()), EVENTS)
+        self.assertEqual(metrics.OFFLOADED.values, {("decode",): 1, ("serialize",): 2})
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_small_response_is_handled_inline(self, mock_get_token):
+        """Test that small responses are decoded and encoded on the event loop."""
+        mock_get_token.return_value = "test_token"
+        common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"events": []})))
+
+        self.assertEqual(json.loads(await get_events()), {"events": []})
+        self.assertEqual(metrics.OFFLOADED.values, {})
+
+    async def test_payloads_are_counted_per_tool_call(self):
+        """Test that payload sizes are only counted inside a tool call."""
+        offload.note_payload(5000)
+        self.assertIsNone(offload.payload_size())
+        with offload.payload_scope():
+            offload.note_payload(600)
+            offload.note_payload(600)
+            self.assertEqual(offload.payload_size(), 1200)
+            with offload.payload_scope():
+                self.assertEqual(offload.payload_size(), 0)
+        self.assertIsNone(offload.payload_size())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Tests for the profiling module."""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import time
+import asyncio
+import tracemalloc
+import httpx
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp import profiling
+from tab_api_mcp.common import create_starlette_app
+
+
+def busy_for(seconds):
+    """Block the event loop, as a CPU hot spot would."""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+class TestProfiling(unittest.IsolatedAsyncioTestCase):
+    """Test cases for on-demand profiling."""
+
+    async def asyncSetUp(self):
+        """Serve the app in-process."""
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_starlette_app(None)),
+                                        base_url="http://test")
+
+    async def asyncTearDown(self):
+        """Close the client and stop tracing allocations."""
+        await self.client.aclose()
+        tracemalloc.stop()
+
+    async def test_routes_are_disabled_by_default(self):
+        """Test that the profiling routes refuse to run without the flag."""
+        for route in ("/debug/profile", "/debug/memory"):
+            response = await self.client.get(route)
+            self.assertEqual(response.status_code, 404)
+
+    @patch('tab_api_mcp.profiling.PROFILING_ENABLED', True)
+    async def test_sampled_profile_finds_hot_spot(self):
+        """Test that collapsed stacks show where the event loop spent its time."""
+        async def hot_spot():
+            await asyncio.sleep(0.05)
+            busy_for(0.2)
+
+        task = asyncio.ensure_future(hot_spot())
+        response = await self.client.get("/debug/profile", params={"seconds": 0.5})
+        await task
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("busy_for (test_profiling.py", response.text)
+        _, count = response.text.splitlines()[1].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+
+    @patch('tab_api_mcp.profiling.PROFILING_ENABLED', True)
+    async def test_cprofile_and_busy_profiler(self):
+        """Test that cProfile mode returns pstats output and profiles do not overlap."""
+        first = asyncio.ensure_future(self.client.get("/debug/profile", params={"seconds": 0.3, "mode": "cprofile"}))
+        await asyncio.sleep(0.05)
+        busy_for(0.05)
+        second = await self.client.get("/debug/profile", params={"seconds": 0.1})
+        first = await first
+
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("function calls", first.text)
+        self.assertIn("busy_for", first.text)
+
+        invalid = await self.client.get("/debug/profile", params={"seconds": 0.1, "mode": "perf"})
+        self.assertEqual(invalid.status_code, 400)
+
+    @patch('tab_api_mcp.profiling.PROFILING_ENABLED', True)
+    async def test_memory_growth(self):
+        """Test that allocations made between two reports show up as growth."""
+        first = (await self.client.get("/debug/memory")).json()
+        retained = [bytearray(1024) for _ in range(1000)]
+        second = (await self.client.get("/debug/memory")).json()
+
+        self.assertTrue(first["started"])
+        self.assertFalse(second["started"])
+        self.assertEqual(first["growth"], [])
+        self.assertTrue(any("test_profiling.py" in entry["location"] and entry["bytesDiff"] >= 1024 * 1000
+                            for entry in second["growth"]))
+        self.assertEqual(len(retained), 1000)
+
+        stopped = (await self.client.get("/debug/memory", params={"stop": "1"})).json()
+        self.assertFalse(stopped["tracing"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests for the racing module."""
+
+import unittest
+from unittest.mock import patch, AsyncMock
+import sys
+import os
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp.racing import (
+    get_meeting_code,
+    build_racing_day_snapshot,
+    warm_racing_cache,
+)
+
+MEETINGS = {
+    "meetings": [
+        {"meetingName": "RANDWICK", "raceType": "R", "venueMnemonic": "RAN"},
+        {"meetingName": "FLEMINGTON", "meetingCode": "R/FLE"},
+        {"meetingName": "UNKNOWN"},
+    ]
+}
+
+
+async def fake_tab_api(endpoint, params=None):
+    """Return canned racing data for the endpoints walked by the racing helpers."""
+    if endpoint.endswith("/racing/dates"):
+        return {"dates": [{"meetingDate": "2024-01-01"}]}
+    if endpoint.endswith("/meetings"):
+        return MEETINGS
+    if endpoint.endswith("/R/FLE/races"):
+        raise Exception("HTTP error: 503")
+    if endpoint.endswith("/races"):
+        return {"races": [{"raceNumber": 1, "raceId": "ran-1"}, {"raceNumber": 2, "raceId": "ran-2"}]}
+    return {"endpoint": endpoint}
+
+
+class TestRacing(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the racing module."""
+
+    def test_get_meeting_code(self):
+        """Test that meeting codes are read or built from race type and venue."""
+        self.assertEqual(get_meeting_code(MEETINGS["meetings"][0]), "R/RAN")
+        self.assertEqual(get_meeting_code(MEETINGS["meetings"][1]), "R/FLE")
+        self.assertIsNone(get_meeting_code(MEETINGS["meetings"][2]))
+
+    @patch('tab_api_mcp.common.make_tab_api_request', new_callable=AsyncMock)
+    async def test_snapshot_with_details(self, mock_request):
+        """Test that a snapshot merges meetings, races and details, isolating failures."""
+        mock_request.side_effect = fake_tab_api
+
+        snapshot = await build_racing_day_snapshot("2024-01-01", "NSW", depth="details", concurrency=3)
+
+        randwick, flemington, unknown = snapshot["meetings"]
+        self.assertEqual([race["raceId"] for race in randwick["races"]], ["ran-1", "ran-2"])
+        self.assertEqual(randwick["races"][0]["details"],
+                         {"endpoint": "/v1/tab-info-service/racing/races/ran-1"})
+        self.assertEqual(flemington["racesError"], "HTTP error: 503")
+        self.assertNotIn("races", unknown)
+        self.assertEqual(snapshot["errors"], 1)
+
+        # The upstream meetings data is left untouched
+        self.assertNotIn("races", MEETINGS["meetings"][0])
+
+    @patch('tab_api_mcp.common.make_tab_api_request', new_callable=AsyncMock)
+    async def test_snapshot_meetings_only(self, mock_request):
+        """Test that depth=meetings makes a single request."""
+        mock_request.side_effect = fake_tab_api
+
+        snapshot = await build_racing_day_snapshot("2024-01-01", "NSW", depth="meetings")
+
+        self.assertEqual(len(snapshot["meetings"]), 3)
+        mock_request.assert_awaited_once()
+
+    async def test_snapshot_rejects_unknown_depth(self):
+        """Test that an unknown depth is rejected."""
+        with self.assertRaises(ValueError):
+            await build_racing_day_snapshot("2024-01-01", "NSW", depth="runners")
+
+    @patch('tab_api_mcp.common.make_tab_api_request', new_callable=AsyncMock)
+    async def test_warm_racing_cache(self, mock_request):
+        """Test that the warmer walks dates, meetings and races and reports its work."""
+        mock_request.side_effect = fake_tab_api
+
+        stats = await warm_racing_cache(date="2024-01-01", jurisdiction="NSW", concurrency=2)
+
+        endpoints = [call.args[0] for call in mock_request.call_args_list]
+        self.assertIn("/v1/tab-info-service/racing/dates", endpoints)
+        self.assertIn("/v1/tab-info-service/racing/dates/2024-01-01/meetings/R/RAN/races", endpoints)
+        self.assertEqual(stats["requests"], 4)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["meetings"], 2)
+        self.assertEqual(stats["races"], 2)
+        self.assertIn("duration", stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
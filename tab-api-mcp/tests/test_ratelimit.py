@@ -0,0 +1,106 @@
+"""Tests for the ratelimit module."""
+
+import unittest
+from unittest.mock import patch
+from email.utils import formatdate
+import sys
+import os
+import time
+import asyncio
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp.ratelimit import (
+    service_family,
+    parse_retry_after,
+    TokenBucket,
+    get_rate_limiter,
+    reset_rate_limiters,
+)
+
+
+class TestRateLimit(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the rate limiter."""
+
+    def setUp(self):
+        """Start every test with fresh buckets."""
+        reset_rate_limiters()
+
+    def test_service_family(self):
+        """Test that endpoints are grouped by their service."""
+        self.assertEqual(service_family("/v1/tab-info-service/sports"), "tab-info-service")
+        self.assertEqual(service_family("/v1/account-service/balance"), "account-service")
+        self.assertEqual(service_family("/other"), "default")
+
+    def test_parse_retry_after(self):
+        """Test that Retry-After is read as seconds or an HTTP date."""
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 30, usegmt=True)), 30, delta=2)
+
+    def test_limiters_are_shared_per_family(self):
+        """Test that endpoints of one service share a bucket."""
+        self.assertIs(get_rate_limiter("/v1/tab-info-service/sports"), get_rate_limiter("/v1/tab-info-service/racing/dates"))
+        self.assertIsNot(get_rate_limiter("/v1/tab-info-service/sports"), get_rate_limiter("/v1/account-service/balance"))
+
+        with patch('tab_api_mcp.ratelimit.RATE_LIMIT', 0):
+            self.assertIsNone(get_rate_limiter("/v1/account-service/balance"))
+
+    async def test_burst_then_rate(self):
+        """Test that a burst is admitted at once and later requests wait for tokens."""
+        bucket = TokenBucket(rate=100, burst=5)
+        start = time.monotonic()
+
+        await asyncio.gather(*(bucket.acquire() for _ in range(10)))
+
+        # Five tokens at 100/s take about 50ms to refill
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+        self.assertEqual(bucket.admitted, 10)
+
+    async def test_waiters_are_admitted_in_order(self):
+        """Test that queued requests are admitted first come, first served."""
+        bucket = TokenBucket(rate=200, burst=1)
+        order = []
+
+        async def request(number):
+            await bucket.acquire()
+            order.append(number)
+
+        await asyncio.gather(*(request(number) for number in range(8)))
+
+        self.assertEqual(order, list(range(8)))
+
+    async def test_throttling_pauses_and_recovers(self):
+        """Test that a 429 halves the rate and pauses for Retry-After, then held back successes raise it."""
+        bucket = TokenBucket(rate=100, burst=10)
+
+        bucket.on_throttled(0.05)
+        self.assertEqual(bucket.rate, 50)
+        start = time.monotonic()
+        await bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        bucket.on_success()
+        self.assertEqual(bucket.rate, 51)
+
+    @patch('tab_api_mcp.ratelimit.RATE_LIMIT_RECOVERY', 0.5)
+    async def test_rate_probes_past_start_rate_only_when_saturated(self):
+        """Test that the rate rises above the configured rate while requests queue, but not when idle."""
+        bucket = TokenBucket(rate=100, burst=1)
+
+        await bucket.acquire()
+        bucket.on_success()
+        self.assertEqual(bucket.rate, 100)
+
+        async def request():
+            await bucket.acquire()
+            bucket.on_success()
+
+        await asyncio.gather(*(request() for _ in range(5)))
+        self.assertGreater(bucket.rate, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for the resilience module."""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp.resilience import (
+    backoff_delay,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+class TestBackoff(unittest.TestCase):
+    """Test cases for retry delays."""
+
+    @patch('tab_api_mcp.resilience.RETRY_BASE_DELAY', 0.1)
+    @patch('tab_api_mcp.resilience.RETRY_MAX_DELAY', 1.0)
+    def test_jittered_exponential_backoff(self):
+        """Test that delays are jittered up to an exponential, capped bound."""
+        for attempt, bound in ((0, 0.1), (2, 0.4), (10, 1.0)):
+            delays = [backoff_delay(attempt) for _ in range(50)]
+            self.assertTrue(all(0 <= delay <= bound for delay in delays))
+            self.assertGreater(len(set(delays)), 1)
+
+    @patch('tab_api_mcp.resilience.RETRY_MAX_DELAY', 5.0)
+    def test_retry_after(self):
+        """Test that Retry-After is honoured unless it asks for too long a wait."""
+        self.assertEqual(backoff_delay(0, 2.0), 2.0)
+        self.assertIsNone(backoff_delay(0, 60.0))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for the CircuitBreaker class."""
+
+    @patch('tab_api_mcp.resilience.CIRCUIT_FAILURE_THRESHOLD', 3)
+    def test_opens_after_consecutive_failures(self):
+        """Test that only consecutive failures open the circuit."""
+        breaker = CircuitBreaker("tab-info-service")
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        self.assertEqual(breaker.stats()["rejected"], 1)
+
+    @patch('tab_api_mcp.resilience.CIRCUIT_FAILURE_THRESHOLD', 1)
+    @patch('tab_api_mcp.resilience.CIRCUIT_RESET_TIMEOUT', 0)
+    def test_half_open_trial(self):
+        """Test that after the timeout one trial decides whether the circuit closes."""
+        breaker = CircuitBreaker("tab-info-service")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "half-open")
+
+        with patch('tab_api_mcp.resilience.CIRCUIT_RESET_TIMEOUT', 30):
+            breaker.before_request()
+            # Requests behind the trial still fail fast
+            with self.assertRaises(CircuitOpenError):
+                breaker.before_request()
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        breaker.before_request()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Tests for the serialization module."""
+
+import unittest
+from unittest.mock import patch
+import json
+import sys
+import os
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp import serialization
+from tab_api_mcp.serialization import (
+    parse_fields,
+    project_fields,
+    dump_json,
+    set_output_format,
+)
+
+RACES = {
+    "meeting": {"meetingName": "RANDWICK", "venueMnemonic": "RAN", "weather": "FINE"},
+    "races": [
+        {"raceNumber": 1, "raceName": "MAIDEN", "runners": [{"runnerName": "FAST", "barrier": 3}]},
+        {"raceNumber": 2, "raceName": "HANDICAP", "runners": []},
+    ],
+}
+
+
+class TestProjectFields(unittest.TestCase):
+    """Test cases for field projection."""
+
+    def test_parse_fields(self):
+        """Test that comma-separated and JSONPath-style paths build the same tree."""
+        expected = {"races": {"raceNumber": {}, "runners": {"runnerName": {}}}}
+
+        self.assertEqual(parse_fields("races.raceNumber, races.runners.runnerName"), expected)
+        self.assertEqual(parse_fields(["$.races[*].raceNumber", "$.races[].runners[*].runnerName"]), expected)
+
+    def test_projects_through_lists(self):
+        """Test that list items are projected one by one."""
+        result = project_fields(RACES, "races.raceNumber,races.runners.runnerName")
+
+        self.assertEqual(result, {"races": [
+            {"raceNumber": 1, "runners": [{"runnerName": "FAST"}]},
+            {"raceNumber": 2, "runners": []},
+        ]})
+
+    def test_object_path_keeps_whole_object(self):
+        """Test that a path ending on an object keeps all of it."""
+        self.assertEqual(project_fields(RACES, "meeting"), {"meeting": RACES["meeting"]})
+
+    def test_wildcard(self):
+        """Test that * matches every key of an object."""
+        data = {"markets": {"m1": {"name": "WIN", "id": 1}, "m2": {"name": "PLACE", "id": 2}}}
+
+        self.assertEqual(project_fields(data, "markets.*.name"),
+                         {"markets": {"m1": {"name": "WIN"}, "m2": {"name": "PLACE"}}})
+
+    def test_no_fields_returns_data_unchanged(self):
+        """Test that the data is returned as-is without fields."""
+        self.assertIs(project_fields(RACES, None), RACES)
+        self.assertIs(project_fields(RACES, ""), RACES)
+
+    def test_missing_fields_are_skipped(self):
+        """Test that paths not in the data are ignored."""
+        self.assertEqual(project_fields(RACES, "meeting.venueMnemonic,track.condition"),
+                         {"meeting": {"venueMnemonic": "RAN"}})
+
+
+class TestDumpJson(unittest.TestCase):
+    """Test cases for writing tool responses."""
+
+    def test_formats_encode_the_same_data(self):
+        """Test that every output format round-trips and compact output has no whitespace."""
+        for output_format in serialization.OUTPUT_FORMATS:
+            with self.subTest(output_format=output_format):
+                self.assertEqual(json.loads(dump_json(RACES, output_format)), RACES)
+
+        self.assertIn("\n  ", dump_json(RACES, "pretty"))
+        self.assertNotIn(" ", dump_json(RACES, "compact").replace("RANDWICK", ""))
+
+    @patch('tab_api_mcp.serialization.orjson', None)
+    def test_fast_without_orjson_falls_back_to_compact(self):
+        """Test that the fast format still works when orjson is not installed."""
+        self.assertEqual(dump_json(RACES, "fast"), dump_json(RACES, "compact"))
+
+    def test_fast_falls_back_for_values_orjson_rejects(self):
+        """Test that integers too large for orjson are still encoded."""
+        self.assertEqual(dump_json({"id": 2 ** 70}, "fast"), '{"id":1180591620717411303424}')
+
+    @patch('tab_api_mcp.serialization.OUTPUT_FORMAT', "fast")
+    def test_set_output_format(self):
+        """Test that the server-wide format is used by default and validated."""
+        set_output_format("pretty")
+        self.assertEqual(dump_json({"a": 1}), '{\n  "a": 1\n}')
+
+        with self.assertRaises(ValueError):
+            set_output_format("yaml")
+
+
+if __name__ == '__main__':
+    unittest.main()
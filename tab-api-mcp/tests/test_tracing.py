@@ -0,0 +1,157 @@
+"""Tests for the tracing module."""
+
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import sys
+import os
+import asyncio
+import httpx
+
+# Add the parent directory to the path so we can import the tab_api_mcp module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the tab_api_mcp module
+from tab_api_mcp import common, tracing
+from tab_api_mcp.common import create_starlette_app, close_http_client, make_tab_api_request
+from tab_api_mcp.odds import add_live_odds_subscriber, stop_live_odds_pollers
+from tab_api_mcp.instrumentation import instrument_tool
+from tab_api_mcp.serialization import dump_json
+
+
+@instrument_tool
+async def traced_tool(delay: float) -> str:
+    """Spend time in a fan-out of spans and serialize the result."""
+    async def fetch(number):
+        with tracing.span("request", number=number) as attributes:
+            await asyncio.sleep(delay)
+            tracing.annotate(attributes, cache="miss")
+    await asyncio.gather(fetch(1), fetch(2))
+    return dump_json({"delay": delay})
+
+
+@instrument_tool
+async def subscribing_tool(session) -> str:
+    """Subscribe to live odds, leaving a poller running after the call."""
+    return dump_json(await add_live_odds_subscriber(session, "E1", "NSW"))
+
+
+@instrument_tool
+async def catalog_tool() -> str:
+    """Fetch the racing dates, which may start a background refresh."""
+    return dump_json(await make_tab_api_request("/v1/tab-info-service/racing/dates"))
+
+
+async def traced_request(endpoint, params=None, **kwargs):
+    """Stand in for an upstream request, recording a span as the real one does."""
+    with tracing.span("request", endpoint=endpoint):
+        return {"runners": []}
+
+
+class TestTracing(unittest.IsolatedAsyncioTestCase):
+    """Test cases for tool call traces."""
+
+    def setUp(self):
+        """Start every test with an empty buffer."""
+        tracing.clear_traces()
+
+    async def test_tool_call_is_traced(self):
+        """Test that spans from the call and its fan-out tasks land in the call's trace."""
+        await traced_tool(0.01)
+
+        report = tracing.trace_report()
+
+        trace = report["slowest"][0]
+        self.assertEqual(trace["tool"], "traced_tool")
+        self.assertEqual([span["name"] for span in trace["spans"]], ["request", "request", "serialize"])
+        self.assertEqual(trace["spans"][0]["cache"], "miss")
+        self.assertGreaterEqual(trace["spans"][0]["duration"], 10)
+        self.assertEqual(set(report["tools"]["traced_tool"]["meanStageMs"]), {"request", "serialize"})
+
+    @patch('tab_api_mcp.odds.LIVE_ODDS_POLL_INTERVAL', 0.01)
+    @patch('tab_api_mcp.common.make_tab_api_request', new=traced_request)
+    async def test_background_poller_does_not_extend_trace(self):
+        """Test that a poller started by a tool call records nothing in the call's finished trace."""
+        session = MagicMock()
+        session.send_log_message = AsyncMock()
+        try:
+            await subscribing_tool(session)
+            await asyncio.sleep(0.05)
+        finally:
+            await stop_live_odds_pollers()
+
+        trace = tracing.trace_report()["slowest"][0]
+        self.assertEqual([span["name"] for span in trace["spans"]], ["request", "serialize"])
+
+    @patch('tab_api_mcp.common.get_access_token', new_callable=AsyncMock)
+    async def test_background_refresh_does_not_extend_trace(self, mock_get_token):
+        """Test that a stale-while-revalidate refresh is not recorded in the call that started it."""
+        mock_get_token.return_value = "test_token"
+
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"dates": []})
+
+        common.response_cache.clear()
+        common.cache.STALE_WHILE_REVALIDATE = True
+        common.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await catalog_tool()
+            common.response_cache.peek("/v1/tab-info-service/racing/dates").expires_at = 0
+            tracing.clear_traces()
+            await catalog_tool()
+            await asyncio.sleep(0.05)
+        finally:
+            common.cache.STALE_WHILE_REVALIDATE = False
+            await close_http_client()
+            common.response_cache.clear()
+
+        trace = tracing.trace_report()["slowest"][0]
+        self.assertEqual([span["name"] for span in trace["spans"]], ["request", "serialize"])
+        self.assertEqual(trace["spans"][0]["cache"], "stale")
+
+    def test_span_without_trace(self):
+        """Test that spans outside a tool call are not recorded."""
+        with tracing.span("request") as attributes:
+            self.assertIsNone(attributes)
+        self.assertEqual(tracing.trace_report()["traces"], 0)
+
+    async def test_slowest_and_per_tool_breakdown(self):
+        """Test that the report ranks calls by duration and can be filtered by tool."""
+        for delay in (0.001, 0.03, 0.01):
+            await traced_tool(delay)
+
+        report = tracing.trace_report(limit=2, tool="traced_tool")
+
+        self.assertEqual(report["traces"], 3)
+        self.assertEqual([trace["spans"][-1]["name"] for trace in report["slowest"]], ["serialize", "serialize"])
+        durations = [trace["durationMs"] for trace in report["slowest"]]
+        self.assertEqual(durations, sorted(durations, reverse=True))
+        self.assertGreaterEqual(durations[0], 30)
+        self.assertEqual(report["tools"]["traced_tool"]["calls"], 3)
+        self.assertEqual(tracing.trace_report(tool="other_tool")["traces"], 0)
+
+    async def test_buffer_is_bounded(self):
+        """Test that only the most recent traces are kept."""
+        tracing.set_buffer_size(2)
+        try:
+            for _ in range(3):
+                await traced_tool(0)
+            self.assertEqual(tracing.trace_report()["traces"], 2)
+        finally:
+            tracing.set_buffer_size(1000)
+
+    async def test_traces_route(self):
+        """Test that the app serves the trace report."""
+        await traced_tool(0)
+        app = create_starlette_app(None)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/debug/traces", params={"limit": 1})
+            invalid = await client.get("/debug/traces", params={"limit": "many"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["slowest"]), 1)
+        self.assertEqual(invalid.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()